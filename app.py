@@ -11,8 +11,14 @@ import base64
 # 添加src目录到Python路径
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
-from src.adif_parser.parser import parse_adif
+from src.adif_parser.bytes_parser import MappedAdif
+from src.adif_parser.parser import peek_header
+from src.adif_parser.cache import ParseCache, content_digest, file_digest
 from awards.checker import AwardChecker
+from awards.qso_store import QSOStore
+from awards.award_state import qso_id
+# 呼号解析（awards）经 src 路径导入 adif_parser.callsign_parser，热更新必须作用于同一个模块对象
+import adif_parser.callsign_parser as cty_data
 import json
 
 app = Flask(__name__)
@@ -23,6 +29,36 @@ app.secret_key = 'ham_awards_secret_key'
 # 初始化奖状检查器
 award_checker = AwardChecker()
 
+# 解析结果缓存：同一份日志再次上传时直接读取上次的解析结果
+PARSE_CACHE_DIR = os.environ.get('ADIF_PARSE_CACHE_DIR',
+                                 os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'parsed'))
+parse_cache = ParseCache(PARSE_CACHE_DIR)
+
+# 按本台呼号保存的 QSO 历史：LoTW 增量导出合并进库，奖状检查基于完整历史
+QSO_STORE_PATH = os.environ.get('QSO_STORE_PATH',
+                                os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'qso_store.sqlite3'))
+qso_store = QSOStore(QSO_STORE_PATH)
+
+# 定期检查 cty.dat 是否更新（秒），更新后在后台重新编译并切换，不必重启；0 为不检查
+CTY_WATCH_SECONDS = float(os.environ.get('CTY_WATCH_SECONDS', 60))
+if CTY_WATCH_SECONDS > 0:
+    cty_data.start_watcher(CTY_WATCH_SECONDS)
+
+
+def simplify_results(results, records_count):
+    """只保留会话中需要的奖状结果字段，避免cookie过大"""
+    simplified_results = {}
+    for award_name, award_data in results.items():
+        simplified_results[award_name] = {
+            'award': award_data['award'],
+            'eligible': award_data['eligible'],
+            'conditions': award_data['conditions'],
+            'records_analyzed': award_data['records_analyzed'],
+            'enhanced_records_count': award_data['enhanced_records_count'],
+            'unique_contacts': award_data.get('unique_contacts', records_count)
+        }
+    return simplified_results
+
 @app.route('/')
 def index():
     """首页 - 显示可申请的奖状列表"""
@@ -45,6 +81,7 @@ def upload_file():
         if file and file.filename.lower().endswith('.adi'):
             temp_dir = None
             temp_file_path = None
+            adif_map = None
             try:
                 # 创建临时目录来保存上传文件的副本
                 temp_dir = tempfile.mkdtemp()
@@ -53,13 +90,11 @@ def upload_file():
                 # 保存上传的文件副本（服务器端临时文件）
                 file.save(temp_file_path)
                 
-                # 读取文件内容（同时获取所有行用于后续处理）
-                with open(temp_file_path, 'r', encoding='utf-8') as f:
-                    adif_lines = f.readlines()
-                    adif_content = ''.join(adif_lines)
+                # 只读取日志开头（头部区域，至少三行），不读入整个文件
+                header_peek = peek_header(temp_file_path)
                 
                 # 检查是否为LOTW下载的文件
-                if 'Logbook of the World' not in adif_content:
+                if 'Logbook of the World' not in header_peek:
                     flash('请上传从 lotw.arrl.org 下载的ADIF日志文件。')
                     flash('LOTW日志文件通常包含 "ProgramID: Logbook of the World" 等标识信息。')
                     flash('您可以访问 https://lotw.arrl.org 下载您的日志文件。')
@@ -68,8 +103,9 @@ def upload_file():
                 # 从第三行提取申请奖状的呼号（格式：for XXX）
                 import re
                 own_call_from_third_line = None
-                if len(adif_lines) >= 3:
-                    third_line = adif_lines[2].strip()  # 索引从0开始，第三行是索引2
+                header_lines = header_peek.split('\n')
+                if len(header_lines) >= 3:
+                    third_line = header_lines[2].strip()  # 索引从0开始，第三行是索引2
                     for_match = re.search(r'for\s+([A-Za-z0-9/]+)', third_line, re.IGNORECASE)
                     if for_match:
                         own_call_from_third_line = for_match.group(1).strip()
@@ -84,8 +120,20 @@ def upload_file():
                 # 提取呼号（只使用第三行的for XXX信息）并转换为大写
                 own_call_from_owncall = own_call_from_third_line.upper()
                 
-                # 解析ADIF文件
-                header, records = parse_adif(adif_content)
+                # 解析ADIF文件（字节模式：mmap 映射临时文件，字段按字节长度切分、按需解码）
+                # 只解析奖状检查（含规则文件中的条件）需要的字段，其余字段在分词阶段跳过
+                record_fields = award_checker.record_fields()
+                source_size = os.path.getsize(temp_file_path)
+                upload_digest = file_digest(temp_file_path)
+                cache_key = parse_cache.key(upload_digest, 'bytes', record_fields)
+                cached = parse_cache.get(cache_key, source_size)
+                if cached is not None:
+                    header, records = cached
+                else:
+                    # 请求处理线程中不启动进程池，大日志同样串行解析
+                    adif_map = MappedAdif(temp_file_path)
+                    header, records = adif_map.parse(fields=record_fields)
+                    parse_cache.put(cache_key, header, records)
                 
                 # 检查是否为详细日志（包含APP_LoTW_DXCC_ENTITY_STATUS字段）
                 is_detailed_log = False
@@ -134,29 +182,56 @@ def upload_file():
                 if isinstance(own_call, list) and own_call:
                     own_call = own_call[0]
                 
-                # 检查奖状条件（自动增强非标准日志）
-                results = award_checker.check_all_awards(records)
+                # 把本次上传（完整或增量）合并进该呼号的 QSO 历史，之后基于完整历史检查奖状
+                if own_call:
+                    changed = []
+                    ingest_stats = qso_store.ingest(own_call, records, header, changed=changed)
+                    app.logger.info('QSO 历史已更新: %s %s', own_call, ingest_stats)
+                    version = qso_store.version(own_call)
+                    
+                    # 奖状状态增量更新：只把本次新增/更新的 QSO 计入上次保存的状态，
+                    # 只读取这些 QSO 已保存的位掩码；没有状态，或状态不是紧接本次上传之前的版本时，
+                    # 才读取完整历史重建
+                    saved = qso_store.load_award_state(own_call)
+                    data = saved[1] if saved and saved[0] == version - 1 else None
+                    state = award_checker.award_state(data)
+                    if state.restored:
+                        state.load_masks(qso_store.load_award_masks(own_call, [qso_id(r) for r in changed]))
+                        update = state.apply(changed)
+                        app.logger.info('奖状状态增量更新: %d 条记录，%d 项变化', update['records'], len(update['changes']))
+                        for change in update['changes']:
+                            flash(change['message'])
+                        for code in update['newly_eligible']:
+                            flash(f"恭喜！已满足 {award_checker.awards[code]['name']} 的全部条件")
+                        qso_store.save_award_state(own_call, state.to_dict(), version, masks=state.pop_masks())
+                    else:
+                        # 完整历史的增强结果按 (呼号, 历史版本) 缓存，结果页重新检查时复用
+                        state.apply(award_checker.prepare(qso_store.records(own_call), (own_call.strip().upper(), version)),
+                                    report=False)
+                        qso_store.save_award_state(own_call, state.to_dict(), version,
+                                                   masks=state.pop_masks(), replace=True)
+                    results = state.results()
+                    records_count = len(state)
+                else:
+                    # 检查奖状条件（自动增强非标准日志）；
+                    # 本次解析的记录是临时文件 mmap 上的视图，请求结束后失效，只缓存读自解析缓存的记录
+                    key = ('upload', upload_digest) if cached is not None else None
+                    results = award_checker.check_all_awards(records, key)
+                    records_count = len(records)
                 
                 # 将日志和结果保存到会话中
                 # 使用JSON序列化来确保复杂对象能够正确存储
                 try:
                     # 只保存必要的数据到会话中，避免cookie过大
-                    session['records_count'] = len(records)
+                    session['records_count'] = records_count
                     if own_call:
                         session['own_call'] = own_call
                     # 简化results对象，只保留必要信息
-                    simplified_results = {}
-                    for award_name, award_data in results.items():
-                        simplified_results[award_name] = {
-                            'award': award_data['award'],
-                            'eligible': award_data['eligible'],
-                            'conditions': award_data['conditions'],
-                            'records_analyzed': award_data['records_analyzed'],
-                            'enhanced_records_count': award_data['enhanced_records_count'],
-                            'unique_contacts': award_data.get('unique_contacts', len(records))
-                        }
+                    simplified_results = simplify_results(results, records_count)
                     # 确保数据正确序列化
                     session['results'] = json.dumps(simplified_results, default=str)
+                    # 记录结果对应的 cty.dat 版本，cty 更新后查看结果时重新计算
+                    session['cty_version'] = award_checker.callsign_parser.cty_version()
                     # 检查会话数据是否正确保存
                     print(f"会话数据已保存: records_count={session.get('records_count')}, results={session.get('results')}")
                     # 设置会话为永久会话
@@ -171,6 +246,9 @@ def upload_file():
                 flash(f'文件处理错误: {str(e)}')
                 return redirect(request.url)
             finally:
+                # 先解除文件映射，否则 Windows 上无法删除临时文件
+                if adif_map is not None:
+                    adif_map.close()
                 # 重要：只删除服务器上的临时副本，不删除用户本地文件
                 if temp_file_path and os.path.exists(temp_file_path):
                     try:
@@ -216,6 +294,23 @@ def show_results():
     except json.JSONDecodeError:
         flash('数据解析错误')
         return redirect(url_for('upload_file'))
+
+    # 结果按旧版 cty.dat 计算时，用已保存的 QSO 历史重新检查
+    cty_version = award_checker.callsign_parser.cty_version()
+    if own_call and session.get('cty_version') != cty_version:
+        records = qso_store.records(own_call)
+        if records:
+            app.logger.info('cty.dat 版本已变化 (%s -> %s)，重新检查奖状', session.get('cty_version'), cty_version)
+            # 与上传时相同，由 AwardState 给出结果；已保存的状态对应旧版 cty.dat，一并重建
+            version = qso_store.version(own_call)
+            state = award_checker.award_state(records=records, key=(own_call.strip().upper(), version))
+            qso_store.save_award_state(own_call, state.to_dict(), version,
+                                       masks=state.pop_masks(), replace=True)
+            records_count = len(state)
+            results = json.loads(json.dumps(simplify_results(state.results(), records_count), default=str))
+            session['records_count'] = records_count
+            session['results'] = json.dumps(results, default=str)
+            session['cty_version'] = cty_version
     
     return render_template('results.html', 
                          records_count=records_count,
@@ -319,6 +414,40 @@ def get_award():
     
 
 
+@app.route('/api/parse_cache_stats')
+def api_parse_cache_stats():
+    """API接口：解析缓存的命中率、节省字节数和占用情况"""
+    return jsonify(parse_cache.stats())
+
+@app.route('/api/callsign_cache_stats')
+def api_callsign_cache_stats():
+    """API接口：呼号解析 LRU 缓存的大小、命中/未命中与淘汰次数"""
+    return jsonify(award_checker.callsign_parser.cache_stats())
+
+@app.route('/api/cty_version')
+def api_cty_version():
+    """API接口：当前生效的 cty.dat 版本（内容摘要）、前缀数与加载时间"""
+    current = cty_data.current()
+    return jsonify({
+        'version': current.version,
+        'digest': current.digest,
+        'prefixes': len(current.cty.keys),
+        'exact_calls': len(current.cty.exact),
+        'loaded_at': datetime.fromtimestamp(current.loaded_at).isoformat(timespec='seconds'),
+        'watch_seconds': CTY_WATCH_SECONDS,
+    })
+
+@app.route('/api/award_rules')
+def api_award_rules():
+    """API接口：当前生效的奖状（内置 + award_rules/ 规则文件）及无效规则文件的错误信息"""
+    version, awards = award_checker.rules.current()
+    return jsonify({
+        'version': version,
+        'directory': award_checker.rules.directory,
+        'awards': {code: {'name': info['name'], 'conditions': info['conditions']} for code, info in awards.items()},
+        'errors': award_checker.rules.errors,
+    })
+
 @app.route('/api/check_award', methods=['POST'])
 def api_check_award():
     """API接口：检查单个奖状条件"""
@@ -326,7 +455,11 @@ def api_check_award():
     award_name = data.get('award_name')
     records = data.get('records', [])
     
-    result = award_checker.check_single_award(award_name, records)
+    # 同一份日志重复检查各个奖状时只增强一次（键只取记录内容，与奖状名无关）
+    records_digest = content_digest(json.dumps(records, sort_keys=True, ensure_ascii=False).encode('utf-8'))
+    prepared = award_checker.prepare(records, ('api', records_digest))
+    result = award_checker.check_single_award(award_name, prepared)
+    result['cty_version'] = award_checker.callsign_parser.cty_version()
     return jsonify(result)
 
 @app.route('/save_template', methods=['POST'])
@@ -0,0 +1,756 @@
+"""一次扫描完成所有奖状条件的聚合引擎。
+
+每个奖状条件（以及各奖状的增强记录数、唯一通联数）编译为一个累加器：`add(record)` 把一条记录
+计入自己的去重集合或计数，`result()` 生成与原 `AwardChecker._check_*` 相同的结果字典。
+`AggregationPlan` 把一组奖状的全部累加器收集起来，参数相同的累加器只保留一个，
+`run()` 只遍历一次增强后的记录，再按奖状组装结果——无论定义了多少奖状和条件，记录都只扫描一次。
+
+新的条件类型通过 `CONDITION_ACCUMULATORS` 注册：条件类型 -> 累加器类。
+
+通用条件 `distinct_count` 由声明式的参数描述（见 `award_rules/README.md`）：
+`key` 为计数键（`KEY_FUNCTIONS` 中的名称，或名称列表组成的复合键），`filters` 为波段、模式、
+日期范围、DXCC、确认状态等过滤条件，`values` 限定计入的取值，`target` 或 `targets`/`phases` 为目标。
+`compile_condition()` 把条件编译为累加器工厂：取键函数和过滤谓词只在编译时解析一次。
+`grid_count`、`cq_zone_count`、`continent_count` 是预设参数的 `distinct_count`。
+"""
+import hashlib
+import json
+import logging
+import re
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from .callsign_parser import dxcc_code
+
+logger = logging.getLogger(__name__)
+
+# WAPC 的行政区代码：目标中含有这些代码的 state_count 条件按“行政区”输出消息
+CHINA_PROVINCE_CODES = frozenset([
+    'BJ', 'TJ', 'HE', 'SX', 'NM', 'LN', 'JL', 'HL', 'SH', 'JS',
+    'ZJ', 'AH', 'FJ', 'JX', 'SD', 'HA', 'HB', 'HN', 'GD', 'GX',
+    'HI', 'CQ', 'SC', 'GZ', 'YN', 'XZ', 'SN', 'GS', 'QH', 'NX',
+    'XJ', 'TW', 'HK', 'MO',
+])
+
+# 中国大陆的 DXCC 代码
+CHINA_DXCC = 318
+
+_CHINA_ZONE_RE = re.compile(r'B[^\d]*(\d)')
+
+
+def _call(record) -> Any:
+    return record.get('call') or record.get('CALL')
+
+
+def _dxcc(record) -> Any:
+    return record.get('dxcc') or record.get('DXCC')
+
+
+def condition_key(condition: Dict[str, Any]) -> str:
+    """条件的规范化表示，参数相同的条件共用一个累加器。"""
+    return json.dumps(condition, sort_keys=True, ensure_ascii=False, default=str)
+
+
+class Accumulator:
+    """累加器基类：`add()` 计入一条（增强后的）记录，`result()` 返回结果。
+
+    条件累加器的 `fields` 为它读取的记录字段（用于上传时的字段投影），None 表示未声明。
+    去重计数的累加器在 `add()` 计入一个新取值时返回该值（否则返回 None），供增量状态记录证据 QSO。
+    `dump()` / `restore()` 在可 JSON 序列化的形式与内部状态之间转换，`_state_attr` 为保存状态的属性名。
+    """
+    __slots__ = ()
+    _state_attr: Optional[str] = None
+    fields: Optional[Tuple[str, ...]] = None
+
+    def add(self, record) -> Any:
+        raise NotImplementedError
+
+    def result(self) -> Any:
+        raise NotImplementedError
+
+    def dump(self) -> Any:
+        if self._state_attr is None:
+            return None
+        value = getattr(self, self._state_attr)
+        return [list(v) if isinstance(v, tuple) else v for v in value] if isinstance(value, set) else value
+
+    def restore(self, data) -> None:
+        if self._state_attr is None:
+            return
+        value = getattr(self, self._state_attr)
+        if isinstance(value, set):
+            value.update(thaw(v) for v in data)
+        else:
+            setattr(self, self._state_attr, data)
+
+
+def thaw(value):
+    """JSON 反序列化后的复合键（列表）还原为元组。"""
+    return tuple(value) if isinstance(value, list) else value
+
+
+class StateCountAccumulator(Accumulator):
+    """`state_count`：目标省份/州中已通联的个数（state 或 us_state 字段）。"""
+    __slots__ = ('condition', 'target_states', 'unique_states')
+    _state_attr = 'unique_states'
+    fields = ('state', 'us_state')
+
+    def __init__(self, condition, parser=None):
+        self.condition = condition
+        self.target_states = condition.get('states', [])
+        self.unique_states = set()
+
+    def add(self, record) -> Optional[str]:
+        state = record.get('state') or record.get('us_state')
+        if state:
+            state = state.upper()
+            if state in self.target_states and state not in self.unique_states:
+                self.unique_states.add(state)
+                return state
+        return None
+
+    def result(self) -> Dict[str, Any]:
+        target_states = self.target_states
+        target_count = self.condition.get('target', 0)
+        unique_states = self.unique_states
+        met = len(unique_states) >= target_count
+
+        # 根据是否为WAPC奖（目标中含有中国行政区代码）选择合适的消息
+        if any(state in CHINA_PROVINCE_CODES for state in target_states):
+            message = f'已通联 {len(unique_states)}/{target_count} 个行政区'
+            # 收集已通联和未通联的省份
+            connected_states = sorted(unique_states)
+            missing_states = sorted([s for s in target_states if s not in unique_states])
+        else:
+            message = f'已通联 {len(unique_states)}/{target_count} 个州'
+            connected_states = []
+            missing_states = []
+
+        return {
+            'met': met,
+            'current': len(unique_states),
+            'target': target_count,
+            'message': message,
+            'connected_states': connected_states,
+            'missing_states': missing_states,
+            'states': target_states  # 添加states字段确保模板能访问到
+        }
+
+
+class DxccCountAccumulator(Accumulator):
+    """`dxcc_count`：对方 DXCC 实体数（排除 0）；记录没有 dxcc 字段时由呼号解析。"""
+    __slots__ = ('condition', 'parser', 'unique_dxcc')
+    _state_attr = 'unique_dxcc'
+    fields = ('dxcc', 'call')
+
+    def __init__(self, condition, parser=None):
+        self.condition = condition
+        self.parser = parser
+        self.unique_dxcc = set()
+
+    def add(self, record) -> Optional[int]:
+        # 获取对方的DXCC（优先使用直接的DXCC字段，忽略MY_DXCC），只接受数字形式的代码，排除dxcc0
+        dxcc = _dxcc(record)
+        if dxcc:
+            code = dxcc_code(dxcc)
+        else:
+            callsign = _call(record)
+            if not callsign or not self.parser:
+                return None
+            code = dxcc_code(self.parser.parse_callsign(callsign).get('dxcc'))
+        if code and code not in self.unique_dxcc:
+            self.unique_dxcc.add(code)
+            return code
+        return None
+
+    def result(self) -> Dict[str, Any]:
+        return dxcc_count_result(self.condition, len(self.unique_dxcc))
+
+
+def dxcc_count_result(condition: Dict[str, Any], current_count: int) -> Dict[str, Any]:
+    """按 `targets`/`phases`（多阶段）或 `target`（单目标）生成 DXCC 条件的结果。"""
+    return tiered_result(condition, current_count, 'DXCC实体', '实体')
+
+
+def tiered_result(condition: Dict[str, Any], current_count: int, label: str, unit: str) -> Dict[str, Any]:
+    """多阶段或单目标条件的通用结果；`label` 用于“已通联 N 个{label}”，`unit` 用于阶段说明。"""
+    # 检查是否有多个目标值
+    if 'targets' in condition:
+        targets = sorted(condition['targets'])
+        phases = condition.get('phases', [])
+
+        # 找到最大的已完成目标
+        met_targets = [t for t in targets if current_count >= t]
+        max_met_target = max(met_targets) if met_targets else 0
+
+        # 找到下一个目标
+        next_targets = [t for t in targets if current_count < t]
+        next_target = min(next_targets) if next_targets else max(targets)
+
+        # 确定当前阶段
+        current_phase = ""
+        if max_met_target > 0:
+            idx = targets.index(max_met_target)
+            if idx < len(phases):
+                current_phase = phases[idx]
+
+        # 生成消息
+        message = f'已通联 {current_count} 个{label}'
+        if max_met_target > 0:
+            message += f'，已完成{max_met_target}个{unit}的{current_phase}'
+        message += f'，下一个目标：{next_target}个{unit}'
+
+        return {
+            'met': len(met_targets) > 0,  # 至少完成一个阶段
+            'current': current_count,
+            'target': next_target,  # 显示下一个目标
+            'message': message,
+            'met_targets': met_targets,  # 已完成的目标列表
+            'current_phase': current_phase,  # 当前阶段
+            'max_met_target': max_met_target  # 最大已完成目标
+        }
+    # 兼容旧的单目标格式
+    target_count = condition.get('target', 0)
+    return {
+        'met': current_count >= target_count,
+        'current': current_count,
+        'target': target_count,
+        'message': f'已通联 {current_count}/{target_count} 个{label}'
+    }
+
+
+class ChinaZoneCountAccumulator(Accumulator):
+    """`china_zone_count`：对方 DXCC 为 318 的呼号中出现的中国大陆分区（B 之后的第一个数字）。"""
+    __slots__ = ('condition', 'unique_zones')
+    _state_attr = 'unique_zones'
+    fields = ('dxcc', 'call')
+
+    def __init__(self, condition, parser=None):
+        self.condition = condition
+        self.unique_zones = set()
+
+    def add(self, record) -> Optional[str]:
+        dxcc = _dxcc(record)
+        if dxcc_code(dxcc) != CHINA_DXCC:
+            return None
+        call = _call(record)
+        if not call:
+            return None
+        match = _CHINA_ZONE_RE.search(call.upper())
+        if match:
+            zone_char = match.group(1)
+            if zone_char not in self.unique_zones:
+                self.unique_zones.add(zone_char)
+                logger.debug('识别到分区: %s, 来自呼号: %s, DXCC: %s', zone_char, call, dxcc)
+                return zone_char
+        return None
+
+    def result(self) -> Dict[str, Any]:
+        target_count = self.condition.get('target', 10)
+        unique_zones = self.unique_zones
+        current_count = len(unique_zones)
+        missing_zones = [str(z) for z in range(10) if str(z) not in unique_zones]
+        logger.debug('WACZ检查结果: 当前分区数=%d, 目标=%s, 已通联分区=%s, 缺失分区=%s',
+                     current_count, target_count, sorted(unique_zones), missing_zones)
+
+        return {
+            'met': current_count >= target_count,
+            'current': current_count,
+            'target': target_count,
+            'message': f'已通联中国大陆 {current_count}/{target_count} 个分区（0-9区）',
+            'connected_zones': sorted(unique_zones),
+            'missing_zones': missing_zones
+        }
+
+
+class RecordCountAccumulator(Accumulator):
+    """满足 `predicate` 的记录条数（不去重）。"""
+    __slots__ = ('predicate', 'count')
+    _state_attr = 'count'
+
+    def __init__(self, predicate: Callable[[Any], bool]):
+        self.predicate = predicate
+        self.count = 0
+
+    def add(self, record) -> None:
+        if self.predicate(record):
+            self.count += 1
+
+    def result(self) -> int:
+        return self.count
+
+
+class DistinctDxccAccumulator(Accumulator):
+    """记录 dxcc 字段中不同的非零 DXCC 代码个数（不解析呼号）。"""
+    __slots__ = ('codes',)
+    _state_attr = 'codes'
+
+    def __init__(self):
+        self.codes = set()
+
+    def add(self, record) -> Optional[int]:
+        code = dxcc_code(_dxcc(record))
+        if code and code not in self.codes:
+            self.codes.add(code)
+            return code
+        return None
+
+    def result(self) -> int:
+        return len(self.codes)
+
+
+class UniqueContactsAccumulator(Accumulator):
+    """按 (呼号, 日期) 去重的通联数。"""
+    __slots__ = ('contacts',)
+    _state_attr = 'contacts'
+
+    def __init__(self):
+        self.contacts = set()
+
+    def add(self, record) -> Optional[str]:
+        call = _call(record)
+        date = record.get('qso_date') or record.get('QSO_DATE')
+        if call and date:
+            contact = f"{call}_{date}"
+            if contact not in self.contacts:
+                self.contacts.add(contact)
+                return contact
+        return None
+
+    def result(self) -> int:
+        return len(self.contacts)
+
+
+class UnknownConditionAccumulator(Accumulator):
+    """未注册的条件类型：不计数，结果为未满足。"""
+    __slots__ = ('condition',)
+    fields = ()
+
+    def __init__(self, condition, parser=None):
+        self.condition = condition
+
+    def add(self, record) -> None:
+        return None
+
+    def result(self) -> Dict[str, Any]:
+        return {'met': False, 'message': f"未知条件类型: {self.condition.get('type')}"}
+
+
+def _upper(value) -> Optional[str]:
+    if not value:
+        return None
+    value = str(value).strip().upper()
+    return value or None
+
+
+def _zone(value) -> Optional[str]:
+    """分区统一为不带前导零的数字串（'05'、5 -> '5'）。"""
+    if value is None or value == '':
+        return None
+    value = str(value).strip()
+    return str(int(value)) if value.isdigit() else (value or None)
+
+
+def _parsed(record, parser, field):
+    callsign = _call(record)
+    if not callsign or not parser:
+        return None
+    return parser.parse_callsign(callsign).get(field)
+
+
+def _key_dxcc(record, parser):
+    dxcc = _dxcc(record)
+    code = dxcc_code(dxcc) if dxcc else dxcc_code(_parsed(record, parser, 'dxcc'))
+    return code or None
+
+
+def _key_china_zone(record, parser):
+    if dxcc_code(_dxcc(record)) != CHINA_DXCC:
+        return None
+    call = _call(record)
+    match = _CHINA_ZONE_RE.search(call.upper()) if call else None
+    return match.group(1) if match else None
+
+
+def _key_grid(record, parser):
+    grid = _upper(record.get('gridsquare'))
+    return grid[:4] if grid and len(grid) >= 4 else None
+
+
+# 计数键名 -> 取值函数 (record, parser) -> 值或 None；没有字段时能由呼号推断的键会解析呼号
+KEY_FUNCTIONS: Dict[str, Callable[[Any, Any], Any]] = {
+    'call': lambda r, p: _upper(_call(r)),
+    'dxcc': _key_dxcc,
+    'state': lambda r, p: _upper(r.get('state') or r.get('us_state')),
+    'country': lambda r, p: r.get('country') or _parsed(r, p, 'country') or None,
+    'continent': lambda r, p: _upper(r.get('continent') or _parsed(r, p, 'continent')),
+    'cq_zone': lambda r, p: _zone(r.get('cqz') or r.get('cqzone') or r.get('cq_zone') or _parsed(r, p, 'cq_zone')),
+    'itu_zone': lambda r, p: _zone(r.get('ituz') or _parsed(r, p, 'itu_zone')),
+    'china_zone': _key_china_zone,
+    'grid': _key_grid,                       # 4 位网格（如 'OM89'）
+    'gridsquare': lambda r, p: _upper(r.get('gridsquare')),  # 完整网格字段
+    'band': lambda r, p: _upper(r.get('band')),
+    'mode': lambda r, p: _upper(r.get('mode')),
+}
+
+# 计数键名 -> 取值函数读取的记录字段（可由呼号推断的键还需要 call）
+KEY_FIELDS: Dict[str, Tuple[str, ...]] = {
+    'call': ('call',),
+    'dxcc': ('dxcc', 'call'),
+    'state': ('state', 'us_state'),
+    'country': ('country', 'call'),
+    'continent': ('continent', 'call'),
+    'cq_zone': ('cqz', 'cqzone', 'cq_zone', 'call'),
+    'itu_zone': ('ituz', 'call'),
+    'china_zone': ('dxcc', 'call'),
+    'grid': ('gridsquare',),
+    'gridsquare': ('gridsquare',),
+    'band': ('band',),
+    'mode': ('mode',),
+}
+
+
+def _date(value) -> str:
+    """'2020-01-31' / '20200131' -> '20200131'。"""
+    return str(value).replace('-', '').strip()
+
+
+def _upper_set(values) -> frozenset:
+    return frozenset(str(v).strip().upper() for v in values)
+
+
+def _band_filter(values):
+    bands = _upper_set(values)
+    return lambda r: _upper(r.get('band')) in bands
+
+
+def _mode_filter(values):
+    modes = _upper_set(values)
+    return lambda r: _upper(r.get('mode')) in modes
+
+
+def _mode_group_filter(values):
+    groups = _upper_set(values)
+    return lambda r: _upper(r.get('app_lotw_modegroup')) in groups
+
+
+def _dxcc_filter(values):
+    codes = frozenset(dxcc_code(v) for v in values)
+    return lambda r: dxcc_code(_dxcc(r)) in codes
+
+
+def _date_from_filter(value):
+    start = _date(value)
+    return lambda r: _date(r.get('qso_date') or '') >= start
+
+
+def _date_to_filter(value):
+    end = _date(value)
+    return lambda r: '' < _date(r.get('qso_date') or '') <= end
+
+
+def _confirmed_filter(value):
+    def confirmed(r):
+        return str(r.get('qsl_rcvd') or r.get('lotw_qsl_rcvd') or '').strip().upper() == 'Y'
+    return confirmed if value else (lambda r: not confirmed(r))
+
+
+# 过滤条件名 -> 由规则中的取值生成谓词的函数；值为空（None、空列表）的过滤条件忽略
+FILTER_BUILDERS: Dict[str, Callable[[Any], Callable[[Any], bool]]] = {
+    'bands': _band_filter,
+    'modes': _mode_filter,
+    'mode_groups': _mode_group_filter,
+    'dxcc': _dxcc_filter,
+    'date_from': _date_from_filter,
+    'date_to': _date_to_filter,
+    'confirmed': _confirmed_filter,
+}
+
+# 过滤条件名 -> 谓词读取的记录字段
+FILTER_FIELDS: Dict[str, Tuple[str, ...]] = {
+    'bands': ('band',),
+    'modes': ('mode',),
+    'mode_groups': ('app_lotw_modegroup',),
+    'dxcc': ('dxcc',),
+    'date_from': ('qso_date',),
+    'date_to': ('qso_date',),
+    'confirmed': ('qsl_rcvd', 'lotw_qsl_rcvd'),
+}
+
+
+class DistinctCountSpec:
+    """编译后的 `distinct_count` 条件；调用时返回新的累加器。参数不合法时抛出 ValueError。"""
+    __slots__ = ('condition', 'key', 'predicate', 'values', 'label', 'unit', 'message', 'fields')
+
+    def __init__(self, condition: Dict[str, Any], parser=None):
+        self.condition = condition
+        key = condition.get('key')
+        names = key if isinstance(key, (list, tuple)) else [key]
+        unknown = [n for n in names if n not in KEY_FUNCTIONS]
+        if not names or unknown:
+            raise ValueError(f"未知的计数键: {key!r}（可用: {', '.join(sorted(KEY_FUNCTIONS))}）")
+        functions = [KEY_FUNCTIONS[n] for n in names]
+        if len(functions) == 1:
+            fn = functions[0]
+            self.key = lambda r: fn(r, parser)
+        else:
+            def composite(r):
+                parts = tuple(f(r, parser) for f in functions)
+                return None if None in parts else parts
+            self.key = composite
+
+        fields = [f for n in names for f in KEY_FIELDS[n]]
+        filters = []
+        for name, value in (condition.get('filters') or {}).items():
+            builder = FILTER_BUILDERS.get(name)
+            if builder is None:
+                raise ValueError(f"未知的过滤条件: {name!r}（可用: {', '.join(sorted(FILTER_BUILDERS))}）")
+            if value is None or value == [] or value == '':
+                continue
+            filters.append(builder(value))
+            fields.extend(FILTER_FIELDS[name])
+        # 读取的记录字段（去重、保持顺序）
+        self.fields = tuple(dict.fromkeys(fields))
+        if not filters:
+            self.predicate = None
+        elif len(filters) == 1:
+            self.predicate = filters[0]
+        else:
+            self.predicate = lambda r: all(f(r) for f in filters)
+
+        values = condition.get('values')
+        if values is not None and len(functions) == 1:
+            # 取值与计数键的规范化方式一致（大写 / 分区去前导零 / DXCC 整数）
+            norm = {'dxcc': dxcc_code, 'cq_zone': _zone, 'itu_zone': _zone}.get(names[0], _upper)
+            values = frozenset(norm(v) for v in values)
+        elif values is not None:
+            values = frozenset(tuple(v) for v in values)
+        self.values = values
+        if 'targets' not in condition and 'target' not in condition:
+            raise ValueError('条件缺少 target 或 targets')
+        self.label = condition.get('label') or '/'.join(names)
+        self.unit = condition.get('unit') or self.label
+        self.message = condition.get('message')
+
+    def __call__(self) -> 'DistinctCountAccumulator':
+        return DistinctCountAccumulator(self)
+
+    def result(self, worked) -> Dict[str, Any]:
+        current = len(worked)
+        result = tiered_result(self.condition, current, self.label, self.unit)
+        if self.message and 'targets' not in self.condition:
+            result['message'] = self.message.format(current=current, target=result['target'])
+        result['connected'] = sorted(map(str, worked))
+        if self.values is not None:
+            result['missing'] = sorted(str(v) for v in self.values if v not in worked)
+        return result
+
+
+class DistinctCountAccumulator(Accumulator):
+    """`distinct_count`：通过过滤的记录中，计数键不同取值的个数。"""
+    __slots__ = ('spec', 'worked')
+    _state_attr = 'worked'
+
+    def __init__(self, spec: DistinctCountSpec):
+        self.spec = spec
+        self.worked = set()
+
+    def add(self, record) -> Any:
+        spec = self.spec
+        if spec.predicate is not None and not spec.predicate(record):
+            return None
+        value = spec.key(record)
+        if value is None or (spec.values is not None and value not in spec.values) or value in self.worked:
+            return None
+        self.worked.add(value)
+        return value
+
+    def result(self) -> Dict[str, Any]:
+        return self.spec.result(self.worked)
+
+
+def _preset(key, label, message, uses_bands=True, values_field=None):
+    """把旧式条件（bands/continents 等顶层参数）转换为等价的 `distinct_count` 参数。"""
+    def expand(condition):
+        spec = {k: v for k, v in condition.items() if k not in ('type', 'bands', values_field)}
+        filters = dict(condition.get('filters') or {})
+        if uses_bands and condition.get('bands'):
+            filters['bands'] = condition['bands']
+        spec.update({'type': 'distinct_count', 'key': key, 'filters': filters})
+        spec.setdefault('label', label)
+        spec.setdefault('message', message)
+        if values_field and condition.get(values_field):
+            spec['values'] = condition[values_field]
+        return spec
+    return expand
+
+
+# 预设条件类型 -> 转换为 distinct_count 参数的函数（bands 为空时不限波段）
+PRESET_CONDITIONS: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    'grid_count': _preset('gridsquare', '网格', '在指定波段已通联 {current}/{target} 个网格'),
+    'cq_zone_count': _preset('cq_zone', 'CQ区域', '在指定波段已通联 {current}/{target} 个CQ区域'),
+    'continent_count': _preset('continent', '大洲', '已通联 {current}/{target} 个大洲',
+                               uses_bands=False, values_field='continents'),
+}
+
+# 条件类型 -> 累加器类；带 `compile` 的类型（distinct_count）在编译时预先解析参数
+CONDITION_ACCUMULATORS: Dict[str, type] = {
+    'state_count': StateCountAccumulator,
+    'dxcc_count': DxccCountAccumulator,
+    'china_zone_count': ChinaZoneCountAccumulator,
+    'distinct_count': DistinctCountSpec,
+}
+
+
+def compile_condition(condition: Dict[str, Any], parser=None) -> Callable[[], Accumulator]:
+    """把一个条件编译为累加器工厂。`distinct_count`（及其预设）的参数错误抛出 ValueError。"""
+    preset = PRESET_CONDITIONS.get(condition.get('type'))
+    if preset is not None:
+        condition = preset(condition)
+    cls = CONDITION_ACCUMULATORS.get(condition.get('type'), UnknownConditionAccumulator)
+    if cls is DistinctCountSpec:
+        return DistinctCountSpec(condition, parser)
+    return lambda: cls(condition, parser)
+
+
+def condition_fields(condition: Dict[str, Any]) -> Optional[Tuple[str, ...]]:
+    """条件读取的记录字段；条件类型未声明 `fields` 时返回 None。参数错误抛出 ValueError。"""
+    preset = PRESET_CONDITIONS.get(condition.get('type'))
+    if preset is not None:
+        condition = preset(condition)
+    cls = CONDITION_ACCUMULATORS.get(condition.get('type'), UnknownConditionAccumulator)
+    if cls is DistinctCountSpec:
+        return DistinctCountSpec(condition).fields
+    return getattr(cls, 'fields', None)
+
+
+def _has_state(record) -> bool:
+    return bool(record.get('state'))
+
+
+def _is_china(record) -> bool:
+    return dxcc_code(_dxcc(record)) == CHINA_DXCC
+
+
+def _has_location(record) -> bool:
+    return any(record.get(k) for k in ('country', 'continent', 'dxcc'))
+
+
+# “增强记录数”的统计口径：名称 -> 累加器工厂
+ENHANCED_COUNTS: Dict[str, Callable[[], Accumulator]] = {
+    'records_with_state': lambda: RecordCountAccumulator(_has_state),
+    'records_in_china': lambda: RecordCountAccumulator(_is_china),
+    'distinct_dxcc': DistinctDxccAccumulator,
+    'records_with_location': lambda: RecordCountAccumulator(_has_location),
+}
+
+# 内置奖状使用的口径；规则可以用 `enhanced_count` 指定其他口径
+_AWARD_ENHANCED_COUNTS = {'WAPC': 'records_with_state', 'WACZ': 'records_in_china', 'DXCC': 'distinct_dxcc'}
+
+
+def enhanced_count_spec(name: str) -> Tuple[Hashable, Callable[[], Accumulator]]:
+    """各奖状“增强记录数”的统计口径：(共享键, 累加器工厂)。`name` 为口径名称或奖状代码。
+
+    WAPC 为有 state 字段的记录数（不去重），WACZ 为 dxcc 为 318 的记录数，
+    DXCC 为不同的非零 dxcc 代码数，其他奖状为有 country/continent/dxcc 任一字段的记录数。
+    """
+    if name not in ENHANCED_COUNTS:
+        name = _AWARD_ENHANCED_COUNTS.get(name, 'records_with_location')
+    return (name,), ENHANCED_COUNTS[name]
+
+
+class AggregationPlan:
+    """一组奖状编译后的聚合计划：去重后的累加器工厂，以及每个奖状用到的累加器编号。"""
+
+    def __init__(self, awards: Dict[str, Dict[str, Any]], parser=None):
+        self.awards = awards
+        self.parser = parser
+        self._factories: List[Callable[[], Accumulator]] = []
+        slots: Dict[Hashable, int] = {}
+
+        def slot(key: Hashable, factory: Callable[[], Accumulator]) -> int:
+            index = slots.get(key)
+            if index is None:
+                index = slots[key] = len(self._factories)
+                self._factories.append(factory)
+            return index
+
+        self._unique_contacts = slot(('unique_contacts',), UniqueContactsAccumulator)
+        # 奖状代码 -> (奖状信息, 各条件的累加器编号, 增强记录数的累加器编号)
+        self._layout: Dict[str, Tuple[Dict[str, Any], List[int], int]] = {}
+        for code, info in awards.items():
+            condition_slots = []
+            for condition in info['conditions']:
+                key = ('condition', condition_key(condition))
+                if key not in slots:
+                    slot(key, compile_condition(condition, parser))
+                condition_slots.append(slots[key])
+            key, factory = enhanced_count_spec(info.get('enhanced_count') or code)
+            self._layout[code] = (info, condition_slots, slot(key, factory))
+        # 各条件读取的记录字段；有条件未声明字段时为 None（不能做字段投影）
+        fields: Optional[List[str]] = []
+        for info in awards.values():
+            for condition in info['conditions']:
+                used = condition_fields(condition)
+                if used is None:
+                    fields = None
+                    break
+                fields.extend(used)
+            if fields is None:
+                break
+        self.fields = tuple(dict.fromkeys(fields)) if fields is not None else None
+        # 奖状定义的摘要：序列化的累加器状态只能恢复到摘要相同的计划上
+        self.signature = hashlib.sha256(condition_key(awards).encode('utf-8')).hexdigest()
+
+    def __len__(self) -> int:
+        """去重后的累加器个数。"""
+        return len(self._factories)
+
+    @property
+    def layout(self) -> Dict[str, Tuple[Dict[str, Any], List[int], int]]:
+        """奖状代码 -> (奖状信息, 各条件的累加器编号, 增强记录数的累加器编号)"""
+        return self._layout
+
+    def new_accumulators(self) -> List[Accumulator]:
+        """新建一组空的累加器，编号与 `layout` 一致。"""
+        return [factory() for factory in self._factories]
+
+    def accumulate(self, records: Iterable) -> List[Accumulator]:
+        """新建全部累加器，一次遍历 `records` 把每条记录交给所有累加器。"""
+        accumulators = self.new_accumulators()
+        adders = [acc.add for acc in accumulators]
+        for record in records:
+            for add in adders:
+                add(record)
+        return accumulators
+
+    def results(self, accumulators: List[Accumulator], records_analyzed: int) -> Dict[str, Dict[str, Any]]:
+        """由累加器组装每个奖状的结果字典（与 `check_single_award` 的格式相同）。"""
+        unique_contacts = accumulators[self._unique_contacts].result()
+        results = {}
+        for code, (info, condition_slots, count_slot) in self._layout.items():
+            conditions = [accumulators[i].result() for i in condition_slots]
+            enhanced_count = accumulators[count_slot].result()
+            results[code] = {
+                'award': info['name'],
+                'eligible': all(c['met'] for c in conditions),
+                'conditions': conditions,
+                'records_analyzed': records_analyzed,
+                'unique_contacts': unique_contacts,
+                'enhanced_records_count': enhanced_count,
+                'basic_records_count': records_analyzed - enhanced_count,
+            }
+        return results
+
+    def run(self, enhanced_records: Iterable, records_analyzed: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """一次扫描增强后的记录，返回 奖状代码 -> 结果。"""
+        if records_analyzed is None:
+            records_analyzed = len(enhanced_records)
+        return self.results(self.accumulate(enhanced_records), records_analyzed)
+
+
+def aggregate_condition(condition: Dict[str, Any], records: Iterable, parser=None) -> Dict[str, Any]:
+    """单独检查一个条件（扫描一次 `records`）。"""
+    acc = compile_condition(condition, parser)()
+    for record in records:
+        acc.add(record)
+    return acc.result()
@@ -0,0 +1,255 @@
+"""按本台呼号保存的增量奖状状态。
+
+`AwardState` 保存一份完整日志经 `AggregationPlan` 聚合后的累加器状态：每个条件已通联的取值集合、
+每个取值的证据 QSO（第一次计入该取值的 QSO 指纹），以及每个已计入 QSO 的位掩码（它计入了哪些
+记录数累加器）。`apply(new_records)` 只增强并扫描新上传的记录，把它们计入已有状态，返回本次有变化的
+条件（“新 DXCC 实体”、“已通联 34/34 个行政区”等）——开销与新记录数成正比，与历史日志的长度无关。
+
+状态分两部分持久化（见 `QSOStore.save_award_state()`）：`to_dict()` 为累加器、证据和摘要，
+大小取决于已通联的取值数而不是 QSO 数；每个 QSO 的位掩码逐行保存，`pop_masks()` 给出上次保存后
+新增或变化的掩码。由 `from_dict()` 恢复的状态不含任何掩码，计入新记录前须先用 `load_masks()`
+载入这些记录对应 QSO 已保存的掩码，否则再次上传的 QSO 会被当作新 QSO 重复计数。
+状态只能恢复到奖状定义相同的计划上（`AggregationPlan.signature`），cty.dat 版本变化时
+由 `AwardChecker.award_state()` 用完整日志重建。
+
+每个 QSO 按指纹只计入一次：同一 QSO 重复出现或再次上传不会增加记录数类的统计（增强记录数、
+`records_analyzed` 为已计入的 QSO 数）。`AwardChecker.check_all_awards` 则按给出的记录逐条统计，
+对含重复 QSO 的日志两者的这些计数会不同；网页端有本台呼号的上传（QSO 历史本身已按指纹去重）
+使用 `AwardState`，没有本台呼号的上传使用 `check_all_awards`。
+
+增量更新假定 QSO 只会新增或升级（如 `QSOStore.ingest` 只会把未确认升级为已确认）：
+已计入的取值不会因为记录被修改或删除而撤销，这种情况需要用完整日志重建状态。
+"""
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from .aggregator import AggregationPlan, RecordCountAccumulator, thaw
+from .prepared_log import PreparedLog
+from .qso_store import qso_fingerprint
+
+# 序列化格式的版本号，格式变化时旧状态自动作废
+STATE_FORMAT = 2
+
+# 变化消息中最多列出多少个新取值（完整列表见 new_values）
+MESSAGE_VALUES = 5
+
+
+def qso_id(record) -> Optional[str]:
+    """QSO 的证据编号：QSO 指纹各字段以 '|' 连接；没有呼号的记录返回 None。"""
+    key = qso_fingerprint(record)
+    return '|'.join(key) if key is not None else None
+
+
+def _format_value(value) -> str:
+    if isinstance(value, tuple):
+        return '/'.join(str(v) for v in value)
+    return str(value)
+
+
+def _describe_values(values: List[Any]) -> str:
+    """消息中列出的新取值，最多 MESSAGE_VALUES 个。"""
+    shown = ', '.join(_format_value(v) for v in values[:MESSAGE_VALUES])
+    if len(values) > MESSAGE_VALUES:
+        shown += f' 等 {len(values)} 个'
+    return shown
+
+
+def _summary(result: Dict[str, Any]) -> List[Any]:
+    """条件结果中用于比较变化的部分：[当前数, 是否达成, 已完成的目标]"""
+    return [result.get('current', 0), bool(result.get('met')), list(result.get('met_targets', []))]
+
+
+class AwardState:
+    """一个本台呼号的奖状累加器状态，可增量更新、可序列化。"""
+
+    def __init__(self, plan: AggregationPlan, cty_version: Optional[str] = None):
+        self.plan = plan
+        parser = plan.parser
+        self.cty_version = cty_version if cty_version is not None else (parser.cty_version() if parser else None)
+        self.accumulators = plan.new_accumulators()
+        # 是否由序列化的状态恢复（否则为新建）
+        self.restored = False
+        self.updated_at = 0
+        # QSO 编号 -> 位掩码：第 n 位表示该 QSO 已计入第 n 个记录数累加器，
+        # 同一 QSO 再次上传（如确认状态更新）时不会重复计数。恢复的状态只含 load_masks() 载入的部分
+        self.qsos: Dict[str, int] = {}
+        # 已计入的 QSO 数（不含匿名记录）
+        self.qso_count = 0
+        # 上次 pop_masks() 之后新增或变化的 QSO 编号
+        self._dirty = set()
+        # 没有呼号、无法去重的记录数
+        self.anonymous = 0
+        # 条件累加器编号 -> {取值: 证据 QSO 编号}
+        condition_slots = sorted({i for _, slots, _ in plan.layout.values() for i in slots})
+        self.evidence: Dict[int, Dict[Any, Optional[str]]] = {i: {} for i in condition_slots}
+        self._counters = [(i, acc) for i, acc in enumerate(self.accumulators)
+                          if isinstance(acc, RecordCountAccumulator)]
+        counter_slots = {i for i, _ in self._counters}
+        self._distinct = [(i, acc) for i, acc in enumerate(self.accumulators) if i not in counter_slots]
+        # 奖状代码 -> 各条件上一次的 _summary()，用于判断本次更新带来的变化
+        self.summary: Dict[str, List[List[Any]]] = {}
+
+    def __len__(self) -> int:
+        """已计入的 QSO 数。"""
+        return self.qso_count + self.anonymous
+
+    def is_current(self, plan: AggregationPlan) -> bool:
+        """状态是否仍对应 `plan` 的奖状定义和当前的 cty.dat 版本。"""
+        parser = plan.parser
+        return (plan.signature == self.plan.signature
+                and (parser is None or parser.cty_version() == self.cty_version))
+
+    def load_masks(self, masks: Dict[str, int]) -> None:
+        """载入已保存的 QSO 位掩码（`QSOStore.load_award_masks()` 的结果）。"""
+        self.qsos.update(masks)
+
+    def pop_masks(self) -> Dict[str, int]:
+        """上次调用之后新增或变化的 QSO 位掩码，交给 `QSOStore.save_award_state()` 逐行保存。"""
+        masks = {qid: self.qsos[qid] for qid in self._dirty}
+        self._dirty = set()
+        return masks
+
+    def apply(self, new_records: Iterable, report: bool = True) -> Dict[str, Any]:
+        """把新上传（或更新）的记录计入状态，返回本次更新的变化。
+
+        返回 {'records': 本次记录数, 'new_qsos': 新 QSO 数, 'changes': [...], 'newly_eligible': [...]}；
+        `changes` 中每项对应一个结果有变化的条件，含新通联的取值及其证据 QSO（记录数类的条件为空）。
+        `report=False` 时（如由完整日志新建状态）只更新上一次结果的摘要，不生成变化列表。
+        `new_records` 也可以是 `PreparedLog`，此时复用它的增强结果。
+        """
+        if isinstance(new_records, PreparedLog):
+            records = new_records.records
+            enhanced = new_records.enhanced
+        else:
+            records = new_records
+            if not isinstance(records, list) and not hasattr(records, 'column'):
+                records = list(records)
+            parser = self.plan.parser
+            enhanced = parser.enhance_records(records) if parser else records
+        qsos = self.qsos
+        dirty = self._dirty
+        evidence = self.evidence
+        distinct = self._distinct
+        counters = self._counters
+        touched = set()
+        new_values: Dict[int, List[Any]] = {}
+        new_qsos = 0
+
+        for record, enhanced_record in zip(records, enhanced):
+            qid = qso_id(record)
+            if qid is None:
+                self.anonymous += 1
+                mask = 0
+            else:
+                mask = qsos.get(qid)
+                if mask is None:
+                    mask = 0
+                    new_qsos += 1
+                    dirty.add(qid)
+            before = mask
+            for i, acc in distinct:
+                value = acc.add(enhanced_record)
+                if value is not None:
+                    touched.add(i)
+                    worked = evidence.get(i)
+                    if worked is not None:
+                        worked[value] = qid
+                        new_values.setdefault(i, []).append(value)
+            for bit, (i, acc) in enumerate(counters):
+                flag = 1 << bit
+                if not mask & flag and acc.predicate(enhanced_record):
+                    mask |= flag
+                    acc.count += 1
+                    touched.add(i)
+            if qid is not None:
+                qsos[qid] = mask
+                if mask != before:
+                    dirty.add(qid)
+
+        self.qso_count += new_qsos
+        self.updated_at = int(time.time())
+        changes = []
+        newly_eligible = []
+        for code, (info, condition_slots, _) in self.plan.layout.items():
+            if not touched.intersection(condition_slots):
+                continue
+            previous = self.summary.get(code) or [[0, False, []] for _ in condition_slots]
+            current = list(previous)
+            for index, i in enumerate(condition_slots):
+                if i not in touched:
+                    continue
+                result = self.accumulators[i].result()
+                current[index] = _summary(result)
+                if not report or current[index] == previous[index]:
+                    continue
+                before_count, before_met, before_targets = previous[index]
+                # 记录数类的条件没有新取值，只报告计数的变化
+                values = new_values.get(i, [])
+                if values:
+                    message = f"{info['name']}：新增 {_describe_values(values)}，{result['message']}"
+                else:
+                    message = f"{info['name']}：{result['message']}"
+                if result.get('met') and not before_met:
+                    message += '，条件已达成！'
+                changes.append({
+                    'award': code,
+                    'award_name': info['name'],
+                    'condition': index,
+                    'previous': before_count,
+                    'current': result.get('current', 0),
+                    'target': result.get('target'),
+                    'met': bool(result.get('met')),
+                    'newly_met': bool(result.get('met')) and not before_met,
+                    'new_targets': [t for t in result.get('met_targets', []) if t not in before_targets],
+                    'new_values': [_format_value(v) for v in values],
+                    'evidence': {_format_value(v): evidence[i][v] for v in values},
+                    'message': message,
+                })
+            if report and all(c[1] for c in current) and not all(c[1] for c in previous):
+                newly_eligible.append(code)
+            self.summary[code] = current
+        return {'records': len(records), 'new_qsos': new_qsos, 'changes': changes, 'newly_eligible': newly_eligible}
+
+    def results(self) -> Dict[str, Dict[str, Any]]:
+        """当前状态下各奖状的结果（格式同 `AwardChecker.check_all_awards`）。"""
+        return self.plan.results(self.accumulators, len(self))
+
+    def evidence_for(self, award_code: str, condition: int = 0) -> Dict[str, Optional[str]]:
+        """某奖状某个条件已通联的各取值 -> 证据 QSO 编号。"""
+        slot = self.plan.layout[award_code][1][condition]
+        return {_format_value(v): qid for v, qid in self.evidence[slot].items()}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """可 JSON 序列化的状态。"""
+        return {
+            'format': STATE_FORMAT,
+            'signature': self.plan.signature,
+            'cty_version': self.cty_version,
+            'updated_at': self.updated_at,
+            'qso_count': self.qso_count,
+            'anonymous': self.anonymous,
+            'accumulators': [acc.dump() for acc in self.accumulators],
+            'evidence': [[i, [[list(v) if isinstance(v, tuple) else v, qid] for v, qid in worked.items()]]
+                         for i, worked in self.evidence.items()],
+            'summary': self.summary,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], plan: AggregationPlan) -> Optional['AwardState']:
+        """由 `to_dict()` 的结果恢复；格式或奖状定义与 `plan` 不符时返回 None。"""
+        if not isinstance(data, dict) or data.get('format') != STATE_FORMAT:
+            return None
+        if data.get('signature') != plan.signature or len(data.get('accumulators', ())) != len(plan):
+            return None
+        state = cls(plan, data.get('cty_version'))
+        for acc, dumped in zip(state.accumulators, data['accumulators']):
+            acc.restore(dumped)
+        for i, worked in data.get('evidence', ()):
+            if i in state.evidence:
+                state.evidence[i] = {thaw(v): qid for v, qid in worked}
+        state.qso_count = data.get('qso_count', 0)
+        state.anonymous = data.get('anonymous', 0)
+        state.summary = dict(data.get('summary', {}))
+        state.updated_at = data.get('updated_at', 0)
+        state.restored = True
+        return state
@@ -2,30 +2,51 @@
 
 实现要点：
 - 使用由 `src/adif_parser/callsign_parser.py` 生成的 `CONDENSED_LINES`。
+- 国家、大洲、CQ/ITU 分区与整数 DXCC 代码来自 cty.dat 的最长前缀索引（`lookup_entity`），一次查找得到。
 - 提供 `parse_callsign()`、`enhance_record()` 和 `enhance_records()`。
+- 解析结果（国家/大洲/DXCC/分区及中国省份）按规范化呼号缓存在有界 LRU 中，由全局实例在各请求间共享；
+  容量由 `CALLSIGN_CACHE_SIZE` 环境变量配置（0 为不缓存）。
+- cty.dat 热更新后（见 `adif_parser.callsign_parser.reload`），下一次解析时切换到新的数据快照：
+  清空缓存并重建回退索引。一批呼号总是用同一个快照解析，切换前开始的批次写回的结果会被丢弃。
+- `resolve_many()` / `enhance_records()` 先对整批呼号去重，每个不同的呼号只解析一次再广播回各条记录；
+  传入 `ColumnarLog` 时按列增强（`enhance_columnar()`），逐行只剩数组下标运算。
+- `dxcc_entity()` / `dxcc_name()` 按 DXCC 代码查当前快照的实体表；cty 索引未找到实体、由回退匹配得到
+  DXCC 代码的呼号，大洲与 CQ/ITU 分区也取自该表。
 """
 
+import logging
 import sys
 import os
-from typing import Dict, Optional, Tuple
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
 
 # 使用绝对路径添加src目录到Python路径
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 src_path = os.path.join(project_root, 'src')
 sys.path.insert(0, src_path)
 
+from adif_parser.dxcc import dxcc_code
+from adif_parser.columnar import Categorical, ColumnarLog, np
+
 try:
-    from adif_parser.callsign_parser import CONDENSED_LINES, find_country, PREFIX_TO_DXCC
+    import adif_parser.callsign_parser as _cty_module
+    from adif_parser.callsign_parser import CONDENSED_LINES, find_country, lookup_entity, PREFIX_TO_DXCC
     _find_country = find_country
+    _lookup_entity = lookup_entity
     _prefix_map = PREFIX_TO_DXCC
     print(f"成功导入呼号解析器，CONDENSED_LINES长度: {len(CONDENSED_LINES)}")
 except ImportError as e:
     print(f"导入错误: {e}")
+    _cty_module = None
     CONDENSED_LINES = []
     _find_country = None
+    _lookup_entity = None
     _prefix_map = {}
 
-# 保留简化的国家->大洲与国家->DXCC 映射（可按需扩展）。
+# 简化的国家->大洲映射，仅在 cty.dat 索引未找到实体、由 CONDENSED_LINES 回退匹配时使用。
 COUNTRY_TO_CONTINENT: Dict[str, str] = {
     'USA': 'NA', 'Canada': 'NA', 'Mexico': 'NA',
     'United Kingdom': 'EU', 'France': 'EU', 'Italy': 'EU', 'Germany': 'EU',
@@ -35,7 +56,7 @@ COUNTRY_TO_CONTINENT: Dict[str, str] = {
     'Brazil': 'SA', 'Argentina': 'SA', 'Chile': 'SA'
 }
 
-# 保留一份国家->DXCC（简化、部分）用于输出
+# 简化的国家->DXCC 映射，同样只用于 CONDENSED_LINES 回退匹配
 COUNTRY_TO_DXCC: Dict[str, int] = {
     'USA': 291, 'Canada': 1, 'Mexico': 50,
     'United Kingdom': 223, 'France': 227, 'Italy': 248, 'Germany': 230,
@@ -50,57 +71,266 @@ _COUNTRY_TO_DXCC_LOWER = {k.lower(): v for k, v in COUNTRY_TO_DXCC.items()}
 # 导入中国呼号段与省份的映射关系
 from .china_callsign_province_map import get_province_by_callsign as get_province_from_map
 
+# 呼号解析缓存的默认容量（不同呼号数）
+CALLSIGN_CACHE_SIZE = int(os.environ.get('CALLSIGN_CACHE_SIZE', 1 << 16))
+
+_EMPTY_INFO = {'country': None, 'continent': None, 'dxcc': None, 'cq_zone': None, 'itu_zone': None}
+_EMPTY_ENTRY = (_EMPTY_INFO, None)
+
+# 没有 state 字段时按 DXCC 代码填充的地区
+DXCC_TO_STATE = {386: 'TW', 321: 'HK', 152: 'MO'}
+
+
+class LRUCache:
+    """线程安全的有界 LRU 缓存，记录命中、未命中与淘汰次数。
+
+    `token` 标记缓存内容对应的数据版本，`validate(token)` 发现版本变化时清空缓存。
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.token: Any = None
+        self._data: 'OrderedDict[str, Any]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> Any:
+        """返回缓存的值并标记为最近使用；不存在时返回 None。"""
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """批量版 `get`：只返回命中的键，整批只加一次锁。"""
+        found = {}
+        with self._lock:
+            data = self._data
+            for key in keys:
+                value = data.get(key)
+                if value is None:
+                    self.misses += 1
+                else:
+                    data.move_to_end(key)
+                    found[key] = value
+            self.hits += len(found)
+        return found
+
+    def put(self, key: str, value: Any) -> None:
+        self.put_many({key: value})
+
+    def put_many(self, items: Dict[str, Any], token: Any = None) -> None:
+        """写入一批结果；给出 `token` 且与缓存当前版本不同时（结果已过期）不写入。"""
+        if self.capacity <= 0 or not items:
+            return
+        with self._lock:
+            if token is not None and token is not self.token:
+                return
+            data = self._data
+            for key, value in items.items():
+                data[key] = value
+                data.move_to_end(key)
+            while len(data) > self.capacity:
+                data.popitem(last=False)
+                self.evictions += 1
+
+    def validate(self, token: Any) -> bool:
+        """`token` 与缓存内容的版本不同时清空缓存并返回 True。"""
+        if token is self.token:
+            return False
+        with self._lock:
+            self._data.clear()
+            self.token = token
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'capacity': self.capacity,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+def build_fallback_index(lines) -> Tuple[Dict[str, int], list, int]:
+    """为 CONDENSED_LINES 回退匹配建立索引：(token -> 最早出现的行号, 各行国家名, 最长 token 长度)。
+
+    原先的回退逐行扫描，返回第一行中任一 token（区间取起点，如 'BA-BL' 取 'BA'）是呼号前缀的国家；
+    这等价于在呼号的所有前缀中找出行号最小的 token，查找只需 (最长 token 长度 + 1) 次字典访问。
+    """
+    first_line: Dict[str, int] = {}
+    names = []
+    for line in lines:
+        try:
+            parts, cname = line.split(':', 1)
+        except ValueError:
+            continue
+        cname = cname.strip()
+        # 原扫描中国家名为空的行匹配后不会终止扫描，等同于不存在
+        if not cname:
+            continue
+        row = len(names)
+        names.append(cname)
+        for p in parts.split(','):
+            first_line.setdefault(p.strip().split('-')[0], row)
+    return first_line, names, max(map(len, first_line), default=0)
+
 
 class CallsignParser:
     """使用精简映射解析呼号的简单解析器。"""
-    def __init__(self):
-        # 保留精简行以便人工查看
+    def __init__(self, cache_size: int = CALLSIGN_CACHE_SIZE):
+        # 保留精简行以便人工查看，回退匹配使用其索引
         self.condensed_lines = CONDENSED_LINES
+        self._fallback_index = build_fallback_index(CONDENSED_LINES)
         # 使用 adif_parser 中的前缀->country 映射作为准确来源（若可用）
         self._prefix_map = _prefix_map
         self._find_country = _find_country
+        self._lookup_entity = _lookup_entity
+        # 当前使用的 cty 数据快照及其回退索引，切换时整体替换
+        self._state = (_cty_module.current() if _cty_module is not None else None, self._fallback_index)
+        self._switch_lock = threading.Lock()
+        # 规范化呼号 -> (parse_callsign 结果, 中国省份代码或 None)
+        self.cache = LRUCache(cache_size)
+        self.cache.token = self._state[0]
+        # 同一实体的呼号共享同一个结果字典，缓存条目只多占一个元组
+        self._interned: Dict[tuple, Dict[str, Any]] = {}
+
+    def cache_stats(self) -> Dict[str, Any]:
+        return self.cache.stats()
+
+    def cty_version(self) -> Optional[str]:
+        """解析所用 cty.dat 的版本号（摘要前 12 位）；cty 模块不可用时为 None。"""
+        data = self._check_cty()[0]
+        return data.version if data is not None else None
+
+    def dxcc_entity(self, code: Any) -> Optional[Dict[str, Any]]:
+        """ADIF DXCC 代码（整数或 '318' 这样的字段值）对应的实体：名称、大洲、CQ/ITU 分区、是否已删除。
+
+        取自当前 cty 快照的 DXCC 实体表（`dxcc.DxccTable`）；未知代码返回 None。
+        """
+        data = self._check_cty()[0]
+        code = dxcc_code(code)
+        if data is None or code not in data.dxcc:
+            return None
+        table = data.dxcc
+        return {'dxcc': code, 'name': table.name(code), 'continent': table.continent(code),
+                'cq_zone': table.cq_zones[code] or None, 'itu_zone': table.itu_zones[code] or None,
+                'deleted': table.is_deleted(code)}
+
+    def dxcc_name(self, code: Any) -> Optional[str]:
+        """DXCC 代码对应的实体名称，未知代码返回 None。"""
+        entity = self.dxcc_entity(code)
+        return entity['name'] if entity else None
 
     def parse_callsign(self, callsign: str) -> Dict[str, Optional[str]]:
-        """解析呼号，返回国家（display name）、大洲和 DXCC（数字字符串或 None）。"""
+        """解析呼号，返回国家（display name）、大洲、DXCC（整数代码或 None）以及 CQ/ITU 分区。"""
         if not callsign or not isinstance(callsign, str):
-            return {'country': None, 'continent': None, 'dxcc': None}
+            return dict(_EMPTY_INFO)
+        return dict(self._resolve(callsign.strip().upper())[0])
 
-        cs = callsign.strip().upper()
+    def _resolve(self, cs: str) -> Tuple[Dict[str, Any], Optional[str]]:
+        """经缓存解析规范化后的呼号，返回 (解析结果, 中国省份)。返回的字典与缓存共享，不应修改。"""
+        state = self._check_cty()
+        entry = self.cache.get(cs)
+        if entry is None:
+            entry = self._entry(cs, state)
+            self.cache.put_many({cs: entry}, state[0])
+        return entry
 
+    def _check_cty(self) -> tuple:
+        """返回当前的 (cty 数据快照, 回退索引)；cty.dat 重新加载过时先切换到新快照。"""
+        state = self._state
+        if _cty_module is None:
+            return state
+        data = _cty_module.current()
+        if state[0] is data:
+            return state
+        with self._switch_lock:
+            if self._state[0] is not data:
+                fallback_index = build_fallback_index(data.condensed_lines)
+                self.condensed_lines = data.condensed_lines
+                self._prefix_map = data.prefix_to_dxcc
+                self._fallback_index = fallback_index
+                # 旧快照的解析结果随之作废
+                self.cache.validate(data)
+                self._interned.clear()
+                self._state = (data, fallback_index)
+                logger.info('呼号解析已切换到 cty 版本 %s', data.version)
+            return self._state
+
+    def _entry(self, cs: str, state: tuple = None) -> Tuple[Dict[str, Any], Optional[str]]:
+        """不经缓存解析规范化后的呼号，返回 (解析结果, 中国省份)。"""
+        info = self._parse_uncached(cs, state)
+        info = self._interned.setdefault(tuple(info.values()), info)
+        province = None
+        if info['country'] and str(info['country']).strip().lower() == 'china':
+            province = self.get_province_by_callsign(cs)
+        return info, province
+
+    def _parse_uncached(self, cs: str, state: tuple = None) -> Dict[str, Any]:
+        """不经缓存解析规范化后的呼号；`state` 为 `_check_cty()` 返回的快照，缺省时取当前快照。"""
+        data, fallback_index = state or self._check_cty()
         country = None
-        # 首先尝试使用更完整的前缀表（如果存在）进行最长前缀匹配
-        if self._find_country:
-            res = self._find_country(cs)
-            if res:
-                _, country = res
+        continent = None
+        dxcc = None
+        cq_zone = itu_zone = None
+        entity = None
+        # 首先在 cty.dat 索引中查找：精确呼号优先，其次最长前缀，实体自带大洲与分区
+        if data is not None:
+            entity = data.cty.lookup(cs)
+            if entity:
+                country = entity.name
+                continent = entity.continent
+                dxcc = entity.dxcc or None
+                cq_zone, itu_zone = entity.cq_zone, entity.itu_zone
 
-        # 回退策略：尝试从简化的 CONDENSED_LINES 中做简单匹配（prefix text -> country）
+        # 回退策略：在 CONDENSED_LINES 中匹配呼号前缀（prefix text -> country）
         if not country:
-            for line in self.condensed_lines:
-                try:
-                    parts, cname = line.split(':', 1)
-                    parts = parts.split(',')
-                    cname = cname.strip()
-                except Exception:
-                    continue
-                for p in parts:
-                    p = p.strip()
-                    token = p.split('-')[0]
-                    if cs.startswith(token):
-                        country = cname
-                        break
-                if country:
-                    break
+            country = self._fallback_country(cs, fallback_index)
 
         # 若未找到 country，则不再使用启发式回退，依赖 cty.dat 数据和前缀映射
 
-        # 使用不区分大小写的映射来查找 continent 与 dxcc
+        # 回退匹配得到的国家没有实体数据，使用不区分大小写的简化映射查找 continent 与 dxcc
         country_key = str(country).strip().lower() if country else None
-        continent = _COUNTRY_TO_CONTINENT_LOWER.get(country_key) if country_key else None
-        dxcc_val = _COUNTRY_TO_DXCC_LOWER.get(country_key) if country_key else None
-        dxcc = str(dxcc_val) if dxcc_val is not None else None
+        if continent is None and country_key:
+            continent = _COUNTRY_TO_CONTINENT_LOWER.get(country_key)
+        if dxcc is None and country_key:
+            dxcc = _COUNTRY_TO_DXCC_LOWER.get(country_key)
+        # 回退匹配没有实体数据：大洲和分区取 DXCC 实体表中该实体的值
+        if entity is None and dxcc and data is not None:
+            table = data.dxcc
+            continent = continent or table.continent(dxcc)
+            cq_zone = table.cq_zones[dxcc] or None
+            itu_zone = table.itu_zones[dxcc] or None
+
+        return {'country': country, 'continent': continent, 'dxcc': dxcc,
+                'cq_zone': cq_zone, 'itu_zone': itu_zone}
 
-        return {'country': country, 'continent': continent, 'dxcc': dxcc}
+    def _fallback_country(self, cs: str, fallback_index: tuple = None) -> Optional[str]:
+        """CONDENSED_LINES 中第一行含有 `cs` 前缀 token 的国家名。"""
+        first_line, names, longest = fallback_index or self._fallback_index
+        best = None
+        for length in range(min(len(cs), longest) + 1):
+            row = first_line.get(cs[:length])
+            if row is not None and (best is None or row < best):
+                best = row
+        return names[best] if best is not None else None
 
     def get_province_by_callsign(self, callsign):
         """通过呼号获取对应的省份代码
@@ -114,53 +344,178 @@ class CallsignParser:
         # 使用导入的映射函数
         return get_province_from_map(callsign)
     
+    def _resolve_distinct(self, callsigns) -> Dict[Any, Tuple[Dict[str, Any], Optional[str]]]:
+        """对一批呼号去重后逐个解析，返回 原始呼号 -> (解析结果, 中国省份)；非字符串与空值归到键 None。"""
+        normalized = {c: c.strip().upper() for c in {c for c in callsigns if isinstance(c, str) and c}}
+        wanted = set(normalized.values())
+        state = self._check_cty()
+        found = self.cache.get_many(wanted)
+        missing = {cs: self._entry(cs, state) for cs in wanted if cs not in found}
+        self.cache.put_many(missing, state[0])
+        found.update(missing)
+        resolved = {raw: found[cs] for raw, cs in normalized.items()}
+        resolved[None] = _EMPTY_ENTRY
+        return resolved
+
+    def resolve_many(self, callsigns) -> list:
+        """批量解析呼号：不同的呼号只解析一次，按输入顺序返回 `parse_callsign` 形式的结果。
+
+        返回的字典在相同实体的呼号之间共享，调用方不应修改。
+        """
+        callsigns = list(callsigns)
+        resolved = self._resolve_distinct(callsigns)
+        return [resolved[c if isinstance(c, str) and c else None][0] for c in callsigns]
+
     def enhance_record(self, record: Dict) -> Dict:
         """增强单条记录：若缺少 country/continent/dxcc，从 `call` 字段推断并填充。"""
         enhanced = record.copy()
         callsign = enhanced.get('call') or enhanced.get('CALL')
         if not callsign:
             return enhanced
+        if isinstance(callsign, str):
+            return self._apply(enhanced, self._resolve(callsign.strip().upper()))
+        return self._apply(enhanced, _EMPTY_ENTRY)
+
+    def _apply(self, enhanced: Dict, entry: Tuple[Dict[str, Any], Optional[str]]) -> Dict:
+        """把解析结果填入记录副本中缺少的字段。"""
+        info, province = entry
 
-        info = self.parse_callsign(callsign)
-        country_key = None
-        if info['country']:
-            country_key = str(info['country']).strip().lower()
-            
         # 填充国家、大洲和DXCC信息
         if not enhanced.get('country') and info['country']:
             enhanced['country'] = info['country']
         if not enhanced.get('continent') and info['continent']:
             enhanced['continent'] = info['continent']
         if not enhanced.get('dxcc') and info['dxcc']:
-            enhanced['dxcc'] = info['dxcc']
+            # 记录字段保持 ADIF 的字符串形式
+            enhanced['dxcc'] = str(info['dxcc'])
         
         # 填充省份信息
         if not enhanced.get('state'):
             # 检查DXCC代码
-            dxcc_val = enhanced.get('dxcc')
-            if dxcc_val:
-                try:
-                    dxcc_int = int(str(dxcc_val))
-                    # 根据DXCC代码设置省份
-                    if dxcc_int == 386:
-                        enhanced['state'] = 'TW'  # Taiwan
-                    elif dxcc_int == 321:
-                        enhanced['state'] = 'HK'  # Hong Kong
-                    elif dxcc_int == 152:
-                        enhanced['state'] = 'MO'  # Macau
-                except (ValueError, TypeError):
-                    pass
-            
-            # 针对中国大陆呼号
-            if not enhanced.get('state') and country_key == 'china':
-                province = self.get_province_by_callsign(callsign)
-                if province:
-                    enhanced['state'] = province
+            # 根据DXCC代码设置省份（台湾、香港、澳门）
+            state = DXCC_TO_STATE.get(dxcc_code(enhanced.get('dxcc')))
+            if state:
+                enhanced['state'] = state
+
+            # 针对中国大陆呼号（省份已随解析结果缓存）
+            if not enhanced.get('state') and province:
+                enhanced['state'] = province
         
         return enhanced
 
     def enhance_records(self, records: list) -> list:
-        return [self.enhance_record(r) for r in records]
+        """批量增强：先对整批呼号去重解析，再把结果广播到各条记录的副本。
+
+        传入 `ColumnarLog` 时返回按列增强后的新 `ColumnarLog`（见 `enhance_columnar`）。
+        """
+        if isinstance(records, ColumnarLog):
+            return self.enhance_columnar(records)
+        if not isinstance(records, list):
+            records = list(records)
+        calls = [r.get('call') or r.get('CALL') for r in records]
+        resolved = self._resolve_distinct(calls)
+        apply = self._apply
+        out = []
+        for record, call in zip(records, calls):
+            enhanced = record.copy()
+            if call:
+                apply(enhanced, resolved[call if isinstance(call, str) else None])
+            out.append(enhanced)
+        return out
+
+    def enhance_columnar(self, log: ColumnarLog) -> ColumnarLog:
+        """列式增强：call 列去重解析后广播，返回填充了 country/continent/dxcc/state 的新 `ColumnarLog`。
+
+        填充规则与 `enhance_record` 相同。除了对 call 列做一次编码，其余运算都在不同呼号
+        或分类编码上进行，再用下标数组广播到各行；未改动的列与原日志共享。
+        """
+        n = len(log)
+        calls = log.column('call')
+        keys = [c if isinstance(c, str) and c else None for c in calls]
+        resolved = self._resolve_distinct(keys)
+        distinct = list(resolved)
+        position = {c: i for i, c in enumerate(distinct)}
+        inverse = np.fromiter((position[c] for c in keys), dtype=np.intp, count=n)
+        entries = [resolved[c] for c in distinct]
+
+        def per_call(values):
+            arr = np.empty(len(values), dtype=object)
+            arr[:] = values
+            return arr[inverse]
+
+        columns = dict(log.columns)
+        columns['country'] = _fill(log.column('country'), per_call([info['country'] for info, _ in entries]))
+        columns['continent'] = _fill(log.column('continent'), per_call([info['continent'] for info, _ in entries]))
+
+        categorical = dict(log.categorical)
+        dxcc = _fill_categorical(log.categorical['dxcc'],
+                                 [str(info['dxcc']) if info['dxcc'] else None for info, _ in entries], inverse)
+        categorical['dxcc'] = dxcc
+
+        # state：先按（填充后的）DXCC 代码取台湾/香港/澳门，再取中国大陆呼号的省份
+        state_cat = log.categorical['state']
+        state_names = list(state_cat.categories)
+        state_index = {name: i for i, name in enumerate(state_names)}
+
+        def state_code(name):
+            if not name:
+                return -1
+            code = state_index.get(name)
+            if code is None:
+                code = state_index[name] = len(state_names)
+                state_names.append(name)
+            return code
+
+        by_dxcc = np.array([state_code(DXCC_TO_STATE.get(dxcc_code(c))) for c in dxcc.categories] + [-1],
+                           dtype=np.int32)[dxcc.codes]
+        by_province = np.array([state_code(province) for _, province in entries], dtype=np.int32)[inverse]
+        derived = np.where(by_dxcc >= 0, by_dxcc, by_province)
+        # 没有呼号的记录保持原样
+        derived[~_truthy(calls).astype(bool)] = -1
+        present = _truthy_codes(state_cat)
+        codes = np.where(present | (derived < 0), state_cat.codes, derived).astype(np.int32)
+        categorical['state'] = Categorical(codes, state_names, state_cat.repeated)
+
+        fields = list(log.fields)
+        for key in ('country', 'continent', 'dxcc', 'state'):
+            if key not in fields:
+                fields.append(key)
+        return ColumnarLog(fields, columns, categorical, log.qso_epoch, n)
+
+
+_truthy = np.frompyfunc(bool, 1, 1) if np is not None else None
+
+
+def _fill(existing, new):
+    """`existing` 中为空（None/空字符串）而 `new` 有值的行取 `new`。"""
+    take = ~_truthy(existing).astype(bool) & _truthy(new).astype(bool)
+    return np.where(take, new, existing)
+
+
+def _truthy_codes(cat: Categorical):
+    """分类列中取值非空的行。"""
+    truthy = np.array([bool(c) for c in cat.categories] + [False], dtype=bool)
+    return truthy[cat.codes]
+
+
+def _fill_categorical(cat: Categorical, new_values: list, inverse) -> Categorical:
+    """分类列版本的 `_fill`：`new_values` 按不同呼号给出，经 `inverse` 广播到各行。"""
+    categories = list(cat.categories)
+    index = {c: i for i, c in enumerate(categories)}
+    new_codes = []
+    for value in new_values:
+        if not value:
+            new_codes.append(-1)
+            continue
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(categories)
+            categories.append(value)
+        new_codes.append(code)
+    row_codes = np.array(new_codes, dtype=np.int32)[inverse]
+    present = _truthy_codes(cat)
+    codes = np.where(present | (row_codes < 0), cat.codes, row_codes).astype(np.int32)
+    return Categorical(codes, categories, cat.repeated)
 
 
 # 全局实例
@@ -1,7 +1,11 @@
 """中国呼号与省份映射表
 
 该文件包含中国业余无线电呼号前缀与省份/地区的对应关系，用于WAPC奖状的省份识别。
+
+导入时把呼号段编译为区间索引：以呼号前三位（前缀字母 + 分区数字，如 'BA1'）为键，
+值为按起点排序的区间数组，查找时一次字典访问加一次 `bisect`。
 """
+from bisect import bisect_right
 
 # 中国呼号段与省份/地区的映射关系
 # 格式：省份代码 -> 呼号段列表
@@ -228,14 +232,63 @@ def get_province_by_callsign(callsign):
             return 'MO'
         return None
     
-    # 遍历所有省份的呼号段
-    for province_code, segments in CHINA_CALLSIGN_PROVINCE_MAP.items():
-        for segment in segments:
-            # 解析呼号段
-            start_call, end_call = parse_callsign_segment(segment)
-            
-            # 检查呼号是否在当前呼号段内
-            if is_callsign_in_segment(callsign_upper, start_call, end_call):
+    return _PROVINCE_INDEX.lookup(callsign_upper)
+
+
+class ProvinceIndex:
+    """呼号段的区间索引，结果与逐段比较 `start <= 呼号 <= end` 并取第一个匹配的省份相同。
+
+    每个呼号段的起止呼号前三位相同（如 'BA1AA-BA1XZ'），落在段内的呼号必然也以这三位开头，
+    因此按前三位分组后只需在组内查找。组内区间互不重叠时按起点排序，二分找到起点不大于呼号的
+    最后一个区间再比较终点；有重叠的组保留原顺序逐段比较。起止前缀不同的段放在 `_linear` 中
+    逐段比较，与组内结果按在映射表中的先后取前者。
+    """
+    __slots__ = ('_groups', '_linear')
+
+    def __init__(self, province_map):
+        grouped = {}
+        self._linear = []
+        order = 0
+        for province_code, segments in province_map.items():
+            for segment in segments:
+                start_call, end_call = parse_callsign_segment(segment)
+                start_call, end_call = start_call.upper(), end_call.upper()
+                interval = (start_call, end_call, order, province_code)
+                if len(start_call) >= 3 and start_call[:3] == end_call[:3]:
+                    grouped.setdefault(start_call[:3], []).append(interval)
+                else:
+                    self._linear.append(interval)
+                order += 1
+        # 前缀 -> (起点数组, 终点数组, 顺序数组, 省份数组)，或按原顺序排列的区间列表
+        self._groups = {}
+        for key, intervals in grouped.items():
+            ordered = sorted(intervals)
+            if all(a[1] < b[0] for a, b in zip(ordered, ordered[1:])):
+                self._groups[key] = tuple(list(col) for col in zip(*ordered))
+            else:
+                self._groups[key] = intervals
+
+    def lookup(self, callsign_upper):
+        """`callsign_upper` 须已去空白并转为大写。"""
+        found = None
+        group = self._groups.get(callsign_upper[:3])
+        if group is not None:
+            if isinstance(group, tuple):
+                starts, ends, orders, provinces = group
+                i = bisect_right(starts, callsign_upper) - 1
+                if i >= 0 and callsign_upper <= ends[i]:
+                    found = (orders[i], provinces[i])
+            else:
+                for start_call, end_call, order, province_code in group:
+                    if start_call <= callsign_upper <= end_call:
+                        found = (order, province_code)
+                        break
+        for start_call, end_call, order, province_code in self._linear:
+            if found is not None and order > found[0]:
+                break
+            if start_call <= callsign_upper <= end_call:
                 return province_code
-    
-    return None
\ No newline at end of file
+        return found[1] if found is not None else None
+
+
+_PROVINCE_INDEX = ProvinceIndex(CHINA_CALLSIGN_PROVINCE_MAP)
@@ -0,0 +1,96 @@
+"""一份日志的共享增强结果。
+
+奖状检查都基于同一份增强后的记录（由呼号补全 country/continent/dxcc/state）。`PreparedLog`
+只在第一次需要时增强一次，之后所有奖状共用；cty.dat 热更新后（版本号变化）下一次访问时重新增强。
+
+`PreparedLogCache` 按调用方给出的键（如 本台呼号 + QSO 历史版本、上传内容的摘要）保存最近使用的
+若干份 `PreparedLog`，上传后的奖状检查、`/api/check_award` 和结果页重新检查可以复用同一次增强。
+缓存的记录在请求结束后仍会被使用，不能是随请求关闭的 mmap 上的视图。
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+# 默认最多缓存多少份日志的增强结果
+PREPARED_LOG_CACHE_SIZE = 4
+
+
+class PreparedLog:
+    """原始记录 + 按需计算、只计算一次的派生数据。
+
+    `records` 为原始记录（列表或 `ColumnarLog`），调用方不应再修改；`enhanced` 为增强后的记录，
+    各奖状只读使用。
+    """
+    __slots__ = ('records', 'parser', '_enhanced', '_cty_version', '_lock')
+
+    def __init__(self, records, parser):
+        if not isinstance(records, list) and not hasattr(records, 'column'):
+            records = list(records)
+        self.records = records
+        self.parser = parser
+        self._enhanced = None
+        self._cty_version = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def enhanced(self):
+        """增强后的记录；与当前 cty.dat 版本不符时重新增强。"""
+        version = self.parser.cty_version()
+        enhanced = self._enhanced
+        if enhanced is not None and version == self._cty_version:
+            return enhanced
+        with self._lock:
+            if self._enhanced is None or version != self._cty_version:
+                self._enhanced = self.parser.enhance_records(self.records)
+                self._cty_version = version
+            return self._enhanced
+
+    @property
+    def cty_version(self) -> Optional[str]:
+        """`enhanced` 所依据的 cty.dat 版本（尚未增强时为 None）。"""
+        return self._cty_version
+
+
+class PreparedLogCache:
+    """按键保存最近使用的 `PreparedLog`（线程安全的 LRU）。"""
+
+    def __init__(self, capacity: int = PREPARED_LOG_CACHE_SIZE):
+        self.capacity = capacity
+        self._data: 'OrderedDict[Hashable, PreparedLog]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_prepare(self, key: Hashable, records, parser) -> PreparedLog:
+        """返回 `key` 对应的 `PreparedLog`；不存在时用 `records` 新建。
+
+        键应能唯一标识日志内容（例如 QSO 历史的版本号），内容变化时换一个键。
+        """
+        with self._lock:
+            prepared = self._data.get(key)
+            if prepared is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return prepared
+            self.misses += 1
+        prepared = PreparedLog(records, parser)
+        if self.capacity > 0:
+            with self._lock:
+                prepared = self._data.setdefault(key, prepared)
+                self._data.move_to_end(key)
+                while len(self._data) > self.capacity:
+                    self._data.popitem(last=False)
+        return prepared
+
+    def get(self, key: Hashable) -> Optional[PreparedLog]:
+        with self._lock:
+            prepared = self._data.get(key)
+            if prepared is not None:
+                self._data.move_to_end(key)
+            return prepared
+
+    def stats(self) -> Dict[str, Any]:
+        return {'size': len(self._data), 'capacity': self.capacity, 'hits': self.hits, 'misses': self.misses}
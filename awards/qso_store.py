@@ -0,0 +1,289 @@
+"""按本台呼号保存的 QSO 历史（SQLite）。
+
+LoTW 可以只下载某日期之后的 QSO/QSL。上传的日志（完整或增量）通过 `ingest()` 合并进库：
+以 QSO 指纹 (call, band, mode, qso_datetime) 为唯一键做 upsert，已存在的 QSO 在原记录上更新字段
+（确认信息只会升级，不会被后来的未确认记录覆盖）。奖状检查随后对 `records()` 返回的完整历史进行，
+不必每次都上传并解析全部历史日志。
+
+`records()` 的结果按呼号缓存在进程内，并以 `station.version` 判断是否过期；
+`ingest()` 把增量直接应用到已缓存的历史上，因此一次几百条 QSO 的增量上传不需要重新读取整个历史。
+
+`save_award_state()` / `load_award_state()` 保存每个呼号的增量奖状状态（见 `award_state.py`），
+并记录它对应的历史版本号。状态中每个 QSO 的位掩码单独存放在 `award_qso` 表中，每次只写入有变化的行，
+`load_award_masks()` 只读取本次上传涉及的 QSO，保存和恢复状态的开销都与历史长度无关。
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# 确认相关字段：已确认（QSL_RCVD=Y）的 QSO 不会被未确认的记录降级
+CONFIRMATION_FIELDS = ('qsl_rcvd', 'qslrdate', 'app_lotw_rxqsl', 'app_lotw_qslmode')
+
+# 进程内最多缓存多少个呼号的历史
+HISTORY_CACHE_STATIONS = 4
+
+# load_award_masks() 每条 IN 查询的参数个数（SQLite 默认上限 999）
+_MASK_QUERY_CHUNK = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS qso (
+    own_call     TEXT NOT NULL,
+    call         TEXT NOT NULL,
+    band         TEXT NOT NULL,
+    mode         TEXT NOT NULL,
+    qso_datetime TEXT NOT NULL,
+    record       TEXT NOT NULL,
+    updated_at   INTEGER NOT NULL,
+    UNIQUE (own_call, call, band, mode, qso_datetime)
+);
+CREATE TABLE IF NOT EXISTS station (
+    own_call    TEXT PRIMARY KEY,
+    last_qsl    TEXT,
+    version     INTEGER NOT NULL DEFAULT 0,
+    updated_at  INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS award_state (
+    own_call    TEXT PRIMARY KEY,
+    version     INTEGER NOT NULL,
+    state       TEXT NOT NULL,
+    updated_at  INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS award_qso (
+    own_call    TEXT NOT NULL,
+    qso_id      TEXT NOT NULL,
+    mask        INTEGER NOT NULL,
+    PRIMARY KEY (own_call, qso_id)
+);
+"""
+
+_KEY_WHERE = 'own_call=? AND call=? AND band=? AND mode=? AND qso_datetime=?'
+
+
+def _first(value):
+    if isinstance(value, list):
+        return value[0] if value else ''
+    return value or ''
+
+
+def qso_fingerprint(record) -> Optional[Tuple[str, str, str, str]]:
+    """(call, band, mode, qso_datetime)；没有呼号的记录返回 None。
+
+    没有可解析的 `qso_datetime` 时退回原始的 QSO_DATE + TIME_ON。
+    """
+    call = str(_first(record.get('call'))).strip().upper()
+    if not call:
+        return None
+    band = str(_first(record.get('band'))).strip().upper()
+    mode = str(_first(record.get('mode'))).strip().upper()
+    when = record.get('qso_datetime')
+    if not when:
+        when = f"{_first(record.get('qso_date'))}T{_first(record.get('time_on'))}"
+    return call, band, mode, when
+
+
+def _merge(old: Dict, new: Dict) -> Dict:
+    """新记录覆盖旧字段；旧记录已确认而新记录未确认时保留旧的确认信息。"""
+    merged = dict(old)
+    merged.update(new)
+    if str(_first(old.get('qsl_rcvd'))).upper() == 'Y' and str(_first(new.get('qsl_rcvd'))).upper() != 'Y':
+        for key in CONFIRMATION_FIELDS:
+            if key in old:
+                merged[key] = old[key]
+    return merged
+
+
+class _History:
+    """某呼号已加载的历史：记录列表 + 指纹 -> 下标。"""
+    __slots__ = ('version', 'records', 'index')
+
+    def __init__(self, version: int, records: List[Dict]):
+        self.version = version
+        self.records = records
+        self.index = {}
+        for i, rec in enumerate(records):
+            key = qso_fingerprint(rec)
+            if key is not None:
+                self.index[key] = i
+
+
+class QSOStore:
+    """SQLite 中的 QSO 历史。每次操作使用独立连接，可在多线程的 Flask 进程中共享。"""
+
+    def __init__(self, path: str, cache_stations: int = HISTORY_CACHE_STATIONS):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.cache_stations = cache_stations
+        self._cache: 'OrderedDict[str, _History]' = OrderedDict()
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """打开连接；正常结束时提交，出错时回滚，最后关闭。"""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _version(conn, own_call: str) -> int:
+        row = conn.execute('SELECT version FROM station WHERE own_call=?', (own_call,)).fetchone()
+        return row[0] if row else 0
+
+    def ingest(self, own_call: str, records: Iterable, header: Optional[Dict] = None,
+               changed: Optional[List[Dict]] = None) -> Dict[str, int]:
+        """把一批记录合并进 `own_call` 的历史，返回 inserted/updated/unchanged/skipped 计数。
+
+        给出 `changed` 列表时，新插入的记录和更新后的记录依次追加到其中，供增量奖状状态使用。
+        """
+        own_call = own_call.strip().upper()
+        now = int(time.time())
+        counts = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'skipped': 0}
+        with self._lock, self._connect() as conn:
+            # 立即取得写锁，保证读到的 version 与随后的写入之间没有其他进程插入
+            conn.execute('BEGIN IMMEDIATE')
+            version = self._version(conn, own_call)
+            history = self._cache.get(own_call)
+            if history is not None and history.version != version:
+                history = None
+                del self._cache[own_call]
+
+            cur = conn.cursor()
+            for rec in records:
+                key = qso_fingerprint(rec)
+                if key is None:
+                    counts['skipped'] += 1
+                    continue
+                new = dict(rec)
+                row = cur.execute(f'SELECT record FROM qso WHERE {_KEY_WHERE}', (own_call,) + key).fetchone()
+                if row is None:
+                    cur.execute('INSERT INTO qso (own_call, call, band, mode, qso_datetime, record, updated_at) '
+                                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                                (own_call,) + key + (json.dumps(new, ensure_ascii=False), now))
+                    counts['inserted'] += 1
+                    if changed is not None:
+                        changed.append(new)
+                    if history is not None:
+                        history.index[key] = len(history.records)
+                        history.records.append(new)
+                    continue
+                old = json.loads(row[0])
+                merged = _merge(old, new)
+                if merged == old:
+                    counts['unchanged'] += 1
+                    continue
+                cur.execute(f'UPDATE qso SET record=?, updated_at=? WHERE {_KEY_WHERE}',
+                            (json.dumps(merged, ensure_ascii=False), now, own_call) + key)
+                counts['updated'] += 1
+                if changed is not None:
+                    changed.append(merged)
+                if history is not None:
+                    history.records[history.index[key]] = merged
+
+            last_qsl = _first((header or {}).get('app_lotw_lastqsl')) or None
+            cur.execute(
+                'INSERT INTO station (own_call, last_qsl, version, updated_at) VALUES (?, ?, 1, ?) '
+                'ON CONFLICT(own_call) DO UPDATE SET '
+                'last_qsl=CASE WHEN excluded.last_qsl > COALESCE(station.last_qsl, \'\') '
+                'THEN excluded.last_qsl ELSE station.last_qsl END, '
+                'version=station.version + 1, updated_at=excluded.updated_at',
+                (own_call, last_qsl, now))
+            if history is not None:
+                history.version = version + 1
+        return counts
+
+    def records(self, own_call: str) -> List[Dict]:
+        """`own_call` 的全部 QSO（按首次导入的顺序），可直接交给 `AwardChecker`。
+
+        返回的是新列表，但其中的记录字典与缓存共享，调用方不应修改它们。
+        """
+        own_call = own_call.strip().upper()
+        with self._lock:
+            with self._connect() as conn:
+                version = self._version(conn, own_call)
+                history = self._cache.get(own_call)
+                if history is None or history.version != version:
+                    rows = conn.execute('SELECT record FROM qso WHERE own_call=? ORDER BY rowid',
+                                        (own_call,)).fetchall()
+                    loads = json.loads
+                    history = _History(version, [loads(r[0]) for r in rows])
+                    self._cache[own_call] = history
+            self._cache.move_to_end(own_call)
+            while len(self._cache) > self.cache_stations:
+                self._cache.popitem(last=False)
+            return list(history.records)
+
+    def version(self, own_call: str) -> int:
+        """`own_call` 历史的版本号：每次 `ingest()` 加一，可用作按历史内容缓存的键。"""
+        with self._connect() as conn:
+            return self._version(conn, own_call.strip().upper())
+
+    def count(self, own_call: str) -> int:
+        with self._connect() as conn:
+            return conn.execute('SELECT COUNT(*) FROM qso WHERE own_call=?',
+                                (own_call.strip().upper(),)).fetchone()[0]
+
+    def last_qsl(self, own_call: str) -> Optional[str]:
+        """已导入日志中最新的 APP_LoTW_LASTQSL，下次可从该时间起下载增量。"""
+        with self._connect() as conn:
+            row = conn.execute('SELECT last_qsl FROM station WHERE own_call=?',
+                               (own_call.strip().upper(),)).fetchone()
+        return row[0] if row else None
+
+    def save_award_state(self, own_call: str, state: Dict, version: int,
+                         masks: Optional[Dict[str, int]] = None, replace: bool = False) -> None:
+        """保存 `own_call` 的奖状状态（`AwardState.to_dict()`），`version` 为它对应的历史版本号。
+
+        `masks` 为有变化的 QSO 位掩码（`AwardState.pop_masks()`），逐行写入；由完整日志重建的状态
+        传 `replace=True`，先删除旧状态的全部位掩码。状态与位掩码在同一事务中写入。
+        """
+        own_call = own_call.strip().upper()
+        with self._connect() as conn:
+            if replace:
+                conn.execute('DELETE FROM award_qso WHERE own_call=?', (own_call,))
+            if masks:
+                conn.executemany('INSERT OR REPLACE INTO award_qso (own_call, qso_id, mask) VALUES (?, ?, ?)',
+                                 [(own_call, qid, mask) for qid, mask in masks.items()])
+            conn.execute('INSERT OR REPLACE INTO award_state (own_call, version, state, updated_at) '
+                         'VALUES (?, ?, ?, ?)',
+                         (own_call, version, json.dumps(state, ensure_ascii=False), int(time.time())))
+
+    def load_award_state(self, own_call: str) -> Optional[Tuple[int, Dict]]:
+        """(历史版本号, 奖状状态)；没有保存过时返回 None。"""
+        with self._connect() as conn:
+            row = conn.execute('SELECT version, state FROM award_state WHERE own_call=?',
+                               (own_call.strip().upper(),)).fetchone()
+        return (row[0], json.loads(row[1])) if row else None
+
+    def load_award_masks(self, own_call: str, qso_ids: Iterable[Optional[str]]) -> Dict[str, int]:
+        """`qso_ids` 中已保存过的 QSO 位掩码（QSO 编号 -> 位掩码），交给 `AwardState.load_masks()`。"""
+        own_call = own_call.strip().upper()
+        ids = list({qid for qid in qso_ids if qid is not None})
+        masks: Dict[str, int] = {}
+        with self._connect() as conn:
+            for start in range(0, len(ids), _MASK_QUERY_CHUNK):
+                chunk = ids[start:start + _MASK_QUERY_CHUNK]
+                rows = conn.execute('SELECT qso_id, mask FROM award_qso WHERE own_call=? AND qso_id IN (%s)'
+                                    % ','.join('?' * len(chunk)), [own_call] + chunk)
+                masks.update(rows)
+        return masks
+
+    def delete(self, own_call: str) -> None:
+        own_call = own_call.strip().upper()
+        with self._lock, self._connect() as conn:
+            conn.execute('DELETE FROM qso WHERE own_call=?', (own_call,))
+            conn.execute('DELETE FROM station WHERE own_call=?', (own_call,))
+            conn.execute('DELETE FROM award_state WHERE own_call=?', (own_call,))
+            conn.execute('DELETE FROM award_qso WHERE own_call=?', (own_call,))
+            self._cache.pop(own_call, None)
@@ -0,0 +1,157 @@
+"""声明式奖状规则。
+
+内置奖状定义在 `conditions.AWARD_CONDITIONS` 中；此外，`award_rules/` 目录（与 `award_templates/` 同级，
+可由 `AWARD_RULES_DIR` 环境变量指定）下的每个 `.json` / `.yaml` / `.yml` 文件定义一个或多个奖状，
+与内置奖状同名时覆盖之，`"enabled": false` 可停用一个奖状。YAML 需要安装 PyYAML。
+
+    {
+        "code": "WAC",
+        "name": "Worked All Continents (WAC)",
+        "description": "通联全部六大洲",
+        "conditions": [
+            {"type": "distinct_count", "key": "continent", "target": 6,
+             "values": ["AF", "AS", "EU", "NA", "OC", "SA"],
+             "filters": {"confirmed": true}, "label": "大洲"}
+        ]
+    }
+
+文件也可以是 `{"awards": [...]}` 形式的列表。条件的写法见 `aggregator` 模块。
+每个规则在加载时编译一次以检查参数，有错误的文件记录原因（`logging`）后跳过，不影响其他奖状。
+`AwardRules.current()` 在规则文件增删或修改后自动重新加载，并返回新的版本号，
+`AwardChecker` 据此重新编译聚合计划——添加奖状不需要改代码，也不需要重启。
+"""
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import yaml
+except ImportError:
+    # PyYAML 为可选依赖，没有时只加载 JSON 规则
+    yaml = None
+
+from .aggregator import CONDITION_ACCUMULATORS, ENHANCED_COUNTS, PRESET_CONDITIONS, compile_condition
+from .conditions import AWARD_CONDITIONS
+
+logger = logging.getLogger(__name__)
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+AWARD_RULES_DIR = os.environ.get('AWARD_RULES_DIR', os.path.join(project_root, 'award_rules'))
+
+RULE_EXTENSIONS = ('.json', '.yaml', '.yml')
+
+
+def validate_rule(rule: Dict[str, Any]) -> Dict[str, Any]:
+    """检查一个奖状规则，返回 AWARD_CONDITIONS 形式的定义；不合法时抛出 ValueError。"""
+    if not isinstance(rule, dict):
+        raise ValueError('奖状规则必须是对象')
+    code = str(rule.get('code') or '').strip().upper()
+    if not code:
+        raise ValueError('奖状规则缺少 code')
+    conditions = rule.get('conditions')
+    if not isinstance(conditions, list) or not conditions:
+        raise ValueError(f'{code}: conditions 必须是非空列表')
+    for i, condition in enumerate(conditions, 1):
+        if not isinstance(condition, dict):
+            raise ValueError(f'{code}: 第 {i} 个条件必须是对象')
+        ctype = condition.get('type')
+        if ctype not in CONDITION_ACCUMULATORS and ctype not in PRESET_CONDITIONS:
+            raise ValueError(f'{code}: 第 {i} 个条件的类型未知: {ctype!r}')
+        try:
+            compile_condition(condition)
+        except ValueError as e:
+            raise ValueError(f'{code}: 第 {i} 个条件: {e}')
+    enhanced_count = rule.get('enhanced_count')
+    if enhanced_count is not None and enhanced_count not in ENHANCED_COUNTS:
+        raise ValueError(f"{code}: 未知的 enhanced_count: {enhanced_count!r}（可用: {', '.join(ENHANCED_COUNTS)}）")
+    award = {
+        'code': code,
+        'name': rule.get('name') or code,
+        'description': rule.get('description', ''),
+        'conditions': conditions,
+        'enabled': rule.get('enabled', True),
+    }
+    if enhanced_count is not None:
+        award['enhanced_count'] = enhanced_count
+    return award
+
+
+def load_rule_file(path: str) -> List[Dict[str, Any]]:
+    """读取一个规则文件，返回其中经过检查的奖状定义；文件有错误时抛出 ValueError。"""
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.lower().endswith('.json'):
+            try:
+                data = json.load(f)
+            except json.JSONDecodeError as e:
+                raise ValueError(f'JSON 解析错误: {e}')
+        else:
+            if yaml is None:
+                raise ValueError('未安装 PyYAML，无法读取 YAML 规则')
+            try:
+                data = yaml.safe_load(f)
+            except yaml.YAMLError as e:
+                raise ValueError(f'YAML 解析错误: {e}')
+    rules = data.get('awards') if isinstance(data, dict) and 'awards' in data else [data]
+    if not isinstance(rules, list):
+        raise ValueError('awards 必须是列表')
+    return [validate_rule(rule) for rule in rules]
+
+
+class AwardRules:
+    """内置奖状 + 规则目录中的奖状。目录内容变化后下一次 `current()` 时重新加载。"""
+
+    def __init__(self, directory: Optional[str] = None, builtin: Dict[str, Dict[str, Any]] = None):
+        self.directory = directory or AWARD_RULES_DIR
+        self.builtin = AWARD_CONDITIONS if builtin is None else builtin
+        self.version = 0
+        self.errors: Dict[str, str] = {}
+        self._signature = None
+        self._awards: Dict[str, Dict[str, Any]] = dict(self.builtin)
+        self._lock = threading.Lock()
+
+    def _scan(self) -> Tuple[Tuple[str, int, int], ...]:
+        """规则文件的 (文件名, 修改时间, 大小)，用于判断目录内容是否变化。"""
+        try:
+            entries = [e for e in os.scandir(self.directory)
+                       if e.is_file() and e.name.lower().endswith(RULE_EXTENSIONS)]
+        except OSError:
+            return ()
+        return tuple(sorted((e.name, e.stat().st_mtime_ns, e.stat().st_size) for e in entries))
+
+    def current(self) -> Tuple[int, Dict[str, Dict[str, Any]]]:
+        """返回 (版本号, 奖状代码 -> 定义)；返回的字典不应修改。"""
+        signature = self._scan()
+        if signature != self._signature:
+            with self._lock:
+                if signature != self._signature:
+                    self._load(signature)
+        return self.version, self._awards
+
+    def _load(self, signature) -> None:
+        awards = dict(self.builtin)
+        errors = {}
+        for name, _, _ in signature:
+            path = os.path.join(self.directory, name)
+            try:
+                rules = load_rule_file(path)
+            except (OSError, ValueError) as e:
+                errors[name] = str(e)
+                logger.warning('奖状规则 %s 无效，已跳过: %s', name, e)
+                continue
+            for award in rules:
+                code = award.pop('code')
+                if award.pop('enabled'):
+                    awards[code] = award
+                else:
+                    awards.pop(code, None)
+        self._awards = awards
+        self.errors = errors
+        self._signature = signature
+        self.version += 1
+        if signature:
+            logger.info('已加载奖状规则: %d 个文件，共 %d 个奖状', len(signature), len(awards))
+
+    def awards(self) -> Dict[str, Dict[str, Any]]:
+        return self.current()[1]
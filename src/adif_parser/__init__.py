@@ -1,3 +1,10 @@
-from .parser import parse_adif, detect_variant
+from .parser import parse_adif, parse_adif_iter, detect_variant
+from .bytes_parser import parse_adif_bytes, parse_adif_bytes_iter, MappedAdif
+from .records import LazyRecord, CompactRecord, RecordStore
+from .columnar import ColumnarLog
+from .parallel import parse_adif_parallel, parse_adif_file_parallel
 
-__all__ = ['parse_adif', 'detect_variant']
+__all__ = ['parse_adif', 'parse_adif_iter', 'detect_variant',
+           'parse_adif_bytes', 'parse_adif_bytes_iter', 'MappedAdif',
+           'LazyRecord', 'CompactRecord', 'RecordStore', 'ColumnarLog',
+           'parse_adif_parallel', 'parse_adif_file_parallel']
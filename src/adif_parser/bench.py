@@ -0,0 +1,318 @@
+"""解析与奖状检查的性能基准。
+
+    python -m adif_parser.cli bench --qsos 100000 --seed 1
+    python -m src.adif_parser.bench parallel FILE --jobs 1,2,4,8
+    python -m src.adif_parser.bench fallback --calls 20000
+    python -m src.adif_parser.bench province --suffix-len 2
+
+`bench_pipeline` 用 `synthetic.generate_lotw` 生成可复现的日志，分别计时
+`parse_adif`、`CallsignParser.enhance_records` 与 `AwardChecker.check_all_awards`，
+报告 QSO/s、进程峰值 RSS、tracemalloc 统计的分配量以及呼号解析缓存的命中情况，
+输出 JSON 以便跨提交比较。
+
+`bench_parallel` 对同一文件分别以不同进程数做字节模式解析，报告耗时、QSO/s 与相对 jobs=1 的加速比。
+
+`bench_fallback` 测量 cty 索引未命中时 CONDENSED_LINES 回退匹配的单次耗时：与逐行扫描的旧实现
+对比，包括完全不匹配任何前缀的最坏情况，并核对两者结果一致。
+
+`bench_province` 在 BA–BL 全部前缀、0–9 全部分区及所有不超过给定长度的字母后缀上，
+比较中国呼号省份查找的区间索引与逐段解析比较的旧实现，报告单次耗时并核对结果一致。
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:
+    # Windows 没有 resource 模块，峰值 RSS 记为 None
+    resource = None
+
+from .bytes_parser import parse_adif_bytes
+from .parallel import parse_adif_file_parallel
+from .parser import PARSER_VERSION, parse_adif
+from .synthetic import generate_lotw
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def peak_rss_mb() -> Optional[float]:
+    """本进程迄今为止的峰值 RSS（MB）。"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 上单位为 KB，macOS 上为字节
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+                             capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def _measure(fn: Callable[[], Any], qsos: int, repeat: int, allocations: bool) -> Tuple[Dict[str, Any], Any]:
+    """计时 `fn`（取 `repeat` 次中最短），再在 tracemalloc 下单独运行一次统计分配。"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    stats: Dict[str, Any] = {
+        'seconds': round(best, 4),
+        'qsos_per_second': round(qsos / best) if best else None,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+    if allocations:
+        tracemalloc.start()
+        try:
+            kept = fn()
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        del kept
+        stats['alloc_retained_mb'] = round(current / 1e6, 2)
+        stats['alloc_peak_mb'] = round(peak / 1e6, 2)
+    return stats, result
+
+
+def bench_pipeline(qsos: int = 10000, seed: int = 1, china_share: float = 0.3,
+                   multibyte_share: float = 0.0, repeat: int = 1, allocations: bool = True,
+                   use_bytes: bool = False) -> Dict[str, Any]:
+    """生成合成日志并分阶段计时，返回可直接 `json.dump` 的结果。"""
+    if PROJECT_ROOT not in sys.path:
+        sys.path.insert(0, PROJECT_ROOT)
+    # awards 在导入和检查时会打印调试信息，基准输出只保留 JSON
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        from awards.callsign_parser import callsign_parser
+        from awards.checker import AwardChecker
+        checker = AwardChecker()
+
+        t0 = time.perf_counter()
+        text = generate_lotw(qsos, seed=seed, china_share=china_share, multibyte_share=multibyte_share)
+        data = text.encode('utf-8')
+        generate_seconds = time.perf_counter() - t0
+
+        if use_bytes:
+            parse = lambda: parse_adif_bytes(data)
+        else:
+            parse = lambda: parse_adif(text)
+        parse_stats, (_, records) = _measure(parse, qsos, repeat, allocations)
+        enhance_stats, _ = _measure(lambda: callsign_parser.enhance_records(records), qsos, repeat, allocations)
+        check_stats, _ = _measure(lambda: checker.check_all_awards(records), qsos, repeat, allocations)
+
+    return {
+        'params': {
+            'qsos': qsos, 'seed': seed, 'china_share': china_share, 'multibyte_share': multibyte_share,
+            'repeat': repeat, 'bytes': use_bytes,
+        },
+        'env': {
+            'git': _git_revision(), 'parser_version': PARSER_VERSION,
+            'python': platform.python_version(), 'platform': platform.platform(), 'cpus': os.cpu_count(),
+        },
+        'log': {'bytes': len(data), 'records': len(records), 'generate_seconds': round(generate_seconds, 4)},
+        'parse': parse_stats,
+        'enhance_records': enhance_stats,
+        'callsign_cache': callsign_parser.cache_stats(),
+        'check_all_awards': check_stats,
+    }
+
+
+def bench_parallel(path: str, jobs_list: List[int], repeat: int = 3) -> List[Dict[str, Any]]:
+    """每个进程数取 `repeat` 次中的最短耗时。"""
+    results: List[Dict[str, Any]] = []
+    base = None
+    for jobs in jobs_list:
+        best = None
+        count = 0
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            _, records = parse_adif_file_parallel(path, jobs)
+            elapsed = time.perf_counter() - t0
+            count = len(records)
+            best = elapsed if best is None else min(best, elapsed)
+        if base is None:
+            base = best
+        results.append({
+            'jobs': jobs,
+            'seconds': round(best, 4),
+            'qsos': count,
+            'qsos_per_second': round(count / best) if best else None,
+            'speedup': round(base / best, 2) if best else None,
+        })
+    return results
+
+
+def _scan_condensed_lines(lines: List[str], cs: str) -> Optional[str]:
+    """旧的回退实现：逐行逐 token 检查 `startswith`，作为对比基准与语义参照。"""
+    for line in lines:
+        try:
+            parts, cname = line.split(':', 1)
+            parts = parts.split(',')
+            cname = cname.strip()
+        except Exception:
+            continue
+        for p in parts:
+            token = p.strip().split('-')[0]
+            if cs.startswith(token):
+                if cname:
+                    return cname
+                break
+    return None
+
+
+def bench_fallback(calls: int = 20000, seed: int = 1) -> Dict[str, Any]:
+    """回退匹配的单次耗时（ns）：cty 索引未命中的呼号、以及不匹配任何前缀的最坏情况。"""
+    import random
+    if PROJECT_ROOT not in sys.path:
+        sys.path.insert(0, PROJECT_ROOT)
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        from awards.callsign_parser import CONDENSED_LINES, callsign_parser
+    r = random.Random(seed)
+    alphabet = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'
+    # 随机串中 cty 索引查不到的（如 Q 开头、数字开头的非法前缀），以及全部 token 都不匹配的串
+    misses: List[str] = []
+    while len(misses) < calls:
+        cs = ''.join(r.choice(alphabet) for _ in range(r.randint(3, 8)))
+        if callsign_parser._lookup_entity is None or callsign_parser._lookup_entity(cs) is None:
+            misses.append(cs)
+    worst = [cs for cs in misses if _scan_condensed_lines(CONDENSED_LINES, cs) is None] or misses[:1]
+
+    results: Dict[str, Any] = {'lines': len(CONDENSED_LINES), 'misses': len(misses), 'worst_case': len(worst)}
+    for label, sample in (('miss', misses), ('worst_case', worst)):
+        for name, fn in (('scan', lambda cs: _scan_condensed_lines(CONDENSED_LINES, cs)),
+                         ('indexed', callsign_parser._fallback_country)):
+            t0 = time.perf_counter()
+            for cs in sample:
+                fn(cs)
+            results[f'{label}_{name}_ns'] = round((time.perf_counter() - t0) / len(sample) * 1e9)
+        results[f'{label}_speedup'] = round(results[f'{label}_scan_ns'] / max(results[f'{label}_indexed_ns'], 1), 1)
+    results['identical'] = all(_scan_condensed_lines(CONDENSED_LINES, cs) == callsign_parser._fallback_country(cs)
+                               for cs in misses)
+    return results
+
+
+def _scan_province_segments(callsign: str) -> Optional[str]:
+    """旧的省份查找：逐省逐段解析 'BA1AA-BA1XZ' 并比较字符串，作为对比基准与语义参照。"""
+    from awards.china_callsign_province_map import (CHINA_CALLSIGN_PROVINCE_MAP, is_callsign_in_segment,
+                                                    parse_callsign_segment)
+    if not callsign or not isinstance(callsign, str):
+        return None
+    callsign_upper = callsign.strip().upper()
+    if not callsign_upper.startswith('B'):
+        if callsign_upper.startswith(('VR2', 'VS2', 'VT2')):
+            return 'HK'
+        elif callsign_upper.startswith('XX9'):
+            return 'MO'
+        return None
+    for province_code, segments in CHINA_CALLSIGN_PROVINCE_MAP.items():
+        for segment in segments:
+            start_call, end_call = parse_callsign_segment(segment)
+            if is_callsign_in_segment(callsign_upper, start_call, end_call):
+                return province_code
+    return None
+
+
+def province_call_patterns(suffix_len: int = 2) -> List[str]:
+    """BA–BL 每个前缀、每个分区数字，加上长度 1..`suffix_len` 的全部字母后缀。"""
+    import itertools
+    import string
+    suffixes = [''.join(p) for n in range(1, suffix_len + 1)
+                for p in itertools.product(string.ascii_uppercase, repeat=n)]
+    return [f'B{letter}{zone}{suffix}' for letter in 'ABCDEFGHIJKL' for zone in '0123456789'
+            for suffix in suffixes]
+
+
+def bench_province(suffix_len: int = 2) -> Dict[str, Any]:
+    """省份查找的单次耗时（ns）：区间索引与逐段扫描，并核对所有呼号的结果一致。"""
+    if PROJECT_ROOT not in sys.path:
+        sys.path.insert(0, PROJECT_ROOT)
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        from awards.china_callsign_province_map import get_province_by_callsign
+    calls = province_call_patterns(suffix_len)
+    results: Dict[str, Any] = {'calls': len(calls), 'suffix_len': suffix_len}
+    found: Dict[str, List[Optional[str]]] = {}
+    for name, fn in (('scan', _scan_province_segments), ('indexed', get_province_by_callsign)):
+        t0 = time.perf_counter()
+        found[name] = [fn(cs) for cs in calls]
+        results[f'{name}_ns'] = round((time.perf_counter() - t0) / len(calls) * 1e9)
+    results['speedup'] = round(results['scan_ns'] / max(results['indexed_ns'], 1), 1)
+    results['matched'] = sum(p is not None for p in found['indexed'])
+    results['identical'] = found['scan'] == found['indexed']
+    return results
+
+
+def add_pipeline_arguments(p: argparse.ArgumentParser) -> None:
+    p.add_argument('--qsos', type=int, default=10000, help='合成日志的 QSO 数，默认 10000')
+    p.add_argument('--seed', type=int, default=1, help='随机种子，默认 1')
+    p.add_argument('--china-share', type=float, default=0.3, help='中国大陆呼号的比例，默认 0.3')
+    p.add_argument('--multibyte-share', type=float, default=0.0,
+                   help='带多字节 QTH/NAME 字段的记录比例，默认 0（文本模式下按字符计长会截错，建议配合 --bytes）')
+    p.add_argument('--repeat', type=int, default=1, help='每个阶段重复次数，取最短耗时')
+    p.add_argument('--bytes', action='store_true', help='用 parse_adif_bytes 代替 parse_adif 计时解析阶段')
+    p.add_argument('--no-alloc', action='store_true', help='不做 tracemalloc 分配统计（它会额外运行每个阶段一次）')
+    p.add_argument('-o', '--output', help='结果 JSON 文件路径（默认为 stdout）')
+
+
+def run_pipeline(ns) -> int:
+    result = bench_pipeline(ns.qsos, ns.seed, ns.china_share, ns.multibyte_share, ns.repeat,
+                            allocations=not ns.no_alloc, use_bytes=ns.bytes)
+    if ns.output:
+        with open(ns.output, 'w', encoding='utf-8') as fo:
+            json.dump(result, fo, indent=2)
+    else:
+        json.dump(result, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+    return 0
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description='ADIF 解析性能基准')
+    sub = p.add_subparsers(dest='cmd')
+    pp = sub.add_parser('parallel', help='比较不同进程数下的并行解析耗时')
+    pp.add_argument('file', help='ADIF 文件路径')
+    pp.add_argument('--jobs', default='1,2,4,8', help='逗号分隔的进程数列表，默认 1,2,4,8')
+    pp.add_argument('--repeat', type=int, default=3, help='每组重复次数，取最短耗时')
+
+    add_pipeline_arguments(sub.add_parser('pipeline', help='合成日志上的解析/增强/奖状检查分阶段基准'))
+    pf = sub.add_parser('fallback', help='cty 索引未命中时 CONDENSED_LINES 回退匹配的单次耗时')
+    pf.add_argument('--calls', type=int, default=20000, help='随机未命中呼号的个数，默认 20000')
+    pf.add_argument('--seed', type=int, default=1, help='随机种子，默认 1')
+    pr = sub.add_parser('province', help='中国呼号省份查找：区间索引与逐段扫描对比')
+    pr.add_argument('--suffix-len', type=int, default=2,
+                    help='枚举的后缀最大字母数，默认 2（3 时约 220 万个呼号，逐段扫描需要很久）')
+
+    ns = p.parse_args(argv)
+    if ns.cmd == 'pipeline':
+        return run_pipeline(ns)
+    if ns.cmd == 'fallback':
+        json.dump(bench_fallback(ns.calls, ns.seed), sys.stdout, indent=2)
+        sys.stdout.write('\n')
+        return 0
+    if ns.cmd == 'province':
+        json.dump(bench_province(ns.suffix_len), sys.stdout, indent=2)
+        sys.stdout.write('\n')
+        return 0
+    if ns.cmd != 'parallel':
+        p.print_help()
+        return 1
+    jobs_list = [int(j) for j in ns.jobs.split(',') if j.strip()]
+    json.dump(bench_parallel(ns.file, jobs_list, ns.repeat), sys.stdout, indent=2)
+    sys.stdout.write('\n')
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
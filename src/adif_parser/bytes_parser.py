@@ -0,0 +1,173 @@
+"""字节级 ADIF 解析（bytes / mmap）。
+
+ADIF 的 `:len` 按字节计数，按解码后的文本截取会把中文 QTH/NAME 等多字节字段截错。
+本模块直接在字节缓冲区上按声明长度切分，记录只保存字节偏移（`LazyRecord`），
+字段在被读取时才解码为 `str`。`MappedAdif` 以只读 mmap 方式打开上传的 `.adi` 文件，
+整个解析过程不复制文件内容。
+"""
+import mmap
+import re
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .parser import _add_field, _finish_record, _projection, _unsized_value_end
+from .records import ByteSource, LazyRecord, RecordLayout
+
+TAG_RE_BYTES = re.compile(rb'<([A-Za-z0-9_]+)(?::(\d+))?(?::([A-Za-z]))?>')
+EOH_RE_BYTES = re.compile(rb'<eoh(?::0)?>', re.IGNORECASE)
+
+_SEMICOLON = ord(';')
+
+
+def parse_adif_bytes_iter(buf, encoding: str = 'utf-8', errors: str = 'replace',
+                          fields: Optional[Iterable[str]] = None) -> Iterator[Any]:
+    """在字节缓冲区上流式解析 ADIF：先产出 header（普通字典），再逐条产出 `LazyRecord`。
+
+    与 `parse_adif_iter` 的取值规则（包括 `fields` 投影）一致，只是长度按字节计算。
+    """
+    keep = _projection(fields)
+    src = ByteSource(buf, encoding, errors)
+    search = TAG_RE_BYTES.search
+    keys: Dict[bytes, str] = {}
+    layouts: Dict[Tuple[str, ...], RecordLayout] = {}
+    header: Dict[str, Any] = {}
+    names: List[str] = []
+    offsets: List[int] = []
+    seen_eoh = False
+    skipped = False
+    skipped_content = False
+    buf_len = len(buf)
+    pos = 0
+
+    def make_record() -> LazyRecord:
+        layout_key = tuple(names)
+        layout = layouts.get(layout_key)
+        if layout is None:
+            layout = layouts[layout_key] = RecordLayout(layout_key)
+        return LazyRecord(src, layout, array('Q', offsets))
+
+    while True:
+        m = search(buf, pos)
+        if m is None:
+            break
+        tag, length, _ = m.groups()
+        key = keys.get(tag)
+        if key is None:
+            key = keys[tag] = tag.decode('ascii').lower()
+        val_start = m.end()
+
+        if key == 'eor' or key == 'eoh':
+            # 与 `_iter_adif` 相同：结束标签即使带长度（如 `<EOR:0>`）也只作为结束标记
+            pos = val_start if length is None else min(val_start + int(length), buf_len)
+            if key == 'eor':
+                if names or skipped:
+                    yield _finish_record(make_record())
+                    names = []
+                    offsets = []
+                    skipped = skipped_content = False
+            elif not seen_eoh:
+                seen_eoh = True
+                yield header
+            continue
+        if keep is not None and seen_eoh and not keep[key]:
+            # 投影掉的字段：只移动位置，不记录偏移
+            if length is not None:
+                pos = min(val_start + int(length), buf_len)
+                skipped_content = skipped_content or length != b'0'
+            else:
+                pos = _unsized_value_end(buf, val_start, True, b'<', b';')
+                skipped_content = skipped_content or bool(buf[val_start:pos].strip())
+            skipped = True
+            continue
+        if length is not None:
+            end = min(val_start + int(length), buf_len)
+            pos = end
+        else:
+            end = _unsized_value_end(buf, val_start, True, b'<', b';')
+            pos = end + 1 if end < buf_len and buf[end] == _SEMICOLON else end
+
+        if not seen_eoh:
+            _add_field(header, key, src.decode(val_start, end))
+        else:
+            names.append(key)
+            offsets.append(val_start)
+            offsets.append(end)
+
+    if not seen_eoh:
+        yield header
+
+    # 文件末尾没有 EOR 的记录：排除只包含结束标签（如 APP_LoTW_EOF）的空记录
+    if names or skipped_content:
+        record = make_record()
+        if any(record.values()) or skipped_content:
+            yield _finish_record(record)
+
+
+def parse_adif_bytes(buf, encoding: str = 'utf-8', errors: str = 'replace',
+                     fields: Optional[Iterable[str]] = None) -> Tuple[Dict[str, Any], List[LazyRecord]]:
+    """解析字节形式的 ADIF，返回 (header_dict, records_list)，记录为 `LazyRecord`。"""
+    it = parse_adif_bytes_iter(buf, encoding, errors, fields)
+    header = next(it)
+    return header, list(it)
+
+
+def header_text(buf, encoding: str = 'utf-8', errors: str = 'replace') -> str:
+    """解码 `<EOH>` 之前（含）的头部区域；没有 EOH 时返回空字符串。"""
+    m = EOH_RE_BYTES.search(buf)
+    if not m:
+        return ''
+    return str(buf[:m.end()], encoding, errors)
+
+
+class MappedAdif:
+    """以只读 mmap 方式打开 `.adi` 文件进行字节级解析。
+
+    用法::
+
+        with MappedAdif(path) as adif:
+            header, records = adif.parse()
+
+    记录中的字段在读取时才从映射区解码；关闭后未读取过的字段不可再访问，
+    因此需要在 `close()` 之前完成对记录的使用。
+    """
+
+    def __init__(self, path, encoding: str = 'utf-8', errors: str = 'replace'):
+        self.path = path
+        self.encoding = encoding
+        self.errors = errors
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # 空文件无法映射
+            self._map = None
+
+    @property
+    def buffer(self):
+        return self._map if self._map is not None else b''
+
+    def parse_iter(self, fields: Optional[Iterable[str]] = None) -> Iterator[Any]:
+        return parse_adif_bytes_iter(self.buffer, self.encoding, self.errors, fields)
+
+    def parse(self, fields: Optional[Iterable[str]] = None) -> Tuple[Dict[str, Any], List[LazyRecord]]:
+        return parse_adif_bytes(self.buffer, self.encoding, self.errors, fields)
+
+    def header_text(self) -> str:
+        return header_text(self.buffer, self.encoding, self.errors)
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> 'MappedAdif':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+__all__ = ['parse_adif_bytes_iter', 'parse_adif_bytes', 'header_text', 'MappedAdif']
@@ -0,0 +1,265 @@
+"""按内容寻址的解析结果缓存。
+
+同一份 LoTW 导出常被反复上传。缓存键为文件内容的 SHA-256 加上 `PARSER_VERSION`
+以及影响结果的解析参数（如 `fields` 投影），命中时直接读取上次的解析结果，
+完全跳过解析。
+
+条目为磁盘上的二进制文件：`MAGIC` + marshal 序列化的 (header, 类型, 内容)：
+
+- 字节模式的 `LazyRecord`（类型 'lazy'）：各字段值的原始字节拼接成一个 blob，每条记录只保存
+  布局编号、在 blob 中的偏移（`array('Q')` 的字节形式）和派生字段（如 `qso_epoch`）。写入时不解码字段，
+  读取时在 blob 上重建 `LazyRecord`，字段仍在首次访问时才解码；
+- 其他记录（类型 'store'）：`RecordStore` 的内部形式 (字段名表, 槽位元组列表)。
+
+缓存只保存解析时投影后的字段。读取用 `f.read()` 一次读入整个条目（marshal 反序列化本身会复制数据，
+mmap 并不能省掉这次复制）。
+缓存目录总大小超过 `max_bytes` 时按最近使用时间（命中会刷新 mtime）淘汰最旧的条目。
+"""
+import hashlib
+import logging
+import marshal
+import os
+import tempfile
+import threading
+from array import array
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from .parser import PARSER_VERSION
+from .records import _DELETED, ByteSource, LazyRecord, RecordLayout, RecordStore
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'ADIFPC2\n'
+SUFFIX = '.bin'
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def content_digest(buf) -> str:
+    """内容（bytes 或 mmap）的 SHA-256 十六进制摘要。"""
+    return hashlib.sha256(buf).hexdigest()
+
+
+def file_digest(path: str, block_size: int = 1 << 20) -> str:
+    """分块读取文件计算 SHA-256，不把整个文件读入内存。"""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _pack_lazy(records: List[LazyRecord]) -> Optional[Tuple[str, str, bytes, List[Tuple[str, ...]], List[tuple]]]:
+    """把 `LazyRecord` 的原始值字节复制到一个 blob 中，不解码字段。
+
+    记录来自编码不同的缓冲区时返回 None，由调用方改用 `RecordStore` 形式。
+    """
+    first = records[0]._src
+    encoding, errors = first.encoding, first.errors
+    blob = bytearray()
+    layouts: Dict[int, int] = {}
+    layout_fields: List[Tuple[str, ...]] = []
+    rows = []
+    for rec in records:
+        src = rec._src
+        if src.encoding != encoding or src.errors != errors:
+            return None
+        layout = rec._layout
+        index = layouts.get(id(layout))
+        if index is None:
+            index = layouts[id(layout)] = len(layout_fields)
+            layout_fields.append(layout.fields)
+        buf = src.buf
+        old = rec._offsets
+        offsets = array('Q', old)
+        for i in range(0, len(old), 2):
+            start = len(blob)
+            blob += buf[old[i]:old[i + 1]]
+            offsets[i] = start
+            offsets[i + 1] = len(blob)
+        # `_extra` 中是派生/写入的字段和已解码字段的缓存，原样保存（不为此解码其他字段）
+        extra = {}
+        deleted = []
+        if rec._extra:
+            for k, v in rec._extra.items():
+                if v is _DELETED:
+                    deleted.append(k)
+                else:
+                    extra[k] = v
+        rows.append((index, offsets.tobytes(), extra, tuple(deleted)))
+    return encoding, errors, bytes(blob), layout_fields, rows
+
+
+def _unpack_lazy(encoding: str, errors: str, blob: bytes, layout_fields: List[Tuple[str, ...]],
+                 rows: List[tuple]) -> List[LazyRecord]:
+    src = ByteSource(blob, encoding, errors)
+    layouts = [RecordLayout(tuple(fields)) for fields in layout_fields]
+    records = []
+    for index, raw_offsets, extra, deleted in rows:
+        offsets = array('Q')
+        offsets.frombytes(raw_offsets)
+        if deleted:
+            extra = dict(extra)
+            for k in deleted:
+                extra[k] = _DELETED
+        records.append(LazyRecord(src, layouts[index], offsets, extra or None))
+    return records
+
+
+class ParseCache:
+    """解析结果的磁盘缓存（LRU，按总字节数限制大小）。
+
+    用法::
+
+        cache = ParseCache(cache_dir)
+        key = cache.key(digest, fields)
+        hit = cache.get(key, source_size)
+        if hit is None:
+            header, records = parse(...)
+            cache.put(key, header, records)
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(digest: str, *params: Any) -> str:
+        """由内容摘要、解析器版本和解析参数组合出缓存键。"""
+        h = hashlib.sha256(f'{digest}|v{PARSER_VERSION}'.encode('ascii'))
+        for p in params:
+            if p is not None and not isinstance(p, str):
+                p = ','.join(p)
+            h.update(b'|' + str(p).encode('utf-8'))
+        return h.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + SUFFIX)
+
+    def get(self, key: str, source_size: int = 0) -> Optional[Tuple[Dict[str, Any], Sequence[Mapping[str, Any]]]]:
+        """命中时返回 (header, records)，否则返回 None。
+
+        写入的是 `LazyRecord` 时，records 为在缓存 blob 上重建的 `LazyRecord` 列表；否则为 `RecordStore`。
+        `source_size` 为原始日志的字节数，命中时计入 `bytes_saved`（免于解析的字节数）。
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            if data[:len(MAGIC)] != MAGIC:
+                raise ValueError('缓存条目格式不符')
+            header, kind, content = marshal.loads(memoryview(data)[len(MAGIC):])
+            del data
+            if kind == 'lazy':
+                records = _unpack_lazy(*content)
+            elif kind == 'store':
+                records = RecordStore.from_rows(*content)
+            else:
+                raise ValueError(f'未知的缓存条目类型: {kind!r}')
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        except (OSError, ValueError, EOFError, TypeError) as e:
+            logger.warning('解析缓存条目损坏，已丢弃: %s: %s', path, e)
+            self._discard(path)
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+            self.bytes_saved += source_size
+        return header, records
+
+    def put(self, key: str, header: Dict[str, Any], records: Iterable[Mapping[str, Any]]) -> None:
+        """写入一条解析结果（先写临时文件再原子替换），然后按大小上限淘汰旧条目。
+
+        全部为 `LazyRecord` 时只复制各字段的原始字节，不解码；其他记录压缩为 `RecordStore` 形式。
+        """
+        content = None
+        if not isinstance(records, RecordStore):
+            records = list(records)
+            if records and all(type(rec) is LazyRecord for rec in records):
+                content = _pack_lazy(records)
+            if content is None:
+                store = RecordStore()
+                for rec in records:
+                    store.append(dict(rec))
+                records = store
+        if content is not None:
+            payload = marshal.dumps((dict(header), 'lazy', content))
+        else:
+            payload = marshal.dumps((dict(header), 'store', (list(records.schema.names), records.rows())))
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(MAGIC)
+                f.write(payload)
+            os.replace(tmp, self._path(key))
+        except OSError as e:
+            logger.warning('写入解析缓存失败: %s', e)
+            self._discard(tmp)
+            return
+        self.evict()
+
+    def evict(self) -> None:
+        """删除最久未使用的条目，直到总大小不超过 `max_bytes`。"""
+        with self._lock:
+            entries = []
+            total = 0
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(SUFFIX):
+                    st = entry.stat()
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+                    total += st.st_size
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                self._discard(path)
+                total -= size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(SUFFIX):
+                self._discard(entry.path)
+
+    @staticmethod
+    def _discard(path: str) -> None:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        """命中率、节省字节数和当前占用，供监控使用。"""
+        entries = 0
+        size = 0
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(SUFFIX):
+                entries += 1
+                size += entry.stat().st_size
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'bytes_saved': self.bytes_saved,
+                'evictions': self.evictions,
+                'entries': entries,
+                'size_bytes': size,
+                'max_bytes': self.max_bytes,
+                'parser_version': PARSER_VERSION,
+            }
+
+
+__all__ = ['MAGIC', 'DEFAULT_MAX_BYTES', 'content_digest', 'file_digest', 'ParseCache']
@@ -4,17 +4,51 @@
 - `PREFIX_TO_DXCC`: 前缀（如 'BY','BA','3D2' 等）到国家名的映射（展开形式）
 - `CONDENSED_LINES`: 每行为精简映射字符串，例如 "BA-BL,BR-BT,BY,BZ: CHINA"
 
-提供 `find_country(callsign)` 快速按前缀匹配返回国家名或 None。
+- `CTY`: 完整保留 cty.dat 信息的最长前缀索引（`CtyIndex`），包括 `=CALL` 精确呼号、
+  每个前缀的 `(CQ)`/`[ITU]`/`<lat/lon>`/`{洲}`/`~时区~` 覆盖，以及实体的大洲、坐标和主前缀
+- `DXCC`: 以 ADIF DXCC 代码为下标的实体表（`dxcc.DxccTable`）
+
+提供 `lookup_entity(callsign)` 一次查找返回 `CtyEntity`（名称、CQ/ITU 分区、大洲、坐标），
+`resolve_dxcc(callsign)` 直接返回整数 DXCC 代码（未知为 0），
+`find_country(callsign)` 按最长前缀匹配返回 (前缀, 国家名) 或 None。
+
+解析 cty.dat 的结果编译为二进制索引 `cty.idx`（与 cty.dat 同目录，marshal 格式），
+以 cty.dat 内容的 SHA-256 和 `INDEX_VERSION` 为键；导入时只需校验并读取索引，
+cty.dat 变化或索引版本不符时自动重新编译。索引同时记录 cty.dat 的大小和修改时间，
+二者未变时不必重新计算哈希。也可以手动编译并查看导入耗时：
+
+    python -m adif_parser.callsign_parser --build
+    python -m adif_parser.callsign_parser --timing
+
+环境变量 `CTY_INDEX=0` 时不使用索引，每次导入都直接解析 cty.dat。
+
+cty.dat 可以在运行中更新：`reload()` 检查文件变化并重新编译，`start_watcher(interval)` 在后台线程中
+定期检查。每一版数据是一个不可变的 `CtyData` 快照，替换时整体赋值；`current()` 返回当前快照，
+`cty_version()` 返回其版本号（cty.dat 摘要前 12 位），依赖 cty 数据的缓存以快照对象判断是否过期。
+注意本模块经 `adif_parser.` 和 `src.adif_parser.` 两种路径导入时是两个模块对象，各自持有数据；
+奖状检查使用的是 `adif_parser.callsign_parser`。
 """
+from array import array
+from bisect import bisect_right
 from pathlib import Path
+import logging
+import marshal
+import os
 import re
-from typing import Dict, Set, List, Tuple
+import sys
+import threading
+import time
+from typing import Any, Dict, NamedTuple, Optional, Set, List, Tuple
+
+from .dxcc import ADIF_DXCC_BY_PREFIX, DxccTable, compile_table
+
+logger = logging.getLogger(__name__)
 
 
 def _load_cty(cty_path: Path) -> Dict[str, Set[str]]:
     data: Dict[str, Set[str]] = {}
     if not cty_path.exists():
-        print(f"cty.dat文件不存在: {cty_path}")
+        logger.warning('cty.dat文件不存在: %s', cty_path)
         return data
 
     try:
@@ -85,11 +119,11 @@ def _load_cty(cty_path: Path) -> Dict[str, Set[str]]:
         if current_country and current_prefixes:
             data[current_country] = current_prefixes.copy()
         
-        print(f"成功加载 {len(data)} 个国家的前缀数据")
+        logger.info('成功加载 %d 个国家的前缀数据', len(data))
         return data
         
     except Exception as e:
-        print(f"解析cty.dat文件时出错: {e}")
+        logger.warning('解析cty.dat文件时出错: %s', e)
         return {}
 
 def _compress_prefixes(prefixes: Set[str]) -> List[str]:
@@ -105,7 +139,7 @@ def _compress_prefixes(prefixes: Set[str]) -> List[str]:
             others.append(p)
 
     parts: List[str] = []
-    for first, lst in two_letter.items():
+    for first, lst in sorted(two_letter.items()):
         seq = sorted(lst)
         # compress consecutive second letters
         run_start = run_end = None
@@ -132,6 +166,168 @@ def _compress_prefixes(prefixes: Set[str]) -> List[str]:
     return parts
 
 
+class CtyEntity(NamedTuple):
+    """cty.dat 中的一个实体。经由带覆盖的前缀或精确呼号查到时，分区、大洲、坐标为覆盖后的值。
+
+    cty.dat 中经度和时区均以西为正，这里已取反：`lon` 以东为正，`utc_offset` 为当地时间相对 UTC 的小时数。
+    `prefix` 为实体主前缀，以 '*' 开头的是 CQ WAE 等使用、但不属于 DXCC 的实体（如 '*IT9' Sicily），
+    其 `dxcc` 为所属 DXCC 实体的代码；没有对应代码时 `dxcc` 为 0。
+    """
+    name: str
+    prefix: str
+    cq_zone: int
+    itu_zone: int
+    continent: str
+    lat: float
+    lon: float
+    utc_offset: float
+    dxcc: int
+
+
+# 前缀列表中的一项：可选的 '=' （精确呼号）、前缀本体，以及任意顺序的
+# (CQ 分区) [ITU 分区] <纬度/经度> {大洲} ~时区~ 覆盖
+_CTY_ENTRY_RE = re.compile(
+    r'(=?)([^(\[<{~]+)'
+    r'(?:\((\d+)\)|\[(\d+)\]|<([-+\d.]+)/([-+\d.]+)>|\{(\w+)\}|~([-+\d.]+)~)*')
+
+
+def _num(value: str, conv, default=0):
+    value = value.strip()
+    return conv(value) if value else default
+
+
+def _parse_cty_entities(cty_path: Path) -> Tuple[List[tuple], Dict[str, tuple], Dict[str, tuple]]:
+    """按 cty.dat 格式完整解析，返回 (实体, 前缀 -> 实体, 精确呼号 -> 实体)，实体为 `CtyEntity` 字段的元组。
+
+    每个实体由 8 个以冒号结尾的头部字段（名称、CQ、ITU、大洲、纬度、经度、时区、主前缀）
+    和以分号结尾、逗号分隔的前缀列表组成，前缀列表可以跨多行。
+    """
+    entities: List[tuple] = []
+    prefixes: Dict[str, tuple] = {}
+    exact: Dict[str, tuple] = {}
+    if not cty_path.exists():
+        return entities, prefixes, exact
+    text = cty_path.read_text(encoding='utf-8', errors='ignore')
+    for block in text.split(';'):
+        fields = block.strip().split(':', 8)
+        if len(fields) < 9:
+            continue
+        name, cq, itu, cont, lat, lon, tz, primary = (f.strip() for f in fields[:8])
+        try:
+            base = (name, primary, _num(cq, int), _num(itu, int), cont,
+                    _num(lat, float, 0.0), -_num(lon, float, 0.0), -_num(tz, float, 0.0),
+                    ADIF_DXCC_BY_PREFIX.get(primary, 0))
+        except ValueError:
+            logger.warning('cty.dat 实体头部无法解析: %s', name)
+            continue
+        entities.append(base)
+        for tok in fields[8].split(','):
+            m = _CTY_ENTRY_RE.fullmatch(tok.strip())
+            if not m:
+                continue
+            row = (name, primary,
+                   int(m[3]) if m[3] else base[2],
+                   int(m[4]) if m[4] else base[3],
+                   m[7] or cont,
+                   float(m[5]) if m[5] else base[5],
+                   -float(m[6]) if m[6] else base[6],
+                   -float(m[8]) if m[8] else base[7],
+                   base[8])
+            (exact if m[1] else prefixes)[m[2].strip().upper()] = row
+    return entities, prefixes, exact
+
+
+def _compile_trie(cty_path: Path) -> Dict[str, Any]:
+    """生成 `CtyIndex` 的索引内容：去重后的实体行、有序前缀数组及其 parent 链、精确呼号表，
+    以及 DXCC 实体表。"""
+    entities, prefixes, exact = _parse_cty_entities(cty_path)
+    rows: List[tuple] = []
+    row_ids: Dict[tuple, int] = {}
+
+    def row_id(row: tuple) -> int:
+        rid = row_ids.get(row)
+        if rid is None:
+            rid = row_ids[row] = len(rows)
+            rows.append(row)
+        return rid
+
+    for row in entities:
+        row_id(row)
+    keys = sorted(prefixes)
+    parent = array('i')
+    key_rows = array('i')
+    stack: List[int] = []
+    for i, key in enumerate(keys):
+        # 有序数组中 key 的所有前缀都排在它之前，且仍在栈上
+        while stack and not key.startswith(keys[stack[-1]]):
+            stack.pop()
+        parent.append(stack[-1] if stack else -1)
+        stack.append(i)
+        key_rows.append(row_id(prefixes[key]))
+    payload = compile_table(entities)
+    payload.update({
+        'cty_rows': rows,
+        'cty_keys': keys,
+        'cty_parent': parent.tobytes(),
+        'cty_key_rows': key_rows.tobytes(),
+        'cty_exact': {call: row_id(row) for call, row in exact.items()},
+    })
+    return payload
+
+
+def _int_array(data: bytes) -> array:
+    arr = array('i')
+    arr.frombytes(data)
+    return arr
+
+
+class CtyIndex:
+    """cty.dat 的最长前缀索引。
+
+    前缀按字典序存为数组，`parent[i]` 为 `keys[i]` 在数组中最长的真前缀（没有时为 -1）。
+    查找时先查精确呼号表，再二分找到不大于呼号的最后一个键，沿 parent 链向上，
+    第一个是呼号前缀的键即为最长匹配：字典序介于最长匹配与呼号之间的键都以最长匹配开头，
+    因此它一定在这条链上。
+    """
+    __slots__ = ('keys', 'parent', 'key_rows', 'exact', 'entities')
+
+    def __init__(self, payload: Dict[str, Any]):
+        self.entities: List[CtyEntity] = [CtyEntity(*row) for row in payload['cty_rows']]
+        self.keys: List[str] = payload['cty_keys']
+        self.parent = _int_array(payload['cty_parent'])
+        self.key_rows = _int_array(payload['cty_key_rows'])
+        self.exact: Dict[str, int] = payload['cty_exact']
+
+    def __len__(self) -> int:
+        return len(self.keys) + len(self.exact)
+
+    def match(self, callsign: str) -> Optional[Tuple[str, CtyEntity]]:
+        """返回 (匹配到的前缀或精确呼号, 实体)，无匹配时返回 None。"""
+        if not callsign:
+            return None
+        cs = callsign.strip().upper()
+        row = self.exact.get(cs)
+        if row is not None:
+            return cs, self.entities[row]
+        keys = self.keys
+        parent = self.parent
+        i = bisect_right(keys, cs) - 1
+        while i >= 0:
+            key = keys[i]
+            if cs.startswith(key):
+                return key, self.entities[self.key_rows[i]]
+            i = parent[i]
+        return None
+
+    def lookup(self, callsign: str) -> Optional[CtyEntity]:
+        found = self.match(callsign)
+        return found[1] if found else None
+
+    def dxcc(self, callsign: str) -> int:
+        found = self.match(callsign)
+        return found[1].dxcc if found else 0
+
+
 # load at import
 _this_file = Path(__file__).resolve()
 _candidates = [
@@ -152,36 +348,283 @@ if _CTY is None:
     _ROOT = _this_file.parents[3]
     _CTY = _ROOT / 'cty.dat'
 
-_COUNTRY_PREFIXES = _load_cty(_CTY)
+# 索引格式版本：索引内容或编译规则变化时递增
+INDEX_VERSION = 4
+INDEX_MAGIC = 'cty-index'
+
+
+def index_path(cty_path: Path) -> Path:
+    return cty_path.with_suffix('.idx')
+
+
+def _compile(cty_path: Path) -> Dict[str, Any]:
+    """解析 cty.dat，生成索引内容（只含 marshal 可序列化的类型）。"""
+    country_prefixes = _load_cty(cty_path)
+
+    # build expanded mapping prefix -> country
+    prefix_to_dxcc: Dict[str, str] = {}
+    for country, prefs in country_prefixes.items():
+        for p in prefs:
+            prefix_to_dxcc[p] = country
+
+    # build condensed lines
+    condensed_lines: List[str] = []
+    for country, prefs in sorted(country_prefixes.items(), key=lambda x: x[0].upper()):
+        parts = _compress_prefixes(prefs)
+        if parts:
+            condensed_lines.append(f"{','.join(parts)}: {country}")
+
+    payload = {'prefix_to_dxcc': prefix_to_dxcc, 'condensed_lines': condensed_lines,
+               'cty_digest': _digest(cty_path) if cty_path.exists() else ''}
+    payload.update(_compile_trie(cty_path))
+    return payload
+
+
+def _digest(cty_path: Path) -> str:
+    import hashlib
+    return hashlib.sha256(cty_path.read_bytes()).hexdigest()
+
+
+def _stat_key(cty_path: Path) -> Tuple[int, int]:
+    st = cty_path.stat()
+    return st.st_size, st.st_mtime_ns
+
+
+def build_index(cty_path: Path = None, out_path: Path = None) -> Dict[str, Any]:
+    """编译 cty.dat 并写入索引文件（写入失败时只记录警告），返回索引内容。"""
+    cty_path = Path(cty_path or _CTY)
+    out_path = Path(out_path or index_path(cty_path))
+    stat_key = _stat_key(cty_path)
+    payload = _compile(cty_path)
+    tmp = out_path.with_name(f"{out_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        tmp.write_bytes(marshal.dumps((INDEX_MAGIC, INDEX_VERSION, payload['cty_digest'], stat_key, payload)))
+        os.replace(tmp, out_path)
+    except OSError as e:
+        logger.warning('无法写入 cty 索引 %s: %s', out_path, e)
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+    return payload
+
+
+def load_index(cty_path: Path = None) -> Dict[str, Any]:
+    """读取与当前 cty.dat 对应的索引；不存在、已过期或损坏时重新编译。"""
+    cty_path = Path(cty_path or _CTY)
+    if not cty_path.exists():
+        return _compile(cty_path)
+    if os.environ.get('CTY_INDEX', '1') == '0':
+        return _compile(cty_path)
+    try:
+        magic, version, digest, stat_key, payload = marshal.loads(index_path(cty_path).read_bytes())
+        if magic == INDEX_MAGIC and version == INDEX_VERSION:
+            if stat_key == _stat_key(cty_path) or digest == _digest(cty_path):
+                return payload
+    except (OSError, ValueError, EOFError, TypeError):
+        pass
+    return build_index(cty_path)
+
+
+class CtyData(NamedTuple):
+    """某一版 cty.dat 的全部派生数据。重新加载时整体替换，持有旧快照的调用方不受影响。"""
+    digest: str                       # cty.dat 内容的 SHA-256
+    stat_key: Optional[Tuple[int, int]]  # 加载时 cty.dat 的 (大小, 修改时间)
+    cty: CtyIndex
+    dxcc: DxccTable
+    prefix_to_dxcc: Dict[str, str]
+    condensed_lines: List[str]
+    loaded_at: float
+
+    @property
+    def version(self) -> str:
+        """简短版本号（摘要前 12 位），可用于标记按该版本计算的结果。"""
+        return self.digest[:12]
+
+
+def _snapshot(payload: Dict[str, Any], stat_key: Optional[Tuple[int, int]]) -> CtyData:
+    return CtyData(payload['cty_digest'], stat_key, CtyIndex(payload), DxccTable(payload),
+                   payload['prefix_to_dxcc'], payload['condensed_lines'], time.time())
+
+
+def _current_stat() -> Optional[Tuple[int, int]]:
+    try:
+        return _stat_key(_CTY)
+    except OSError:
+        return None
+
+
+def _load() -> CtyData:
+    # 先取 stat 再读内容：读取期间文件若有变化，下一次检查会发现
+    stat_key = _current_stat()
+    return _snapshot(load_index(_CTY), stat_key)
+
+
+_DATA = _load()
+
+# 兼容原有的模块级名称；重新加载时与 `_DATA` 一起替换
+PREFIX_TO_DXCC: Dict[str, str] = _DATA.prefix_to_dxcc
+CONDENSED_LINES: List[str] = _DATA.condensed_lines
+CTY = _DATA.cty
+DXCC = _DATA.dxcc
+
+_RELOAD_LOCK = threading.Lock()
+
+
+def current() -> CtyData:
+    """当前生效的 cty 数据快照。一次请求内应只取一次，保证前后使用同一版本。"""
+    return _DATA
+
+
+def cty_version() -> str:
+    return _DATA.version
+
 
-# build expanded mapping prefix -> country
-PREFIX_TO_DXCC: Dict[str, str] = {}
-for country, prefs in _COUNTRY_PREFIXES.items():
-    for p in prefs:
-        PREFIX_TO_DXCC[p] = country
+def reload(force: bool = False) -> bool:
+    """cty.dat 有变化时重新编译索引并替换当前数据，返回是否发生了替换。
+
+    先比较文件大小和修改时间，变化后再比较内容摘要，只是被 touch 的文件不会触发重建。
+    新数据在调用线程中完整构建后一次赋值生效：正在使用旧快照的请求继续用旧数据完成，
+    之后的 `current()`/`lookup_entity()` 都返回新数据。编译前后文件又有变化（仍在写入）
+    或新索引为空时放弃本次替换，留待下一次检查。
+    """
+    global _DATA, PREFIX_TO_DXCC, CONDENSED_LINES, CTY, DXCC
+    with _RELOAD_LOCK:
+        old = _DATA
+        stat_key = _current_stat()
+        if stat_key is None:
+            # 文件被删除或暂时不可读时保留当前数据
+            return False
+        if not force and stat_key == old.stat_key:
+            return False
+        if not force and _digest(_CTY) == old.digest:
+            _DATA = old._replace(stat_key=stat_key)
+            return False
+        new = _load()
+        if new.stat_key != stat_key or _current_stat() != stat_key:
+            logger.info('cty.dat 正在写入，稍后重新加载: %s', _CTY)
+            return False
+        if not new.cty.keys:
+            logger.warning('cty.dat 中没有可用的前缀，保留当前版本 %s', old.version)
+            return False
+        PREFIX_TO_DXCC, CONDENSED_LINES = new.prefix_to_dxcc, new.condensed_lines
+        CTY, DXCC = new.cty, new.dxcc
+        _DATA = new
+        logger.info('cty.dat 已重新加载: %s -> %s，%d 个前缀', old.version, new.version, len(new.cty.keys))
+        return True
+
+
+class CtyWatcher(threading.Thread):
+    """后台线程：每 `interval` 秒调用一次 `reload()`。"""
+
+    def __init__(self, interval: float):
+        super().__init__(name='cty-watcher', daemon=True)
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            try:
+                reload()
+            except Exception as e:
+                logger.exception('重新加载 cty.dat 失败: %s', e)
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+
+_WATCHER: Optional[CtyWatcher] = None
+
+
+def start_watcher(interval: float = 60.0) -> CtyWatcher:
+    """启动（或返回已在运行的）cty.dat 监视线程。"""
+    global _WATCHER
+    with _RELOAD_LOCK:
+        if _WATCHER is None or not _WATCHER.is_alive():
+            _WATCHER = CtyWatcher(interval)
+            _WATCHER.start()
+        return _WATCHER
+
+
+def stop_watcher() -> None:
+    global _WATCHER
+    with _RELOAD_LOCK:
+        if _WATCHER is not None:
+            _WATCHER.stop()
+            _WATCHER = None
 
-# build condensed lines
-CONDENSED_LINES: List[str] = []
-for country, prefs in sorted(_COUNTRY_PREFIXES.items(), key=lambda x: x[0].upper()):
-    parts = _compress_prefixes(prefs)
-    if parts:
-        CONDENSED_LINES.append(f"{','.join(parts)}: {country}")
+
+def lookup_entity(callsign: str) -> Optional[CtyEntity]:
+    """返回 `callsign` 所属的 `CtyEntity`（精确呼号优先，其次最长前缀），未知时返回 None。"""
+    return _DATA.cty.lookup(callsign)
+
+
+def resolve_dxcc(callsign: str) -> int:
+    """返回 `callsign` 的 ADIF DXCC 代码；未知呼号返回 0。"""
+    return _DATA.cty.dxcc(callsign)
 
 
 def find_country(callsign: str) -> Tuple[str, str] | None:
     """按前缀匹配给定 `callsign`，返回 (prefix, country) 或 None。
 
-    尝试最长前缀匹配（按前缀长度降序）。
+    精确呼号（cty.dat 中的 `=CALL`）优先，其次为最长前缀匹配。
     """
-    if not callsign:
+    found = _DATA.cty.match(callsign)
+    if found is None:
         return None
-    s = callsign.strip().upper()
-    # try lengths from 5 down to 1
-    for L in range(5, 0, -1):
-        pref = s[:L]
-        if pref in PREFIX_TO_DXCC:
-            return pref, PREFIX_TO_DXCC[pref]
-    return None
+    return found[0], found[1].name
+
+
+__all__ = ['PREFIX_TO_DXCC', 'CONDENSED_LINES', 'CTY', 'DXCC', 'CtyEntity', 'CtyIndex', 'lookup_entity',
+           'resolve_dxcc', 'find_country',
+           'build_index', 'load_index', 'INDEX_VERSION',
+           'CtyData', 'current', 'cty_version', 'reload', 'start_watcher', 'stop_watcher']
+
+
+def _import_time(env: Dict[str, str]) -> float:
+    """在子进程中测量导入本模块的耗时（毫秒）。
+
+    包 `__init__` 和本模块用到的标准库（pathlib、hashlib）先行导入，不计入耗时——
+    应用和 CLI 进程里它们早已被其他模块导入。
+    """
+    import subprocess
+    code = ('import sys, time, pathlib, hashlib; sys.path.insert(0, %r); import adif_parser; '
+            't = time.perf_counter(); import adif_parser.callsign_parser; '
+            'print((time.perf_counter() - t) * 1000)') % str(_this_file.parents[1])
+    out = subprocess.run([sys.executable, '-c', code], env=dict(os.environ, **env),
+                         capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def _main(argv=None) -> int:
+    import argparse
+    p = argparse.ArgumentParser(description='编译 cty.dat 索引 / 报告导入耗时')
+    p.add_argument('--build', action='store_true', help='重新编译 cty.dat 索引')
+    p.add_argument('--timing', action='store_true', help='分别测量不用索引、编译索引、读取索引时的导入耗时')
+    p.add_argument('--repeat', type=int, default=5, help='--timing 每种情况的测量次数（取最小值）')
+    ns = p.parse_args(argv)
+    if ns.build or not ns.timing:
+        t = time.perf_counter()
+        payload = build_index(_CTY)
+        print(f"已编译 {index_path(_CTY)}: {len(payload['cty_keys'])} 个前缀, {len(payload['cty_exact'])} 个精确呼号, "
+              f"{(time.perf_counter() - t) * 1000:.1f} ms")
+    if ns.timing:
+        idx = index_path(_CTY)
+        rebuild = []
+        for _ in range(ns.repeat):
+            try:
+                idx.unlink()
+            except OSError:
+                pass
+            rebuild.append(_import_time({}))
+        without = min(_import_time({'CTY_INDEX': '0'}) for _ in range(ns.repeat))
+        cached = min(_import_time({}) for _ in range(ns.repeat))
+        print(f"不使用索引: {without:.1f} ms")
+        print(f"编译并写入索引: {min(rebuild):.1f} ms")
+        print(f"读取已有索引: {cached:.1f} ms")
+    return 0
+
 
+if __name__ == '__main__':
+    raise SystemExit(_main())
 
-__all__ = ['PREFIX_TO_DXCC', 'CONDENSED_LINES', 'find_country']
\ No newline at end of file
@@ -1,42 +1,252 @@
 import argparse
+import glob
+import gzip
+import io
 import json
+import os
+import shutil
 import sys
-from .parser import parse_adif, detect_variant
+import tempfile
+import time
+from collections import deque
+from typing import Any, Dict, Iterator, List, Tuple
+
+from .parser import parse_adif, parse_adif_iter, detect_variant, peek_header
+from .bytes_parser import MappedAdif
+from .parallel import parse_adif_file_parallel, process_pool
+from .bench import add_pipeline_arguments, run_pipeline
+
+
+def _write_output(out, args):
+    # 字节模式下记录为 LazyRecord，序列化时转为普通字典
+    fo = _open_output(args)
+    if fo is None:
+        json.dump(out, sys.stdout, indent=2, ensure_ascii=False, default=dict)
+        return
+    with fo:
+        json.dump(out, fo, indent=2, ensure_ascii=False, default=dict)
+
+
+def _expand_files(patterns: List[str]) -> List[str]:
+    """展开通配符（Windows 的 shell 不会替我们展开），保持顺序并去重。"""
+    files: List[str] = []
+    seen = set()
+    for pat in patterns:
+        matches = sorted(glob.glob(pat)) if glob.has_magic(pat) else [pat]
+        if not matches:
+            print(f"没有匹配的文件: {pat}", file=sys.stderr)
+        for path in matches:
+            if path not in seen:
+                seen.add(path)
+                files.append(path)
+    return files
+
+
+def _open_output(args):
+    """输出流：文件或 stdout（返回 None 表示直接写 stdout）；`--gzip` 或输出文件名以 .gz 结尾时压缩。"""
+    compress = args.gzip or (args.output or '').endswith('.gz')
+    if args.output:
+        if compress:
+            return gzip.open(args.output, 'wt', encoding='utf-8')
+        return open(args.output, 'w', encoding='utf-8')
+    if compress:
+        return io.TextIOWrapper(gzip.GzipFile(fileobj=sys.stdout.buffer, mode='wb'), encoding='utf-8')
+    return None
+
+
+def _variant_text(adif: MappedAdif, full_scan: bool) -> str:
+    """字节模式下交给 `detect_variant` 的文本：默认只解码头部，`--full-scan` 时解码全文。"""
+    if full_scan:
+        return str(adif.buffer, adif.encoding, adif.errors)
+    return adif.header_text()
+
+
+def _iter_file(path: str, args) -> Iterator[Dict[str, Any]]:
+    """流式解析单个文件：先产出 {'file', 'variant', 'header'}，再逐条产出记录。"""
+    encoding = args.encoding or 'utf-8'
+    if args.bytes:
+        with MappedAdif(path, encoding=encoding) as adif:
+            it = adif.parse_iter(fields=args.fields)
+            header = next(it)
+            yield {'file': path, 'variant': detect_variant(_variant_text(adif, args.full_scan), header,
+                                                           full_scan=args.full_scan),
+                   'header': header}
+            yield from it
+        return
+    with open(path, 'r', encoding=encoding, errors='replace') as f:
+        if args.full_scan:
+            text = f.read()
+            f = io.StringIO(text)
+        else:
+            text = peek_header(f)
+            f.seek(0)
+        it = parse_adif_iter(f, fields=args.fields)
+        header = next(it)
+        yield {'file': path, 'variant': detect_variant(text, header, full_scan=args.full_scan), 'header': header}
+        yield from it
+
+
+def _ndjson_lines(path: str, args) -> Iterator[str]:
+    it = _iter_file(path, args)
+    yield json.dumps(next(it), ensure_ascii=False, default=dict) + '\n'
+    for rec in it:
+        yield json.dumps({'file': path, 'record': rec}, ensure_ascii=False, default=dict) + '\n'
+
+
+def _parse_to_ndjson(path: str, args) -> Tuple[str, Dict[str, Any]]:
+    """进程池任务：把一个文件逐行转为 NDJSON 写入临时文件，返回 (临时文件路径, 统计信息)。
+
+    输出不在内存中拼成整段文本，由父进程按输入顺序把临时文件复制到输出流后删除。
+    """
+    t0 = time.perf_counter()
+    fd, tmp = tempfile.mkstemp(suffix='.ndjson')
+    n = -1
+    try:
+        with open(fd, 'w', encoding='utf-8') as f:
+            for line in _ndjson_lines(path, args):
+                f.write(line)
+                n += 1
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return tmp, _file_stats(path, n, time.perf_counter() - t0)
+
+
+def _copy_part(tmp: str, stream) -> None:
+    try:
+        with open(tmp, 'r', encoding='utf-8') as f:
+            shutil.copyfileobj(f, stream)
+    finally:
+        os.unlink(tmp)
+
+
+def _file_stats(path: str, records: int, seconds: float) -> Dict[str, Any]:
+    return {'file': path, 'records': records, 'bytes': os.path.getsize(path), 'seconds': seconds}
+
+
+def _report(stats: Dict[str, Any]) -> None:
+    secs = stats['seconds'] or 1e-9
+    print(f"{stats['file']}: {stats['records']} 条记录, {stats['bytes'] / 1e6:.2f} MB, {secs:.2f} s, "
+          f"{stats['records'] / secs:.0f} QSO/s, {stats['bytes'] / 1e6 / secs:.2f} MB/s", file=sys.stderr)
+
+
+def cmd_parse_batch(files: List[str], args) -> None:
+    """批量模式：逐文件输出 NDJSON（每个文件先一行头部，再每条记录一行）。
+
+    `--jobs 1` 时在本进程内边解析边输出；否则按文件分配到进程池，各文件的输出先写入临时文件，
+    再按输入顺序复制到输出流；同时在途的文件数不超过 2 × jobs，避免临时文件积压。
+    """
+    out = _open_output(args)
+    stream = out if out is not None else sys.stdout
+    total = {'file': '合计', 'records': 0, 'bytes': 0, 'seconds': 0.0}
+    t_all = time.perf_counter()
+    try:
+        if args.jobs <= 1:
+            for path in files:
+                t0 = time.perf_counter()
+                n = -1
+                for line in _ndjson_lines(path, args):
+                    stream.write(line)
+                    n += 1
+                stats = _file_stats(path, n, time.perf_counter() - t0)
+                _report(stats)
+                total['records'] += stats['records']
+                total['bytes'] += stats['bytes']
+        else:
+            with process_pool(args.jobs) as pool:
+                pending = deque()
+                queue = iter(files)
+                for path in queue:
+                    pending.append(pool.submit(_parse_to_ndjson, path, args))
+                    if len(pending) >= 2 * args.jobs:
+                        break
+                try:
+                    while pending:
+                        tmp, stats = pending.popleft().result()
+                        _copy_part(tmp, stream)
+                        _report(stats)
+                        total['records'] += stats['records']
+                        total['bytes'] += stats['bytes']
+                        for path in queue:
+                            pending.append(pool.submit(_parse_to_ndjson, path, args))
+                            break
+                finally:
+                    # 出错时删除其余已完成任务的临时文件
+                    for future in pending:
+                        if not future.cancel() and future.exception() is None:
+                            os.unlink(future.result()[0])
+    finally:
+        if out is not None:
+            out.close()
+        else:
+            sys.stdout.flush()
+    if len(files) > 1:
+        total['seconds'] = time.perf_counter() - t_all
+        _report(total)
 
 
 def cmd_parse(args):
-    path = args.file
+    files = _expand_files(args.files)
+    if not files:
+        return 1
+    if len(files) > 1 or args.ndjson:
+        cmd_parse_batch(files, args)
+        return 0
+    path = files[0]
+    if args.bytes and args.jobs > 1:
+        # 字节模式 + 多进程：各进程自行映射文件并解析自己的区间
+        header, records = parse_adif_file_parallel(path, args.jobs, args.fields, encoding=args.encoding or 'utf-8')
+        with MappedAdif(path, encoding=args.encoding or 'utf-8') as adif:
+            variant = detect_variant(_variant_text(adif, args.full_scan), header, full_scan=args.full_scan)
+        _write_output({'variant': variant, 'header': header, 'records': records}, args)
+        return 0
+    if args.bytes:
+        # 字节模式：mmap 映射文件，按字节长度切分，字段按需解码
+        with MappedAdif(path, encoding=args.encoding or 'utf-8') as adif:
+            header, records = adif.parse(fields=args.fields)
+            variant = detect_variant(_variant_text(adif, args.full_scan), header, full_scan=args.full_scan)
+            _write_output({'variant': variant, 'header': header, 'records': records}, args)
+        return 0
     with open(path, 'r', encoding=args.encoding or 'utf-8', errors='replace') as f:
         text = f.read()
-    header, records = parse_adif(text)
-    variant = detect_variant(text, header)
+    header, records = parse_adif(text, fields=args.fields, jobs=args.jobs)
+    variant = detect_variant(text, header, full_scan=args.full_scan)
     out = {
         'variant': variant,
         'header': header,
         'records': records,
     }
-    if args.output:
-        with open(args.output, 'w', encoding='utf-8') as fo:
-            json.dump(out, fo, indent=2, ensure_ascii=False)
-    else:
-        json.dump(out, sys.stdout, indent=2, ensure_ascii=False)
+    _write_output(out, args)
+    return 0
 
 
 def main(argv=None):
     p = argparse.ArgumentParser(description='ADIF 解析与变体检测')
     sub = p.add_subparsers(dest='cmd')
-    ps = sub.add_parser('parse', help='解析 ADIF 文件')
-    ps.add_argument('file', help='ADIF 文件路径')
-    ps.add_argument('-o', '--output', help='输出 JSON 文件路径（默认为 stdout）')
+    ps = sub.add_parser('parse', help='解析 ADIF 文件',
+                        description='单个文件默认输出一个 JSON 对象；多个文件（或 --ndjson）时输出 NDJSON：'
+                                    '每个文件先输出一行 {"file", "variant", "header"}，再每条记录一行 {"file", "record"}。')
+    ps.add_argument('files', nargs='+', metavar='file', help='ADIF 文件路径，可以有多个，支持通配符（如 "logs/*.adi"）')
+    ps.add_argument('-o', '--output', help='输出文件路径（默认为 stdout）；以 .gz 结尾时 gzip 压缩')
     ps.add_argument('--encoding', help='文件编码，默认 utf-8')
+    ps.add_argument('--bytes', action='store_true', help='字节模式：mmap 映射文件并按字节长度取值（适合含中文等多字节字段的日志）')
+    ps.add_argument('--fields', help="只输出这些记录字段，逗号分隔，支持前缀通配（如 call,band,mode,app_lotw_*）")
+    ps.add_argument('-j', '--jobs', type=int, default=1,
+                    help='进程数，默认 1。多个文件时按文件并行处理；单个文件时把该文件切块并行解析')
+    ps.add_argument('--full-scan', action='store_true', help='变体检测扫描全文（默认只看头部和前几条记录）')
+    ps.add_argument('--ndjson', action='store_true', help='单个文件也以 NDJSON 流式输出')
+    ps.add_argument('--gzip', action='store_true', help='gzip 压缩输出（JSON 或 NDJSON）')
     ps.set_defaults(func=cmd_parse)
 
+    pb = sub.add_parser('bench', help='在合成 LoTW 日志上分阶段计时解析、呼号增强与奖状检查，输出 JSON')
+    add_pipeline_arguments(pb)
+    pb.set_defaults(func=run_pipeline)
+
     ns = p.parse_args(argv)
     if not hasattr(ns, 'func'):
         p.print_help()
         return 1
-    ns.func(ns)
-    return 0
+    return ns.func(ns) or 0
 
 
 if __name__ == '__main__':
@@ -0,0 +1,244 @@
+"""列式日志表示（需要 numpy，可选依赖）。
+
+`ColumnarLog` 为每个字段保存一列：
+- BAND/MODE/DXCC/STATE 为分类列（int32 编码 + 类别表，-1 表示缺失），
+  统计可以直接在编码上用 `np.unique` 向量化完成。记录中字段重复时编码取最后一个值，
+  完整的取值列表另存于 `Categorical.repeated`，记录视图与 `parse_adif` 一样返回该列表；
+- 其余字段为 object 数组（缺失为 None）；
+- `qso_epoch` 为 int64 的 UTC 纪元秒（直接取自解析器生成的整数字段），缺失为 `EPOCH_MISSING`。
+
+`ColumnarLog` 同时是记录视图的序列：`log[i]` 返回从同一组列读取字段的 `ColumnRecord`，
+原有基于 `record.get('call')` 的代码（如 `AwardChecker`）可以不加修改地使用。
+"""
+from array import array
+from collections import Counter
+from collections.abc import Sequence
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .records import _MISSING, _RecordView
+
+# 以分类编码存储的字段
+CATEGORICAL_FIELDS = ('band', 'mode', 'dxcc', 'state')
+
+# 以 int64 数组存储的字段
+EPOCH_FIELD = 'qso_epoch'
+
+# numpy 中 NaT 对应的 int64 值
+EPOCH_MISSING = -(2 ** 63)
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError('列式输出需要 numpy，请先安装：pip install numpy')
+
+
+class Categorical:
+    """分类列：`codes[i]` 为 `categories` 的下标，-1 表示该记录没有此字段。
+
+    `repeated` 为 行号 -> 字段重复时的全部取值（该行的编码为最后一个值）。
+    """
+    __slots__ = ('codes', 'categories', 'repeated')
+
+    def __init__(self, codes, categories: List[str], repeated: Optional[Dict[int, list]] = None):
+        self.codes = codes
+        self.categories = categories
+        self.repeated = repeated or {}
+
+    def value(self, index: int) -> Any:
+        """第 `index` 行的取值，缺失时返回 `_MISSING`。"""
+        values = self.repeated.get(index)
+        if values is not None:
+            return values
+        code = self.codes[index]
+        return _MISSING if code < 0 else self.categories[code]
+
+    def decode(self):
+        """还原为 object 数组（缺失为 None）。"""
+        lookup = np.array(list(self.categories) + [None], dtype=object)
+        out = lookup[self.codes]
+        for index, values in self.repeated.items():
+            out[index] = values
+        return out
+
+
+class ColumnRecord(_RecordView):
+    """`ColumnarLog` 中第 i 行的字典视图。"""
+    __slots__ = ('_log', '_index')
+
+    def __init__(self, log: 'ColumnarLog', index: int, extra: Optional[Dict[str, Any]] = None):
+        self._log = log
+        self._index = index
+        self._extra = extra
+
+    def _lookup(self, key: str) -> Any:
+        return self._log._cell(key, self._index)
+
+    def _has(self, key: str) -> bool:
+        return self._log._cell(key, self._index) is not _MISSING
+
+    def _base_keys(self) -> Iterator[str]:
+        cell = self._log._cell
+        for key in self._log.fields:
+            if cell(key, self._index) is not _MISSING:
+                yield key
+
+    def _clone(self, extra: Optional[Dict[str, Any]]) -> 'ColumnRecord':
+        return ColumnRecord(self._log, self._index, extra)
+
+
+class ColumnarLog(Sequence):
+    """列式存储的 QSO 日志。"""
+
+    def __init__(self, fields: List[str], columns: Dict[str, Any],
+                 categorical: Dict[str, Categorical], qso_epoch, length: int):
+        self.fields = fields
+        self.columns = columns
+        self.categorical = categorical
+        self.qso_epoch = qso_epoch
+        self._length = length
+
+    @classmethod
+    def from_records(cls, records: Iterable[Mapping[str, Any]]) -> 'ColumnarLog':
+        """从记录字典（如 `parse_adif_iter` 的产出）逐条构建列。"""
+        _require_numpy()
+        fields: List[str] = []
+        seen = set()
+        lists: Dict[str, list] = {}
+        cat_index: Dict[str, Dict[str, int]] = {f: {} for f in CATEGORICAL_FIELDS}
+        cat_codes: Dict[str, array] = {f: array('i') for f in CATEGORICAL_FIELDS}
+        cat_repeated: Dict[str, Dict[int, list]] = {f: {} for f in CATEGORICAL_FIELDS}
+        epochs = array('q')
+        n = 0
+        for rec in records:
+            for key, value in rec.items():
+                if key not in seen:
+                    seen.add(key)
+                    fields.append(key)
+                    if key not in cat_index and key != EPOCH_FIELD:
+                        lists[key] = [None] * n
+                if key == EPOCH_FIELD:
+                    continue
+                index = cat_index.get(key)
+                if index is not None:
+                    # 重复字段：与字典记录一样保留完整列表，编码取最后一个值
+                    if isinstance(value, list):
+                        cat_repeated[key][n] = value
+                        value = value[-1] if value else ''
+                    codes = cat_codes[key]
+                    if len(codes) < n:
+                        codes.extend([-1] * (n - len(codes)))
+                    code = index.get(value)
+                    if code is None:
+                        code = index[value] = len(index)
+                    codes.append(code)
+                else:
+                    col = lists[key]
+                    if len(col) < n:
+                        col.extend([None] * (n - len(col)))
+                    col.append(value)
+            epoch = rec.get(EPOCH_FIELD)
+            epochs.append(EPOCH_MISSING if epoch is None else epoch)
+            n += 1
+
+        columns = {}
+        for key, col in lists.items():
+            if len(col) < n:
+                col.extend([None] * (n - len(col)))
+            columns[key] = np.fromiter(col, dtype=object, count=n)
+        categorical = {}
+        for key, codes in cat_codes.items():
+            if len(codes) < n:
+                codes.extend([-1] * (n - len(codes)))
+            categorical[key] = Categorical(np.frombuffer(codes, dtype=np.int32).copy(),
+                                           list(cat_index[key]), cat_repeated[key])
+        qso_epoch = np.frombuffer(epochs, dtype=np.int64).copy()
+        return cls(fields, columns, categorical, qso_epoch, n)
+
+    def _cell(self, key: str, index: int) -> Any:
+        if key == EPOCH_FIELD:
+            epoch = self.qso_epoch[index]
+            return _MISSING if epoch == EPOCH_MISSING else int(epoch)
+        cat = self.categorical.get(key)
+        if cat is not None:
+            return cat.value(index)
+        col = self.columns.get(key)
+        if col is None:
+            return _MISSING
+        value = col[index]
+        return _MISSING if value is None else value
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [ColumnRecord(self, i) for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError(index)
+        return ColumnRecord(self, index)
+
+    def __iter__(self) -> Iterator[ColumnRecord]:
+        for i in range(self._length):
+            yield ColumnRecord(self, i)
+
+    def column(self, key: str):
+        """返回某字段的 object 数组（分类列会被还原），字段不存在时全部为 None。"""
+        if key == EPOCH_FIELD:
+            return self.qso_epoch
+        cat = self.categorical.get(key)
+        if cat is not None:
+            return cat.decode()
+        col = self.columns.get(key)
+        if col is None:
+            return np.full(self._length, None, dtype=object)
+        return col
+
+    def mask(self, key: str, values: Iterable[str]):
+        """布尔掩码：分类字段取值属于 `values` 的记录。"""
+        cat = self.categorical[key]
+        wanted = set(values)
+        codes = [i for i, c in enumerate(cat.categories) if c in wanted]
+        return np.isin(cat.codes, codes)
+
+    def time_mask(self, start: Optional[int] = None, end: Optional[int] = None):
+        """布尔掩码：`qso_epoch` 位于 [start, end) 的记录（纪元秒）。"""
+        m = self.qso_epoch != EPOCH_MISSING
+        if start is not None:
+            m &= self.qso_epoch >= start
+        if end is not None:
+            m &= self.qso_epoch < end
+        return m
+
+    def value_counts(self, key: str, mask=None) -> Dict[str, int]:
+        """统计字段各取值出现的次数；分类字段在编码上用 `np.unique` 计算。"""
+        cat = self.categorical.get(key)
+        if cat is None:
+            col = self.column(key)
+            if mask is not None:
+                col = col[mask]
+            return dict(Counter(v for v in col if v is not None))
+        codes = cat.codes if mask is None else cat.codes[mask]
+        uniq, counts = np.unique(codes[codes >= 0], return_counts=True)
+        return {cat.categories[c]: int(k) for c, k in zip(uniq, counts)}
+
+    def distinct(self, key: str, mask=None) -> List[str]:
+        """字段的不同取值（不含缺失）。"""
+        return list(self.value_counts(key, mask))
+
+    def nunique(self, key: str, mask=None) -> int:
+        """字段不同取值的个数（不含缺失）。"""
+        cat = self.categorical.get(key)
+        if cat is None:
+            return len(self.value_counts(key, mask))
+        codes = cat.codes if mask is None else cat.codes[mask]
+        return int(np.unique(codes[codes >= 0]).size)
+
+
+__all__ = ['CATEGORICAL_FIELDS', 'EPOCH_FIELD', 'EPOCH_MISSING', 'Categorical', 'ColumnRecord', 'ColumnarLog']
@@ -0,0 +1,172 @@
+"""以 ADIF DXCC 代码（0-999）为下标的实体表。
+
+cty.dat 只给出实体名称和主前缀，不含 ADIF 的 DXCC 代码，因此这里内置一份
+主前缀 -> DXCC 代码的对照表（`ADIF_DXCC_BY_PREFIX`）。主前缀以 '*' 开头的是
+CQ WAE 等使用、但不属于 DXCC 的实体（如 '*IT9' Sicily），计入其所属的 DXCC 实体。
+
+`DxccTable` 把实体信息存放在按代码下标的平坦数组中：名称、大洲、CQ/ITU 分区、是否已删除。
+表的内容随 cty.dat 索引一起编译（见 `callsign_parser`），查找只是一次列表下标访问。
+"""
+import logging
+from array import array
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 代码上限：ADIF 的 DXCC 代码均小于 1000
+DXCC_CODES = 1000
+
+# cty.dat 主前缀 -> ADIF DXCC 代码（修改后需递增 callsign_parser.INDEX_VERSION）
+ADIF_DXCC_BY_PREFIX: Dict[str, int] = {
+    '1A': 246, '1S': 247, '3A': 260, '3B6': 4, '3B8': 165, '3B9': 207,
+    '3C': 49, '3C0': 195, '3D2': 176, '3D2/c': 489, '3D2/r': 460, '3DA': 468,
+    '3V': 474, '3W': 293, '3X': 107, '3Y/b': 24, '3Y/p': 199, '4J': 18,
+    '4L': 75, '4O': 514, '4S': 315, '4U1I': 117, '4U1U': 289, '*4U1V': 206,
+    '4W': 511, '4X': 336, '5A': 436, '5B': 215, '5H': 470, '5N': 450,
+    '5R': 438, '5T': 444, '5U': 187, '5V': 483, '5W': 190, '5X': 286,
+    '5Z': 430, '6W': 456, '6Y': 82, '7O': 492, '7P': 432, '7Q': 440,
+    '7X': 400, '8P': 62, '8Q': 159, '8R': 129, '9A': 497, '9G': 424,
+    '9H': 257, '9J': 482, '9K': 348, '9L': 458, '9M2': 299, '9M6': 46,
+    '9N': 369, '9Q': 414, '9U': 404, '9V': 381, '9X': 454, '9Y': 90,
+    'A2': 402, 'A3': 160, 'A4': 370, 'A5': 306, 'A6': 391, 'A7': 376,
+    'A9': 304, 'AP': 372, 'BS7': 506, 'BV': 386, 'BV9P': 505, 'BY': 318,
+    'C2': 157, 'C3': 203, 'C5': 422, 'C6': 60, 'C9': 181, 'CE': 112,
+    'CE0X': 217, 'CE0Y': 47, 'CE0Z': 125, 'CE9': 13, 'CM': 70, 'CN': 446,
+    'CP': 104, 'CT': 272, 'CT3': 256, 'CU': 149, 'CX': 144, 'CY0': 211,
+    'CY9': 252, 'D2': 401, 'D4': 409, 'D6': 411, 'DL': 230, 'DU': 375,
+    'E3': 51, 'E4': 510, 'E5/n': 191, 'E5/s': 234, 'E6': 188, 'E7': 501,
+    'EA': 281, 'EA6': 21, 'EA8': 29, 'EA9': 32, 'EI': 245, 'EK': 14,
+    'EL': 434, 'EP': 330, 'ER': 179, 'ES': 52, 'ET': 53, 'EU': 27,
+    'EX': 135, 'EY': 262, 'EZ': 280, 'F': 227, 'FG': 79, 'FH': 169,
+    'FJ': 516, 'FK': 162, 'FK/c': 512, 'FM': 84, 'FO': 175, 'FO/a': 508,
+    'FO/c': 36, 'FO/m': 509, 'FP': 277, 'FR': 453, 'FS': 213, 'FT/g': 99,
+    'FT/j': 124, 'FT/t': 276, 'FT/w': 41, 'FT/x': 131, 'FT/z': 10, 'FW': 298,
+    'FY': 63, 'G': 223, 'GD': 114, 'GI': 265, 'GJ': 122, 'GM': 279,
+    '*GM/s': 279, 'GU': 106, 'GW': 294, 'H4': 185, 'H40': 507, 'HA': 239,
+    'HB': 287, 'HB0': 251, 'HC': 120, 'HC8': 71, 'HH': 78, 'HI': 72,
+    'HK': 116, 'HK0/a': 216, 'HK0/m': 161, 'HL': 137, 'HP': 88, 'HR': 80,
+    'HS': 387, 'HV': 295, 'HZ': 378, 'I': 248, '*IG9': 248, 'IS': 225,
+    '*IT9': 248, 'J2': 382, 'J3': 77, 'J5': 109, 'J6': 97, 'J7': 95,
+    'J8': 98, 'JA': 339, 'JD/m': 177, 'JD/o': 192, 'JT': 363, 'JW': 259,
+    '*JW/b': 259, 'JX': 118, 'JY': 342, 'K': 291, 'KG4': 105, 'KH0': 166,
+    'KH1': 20, 'KH2': 103, 'KH3': 123, 'KH4': 174, 'KH5': 197, 'KH6': 110,
+    'KH7K': 138, 'KH8': 9, 'KH8/s': 515, 'KH9': 297, 'KL': 6, 'KP1': 182,
+    'KP2': 285, 'KP4': 202, 'KP5': 43, 'LA': 266, 'LU': 100, 'LX': 254,
+    'LY': 146, 'LZ': 212, 'OA': 136, 'OD': 354, 'OE': 206, 'OH': 224,
+    'OH0': 5, 'OJ0': 167, 'OK': 503, 'OM': 504, 'ON': 209, 'OX': 237,
+    'OY': 222, 'OZ': 221, 'P2': 163, 'P4': 91, 'P5': 344, 'PA': 263,
+    'PJ2': 517, 'PJ4': 520, 'PJ5': 519, 'PJ7': 518, 'PY': 108, 'PY0F': 56,
+    'PY0S': 253, 'PY0T': 273, 'PZ': 140, 'R1FJ': 61, 'S0': 302, 'S2': 305,
+    'S5': 499, 'S7': 379, 'S9': 219, 'SM': 284, 'SP': 269, 'ST': 466,
+    'SU': 478, 'SV': 236, 'SV/a': 180, 'SV5': 45, 'SV9': 40, 'T2': 282,
+    'T30': 301, 'T31': 31, 'T32': 48, 'T33': 490, 'T5': 232, 'T7': 278,
+    'T8': 22, 'TA': 390, '*TA1': 390, 'TF': 242, 'TG': 76, 'TI': 308,
+    'TI9': 37, 'TJ': 406, 'TK': 214, 'TL': 408, 'TN': 412, 'TR': 420,
+    'TT': 410, 'TU': 428, 'TY': 416, 'TZ': 442, 'UA': 54, 'UA2': 126,
+    'UA9': 15, 'UK': 292, 'UN': 130, 'UR': 288, 'V2': 94, 'V3': 66,
+    'V4': 249, 'V5': 464, 'V6': 173, 'V7': 168, 'V8': 345, 'VE': 1,
+    'VK': 150, 'VK0H': 111, 'VK0M': 153, 'VK9C': 38, 'VK9L': 147, 'VK9M': 171,
+    'VK9N': 189, 'VK9W': 303, 'VK9X': 35, 'VP2E': 12, 'VP2M': 96, 'VP2V': 65,
+    'VP5': 89, 'VP6': 172, 'VP6/d': 513, 'VP8': 141, 'VP8/g': 235, 'VP8/h': 241,
+    'VP8/o': 238, 'VP8/s': 240, 'VP9': 64, 'VQ9': 33, 'VR': 321, 'VU': 324,
+    'VU4': 11, 'VU7': 142, 'XE': 50, 'XF4': 204, 'XT': 480, 'XU': 312,
+    'XW': 143, 'XX9': 152, 'XZ': 309, 'YA': 3, 'YB': 327, 'YI': 333,
+    'YJ': 158, 'YK': 384, 'YL': 145, 'YN': 86, 'YO': 275, 'YS': 74,
+    'YU': 296, 'YV': 148, 'YV0': 17, 'Z2': 452, 'Z3': 502, 'Z6': 522,
+    'Z8': 521, 'ZA': 7, 'ZB': 233, 'ZC4': 283, 'ZD7': 250, 'ZD8': 205,
+    'ZD9': 274, 'ZF': 69, 'ZK3': 270, 'ZL': 170, 'ZL7': 34, 'ZL8': 133,
+    'ZL9': 16, 'ZP': 132, 'ZS': 462, 'ZS8': 201,
+}
+
+# 已删除的实体（cty.dat 中没有），老 QSO 的 DXCC 字段中仍可能出现。
+# 未列出的删除实体代码仍可作为整数计数，只是表中没有名称。
+DELETED_ENTITIES: Dict[int, str] = {
+    2: 'Abu Ail Is.', 8: 'Aldabra', 23: 'Blenheim Reef', 26: 'British Phoenix Is.',
+    28: 'Canal Zone', 30: 'Celebe & Molucca Is.', 42: 'Damao, Diu', 55: 'Farquhar',
+    57: 'French Equatorial Africa', 58: 'French Indo-China', 59: 'French West Africa',
+    81: 'Germany', 85: 'Bonaire, Curacao', 93: 'Geyser Reef', 101: 'Goa',
+    102: 'Gold Coast, Togoland', 113: 'Ifni', 115: 'Italian Somaliland',
+    127: 'Kamaran Is.', 128: 'Karelo-Finnish Republic', 139: 'Kuria Muria Is.',
+    151: 'Malyj Vysotskij Is.', 155: 'Malaya', 183: 'Netherlands Borneo',
+    184: 'Netherlands New Guinea', 193: 'Okinawa', 194: 'Okino Tori-shima',
+    196: 'Palestine (deleted)', 198: 'Papua Territory', 200: 'Perim', 208: 'Ruanda-Urundi',
+    210: 'Saar', 218: 'Czechoslovakia', 226: 'Saudi Arabia/Iraq Neutral Zone',
+    229: 'German Democratic Republic', 231: 'Sikkim', 255: 'Sint Maarten, Saba, St. Eustatius',
+    268: 'Tangier', 271: 'Trieste',
+}
+
+
+def dxcc_code(value: Any) -> int:
+    """把记录中的 DXCC 字段（'318'、318、' 318 '）转为整数代码；空值或非数字返回 0。"""
+    if isinstance(value, int):
+        return value if 0 <= value < DXCC_CODES else 0
+    if not value:
+        return 0
+    s = str(value).strip()
+    # isdigit() 对 '³'、'٣' 等非 ASCII 数字也为真，int() 却无法（或不应）转换它们
+    if not (s.isascii() and s.isdigit()):
+        return 0
+    code = int(s)
+    return code if code < DXCC_CODES else 0
+
+
+def compile_table(entities: Iterable[tuple]) -> Dict[str, Any]:
+    """由 cty.dat 实体（`CtyEntity` 字段元组）生成平坦数组形式的实体表内容（可 marshal）。"""
+    names: List[str] = [''] * DXCC_CODES
+    continents: List[str] = [''] * DXCC_CODES
+    cq = bytearray(DXCC_CODES)
+    itu = bytearray(DXCC_CODES)
+    deleted = bytearray(DXCC_CODES)
+    for code, name in DELETED_ENTITIES.items():
+        names[code] = name
+        deleted[code] = 1
+    for name, prefix, cq_zone, itu_zone, continent, *_ in entities:
+        # '*' 实体并入所属 DXCC 实体，不覆盖其名称和分区
+        if prefix.startswith('*'):
+            continue
+        code = ADIF_DXCC_BY_PREFIX.get(prefix)
+        if code is None:
+            logger.warning('cty.dat 主前缀 %s（%s）没有对应的 DXCC 代码', prefix, name)
+            continue
+        names[code] = name
+        continents[code] = continent
+        cq[code] = cq_zone
+        itu[code] = itu_zone
+        deleted[code] = 0
+    return {'dxcc_names': names, 'dxcc_continents': continents,
+            'dxcc_cq': bytes(cq), 'dxcc_itu': bytes(itu), 'dxcc_deleted': bytes(deleted)}
+
+
+class DxccTable:
+    """按 DXCC 代码下标的实体表，代码 0 与未知代码的名称为空字符串。"""
+    __slots__ = ('names', 'continents', 'cq_zones', 'itu_zones', 'deleted')
+
+    def __init__(self, payload: Dict[str, Any]):
+        self.names: List[str] = payload['dxcc_names']
+        self.continents: List[str] = payload['dxcc_continents']
+        self.cq_zones = array('B', payload['dxcc_cq'])
+        self.itu_zones = array('B', payload['dxcc_itu'])
+        self.deleted = array('B', payload['dxcc_deleted'])
+
+    def __contains__(self, code: int) -> bool:
+        return 0 < code < DXCC_CODES and bool(self.names[code])
+
+    def __len__(self) -> int:
+        return sum(1 for name in self.names if name)
+
+    def name(self, code: int) -> Optional[str]:
+        return (self.names[code] or None) if 0 <= code < DXCC_CODES else None
+
+    def continent(self, code: int) -> Optional[str]:
+        return (self.continents[code] or None) if 0 <= code < DXCC_CODES else None
+
+    def is_deleted(self, code: int) -> bool:
+        return 0 <= code < DXCC_CODES and bool(self.deleted[code])
+
+    def codes(self, include_deleted: bool = False) -> List[int]:
+        """表中已知的实体代码（升序）。"""
+        return [code for code in range(1, DXCC_CODES)
+                if self.names[code] and (include_deleted or not self.deleted[code])]
+
+
+__all__ = ['DXCC_CODES', 'ADIF_DXCC_BY_PREFIX', 'DELETED_ENTITIES', 'DxccTable', 'compile_table', 'dxcc_code']
@@ -0,0 +1,130 @@
+"""多进程分块解析超大 ADIF 日志。
+
+先定位 `<EOH>`，再把正文按 `<EOR>` 边界切成 N 块，每块在进程池中独立解析，
+结果按原顺序合并。每块都以完整记录结尾，因此合并结果与串行解析一致。
+（若某个字段值中恰好包含字面量 `<EOR>`，切分位置可能落在值内部；LoTW 导出不会出现这种情况。
+文本模式下含多字节字符的日志声明长度与字符数不符，串行解析本身就会越过 `<EOR>`，
+这类日志应使用字节模式，其结果与串行一致。）
+
+- `parse_adif_parallel(text, jobs)`：已读入内存的文本。
+- `parse_adif_file_parallel(path, jobs)`：字节模式，各进程自行 mmap 文件并只解析自己的字节区间，
+  父进程不需要把文本发送给子进程。
+
+进程池使用 spawn 方式启动子进程（见 `process_pool`）：fork 会复制父进程中其他线程持有的锁，
+在多线程的宿主进程中可能死锁。并行解析只供命令行和基准测试使用，Web 上传流程始终串行解析。
+"""
+import mmap
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .bytes_parser import parse_adif_bytes
+from .parser import EOH_RE, EOR_RE, normalize_text, parse_adif
+
+EOH_RE_BYTES = re.compile(rb'<eoh(?::0)?>', re.IGNORECASE)
+EOR_RE_BYTES = re.compile(rb'<eor(?::0)?>', re.IGNORECASE)
+
+
+def default_jobs() -> int:
+    return os.cpu_count() or 1
+
+
+def process_pool(max_workers: int) -> ProcessPoolExecutor:
+    """以 spawn 方式启动子进程的进程池，不继承父进程的线程和锁状态。"""
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'))
+
+
+def split_body(buf, jobs: int, eoh_re=EOH_RE, eor_re=EOR_RE) -> Optional[Tuple[int, List[Tuple[int, int]]]]:
+    """返回 (正文起点, [(start, end), ...])，每个区间都在某个 `<EOR>` 之后结束。
+
+    没有 `<EOH>` 时返回 None（这种日志不会产生记录，无需并行）。
+    """
+    m = eoh_re.search(buf)
+    if not m:
+        return None
+    body_start = m.end()
+    total = len(buf)
+    step = max((total - body_start) // max(jobs, 1), 1)
+    ranges = []
+    start = body_start
+    for k in range(1, jobs):
+        target = max(body_start + k * step, start)
+        eor = eor_re.search(buf, target)
+        if not eor:
+            break
+        ranges.append((start, eor.end()))
+        start = eor.end()
+    if start < total or not ranges:
+        ranges.append((start, total))
+    return body_start, ranges
+
+
+def _parse_text_chunk(chunk: str, fields: Optional[List[str]]) -> List[Dict[str, Any]]:
+    # 在块前补一个 <EOH>，使解析器直接进入记录状态
+    return parse_adif('<EOH>' + chunk, fields=fields)[1]
+
+
+def _parse_file_range(path: str, start: int, end: int, encoding: str, errors: str,
+                      fields: Optional[List[str]]) -> List[Dict[str, Any]]:
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            _, records = parse_adif_bytes(b'<EOH>' + mm[start:end], encoding, errors, fields)
+            # LazyRecord 引用本进程的缓冲区，返回前转为普通字典
+            return [dict(r) for r in records]
+
+
+def _field_list(fields: Optional[Iterable[str]]) -> Optional[List[str]]:
+    if fields is None:
+        return None
+    if isinstance(fields, str):
+        return fields.split(',')
+    return list(fields)
+
+
+def parse_adif_parallel(text: str, jobs: Optional[int] = None,
+                        fields: Optional[Iterable[str]] = None) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """与 `parse_adif(text)` 结果相同，但正文分 `jobs` 块在进程池中解析。"""
+    jobs = jobs or default_jobs()
+    fields = _field_list(fields)
+    text = normalize_text(text)
+    split = split_body(text, jobs)
+    if jobs <= 1 or split is None:
+        return parse_adif(text, fields=fields)
+    body_start, ranges = split
+    header, _ = parse_adif(text[:body_start])
+    chunks = [text[s:e] for s, e in ranges]
+    records: List[Dict[str, Any]] = []
+    with process_pool(min(jobs, len(chunks))) as pool:
+        for part in pool.map(_parse_text_chunk, chunks, [fields] * len(chunks)):
+            records.extend(part)
+    return header, records
+
+
+def parse_adif_file_parallel(path: str, jobs: Optional[int] = None, fields: Optional[Iterable[str]] = None,
+                             encoding: str = 'utf-8', errors: str = 'replace') -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """字节模式的并行解析：按字节长度取值，返回普通字典记录。"""
+    jobs = jobs or default_jobs()
+    fields = _field_list(fields)
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return {}, []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            split = split_body(mm, jobs, EOH_RE_BYTES, EOR_RE_BYTES)
+            if jobs <= 1 or split is None:
+                header, records = parse_adif_bytes(mm, encoding, errors, fields)
+                return header, [dict(r) for r in records]
+            body_start, ranges = split
+            header, _ = parse_adif_bytes(mm[:body_start], encoding, errors)
+    n = len(ranges)
+    records: List[Dict[str, Any]] = []
+    with process_pool(min(jobs, n)) as pool:
+        for part in pool.map(_parse_file_range, [path] * n, [s for s, _ in ranges], [e for _, e in ranges],
+                             [encoding] * n, [errors] * n, [fields] * n):
+            records.extend(part)
+    return header, records
+
+
+__all__ = ['default_jobs', 'process_pool', 'split_body',
+           'parse_adif_parallel', 'parse_adif_file_parallel']
@@ -1,8 +1,13 @@
 import re
-from typing import Tuple, List, Dict, Any
-from datetime import datetime
+from typing import Tuple, List, Dict, Any, Iterable, Iterator, Optional, Sequence, TextIO, Union
+from datetime import date, datetime
+from functools import lru_cache
 
+from .records import RecordStore
+from .columnar import ColumnarLog
 
+# 解析结果格式的版本号：取值规则或派生字段变化时递增，使 `ParseCache` 中的旧条目失效
+PARSER_VERSION = 3
 
 
 TAG_RE = re.compile(r'<(?P<tag>[A-Za-z0-9_]+)(?::(?P<len>\d+))?(?::(?P<type>[A-Za-z]))?>', re.IGNORECASE)
@@ -15,16 +20,16 @@ def normalize_text(text: str) -> str:
     return text
 
 
-def _add_field(container: Dict[str, Any], tag: str, value: str) -> None:
-    tag = tag.upper()
-    if tag in container:
-        existing = container[tag]
+def _add_field(container: Dict[str, Any], key: str, value: str) -> None:
+    """加入字段；`key` 须已规范化为小写。重复字段合并为列表。"""
+    if key in container:
+        existing = container[key]
         if isinstance(existing, list):
             existing.append(value)
         else:
-            container[tag] = [existing, value]
+            container[key] = [existing, value]
     else:
-        container[tag] = value
+        container[key] = value
 
 
 def _first_value(v: Any) -> Any:
@@ -33,181 +38,386 @@ def _first_value(v: Any) -> Any:
     return v
 
 
-def _normalize_time_str(ts: Any) -> str | None:
-    if ts is None:
-        return None
-    s = str(ts).strip()
-    if not s:
-        return None
-    s2 = ''.join(ch for ch in s if ch.isdigit())
-    if not s2:
-        return None
-    if len(s2) == 4:
-        hh, mm, ss = s2[:2], s2[2:4], '00'
-    elif len(s2) == 6:
-        hh, mm, ss = s2[:2], s2[2:4], s2[4:6]
-    elif len(s2) <= 2:
-        hh, mm, ss = s2.zfill(2), '00', '00'
-    else:
-        return None
+# 1970-01-01 的公历序数，用于把日期换算为纪元秒
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# 规范化结果按原始字符串缓存。一份日志中不同的日期通常只有几千个；
+# 不同的 HHMMSS 可达数万个，时间缓存按一天的秒数（86400）留足容量，避免大日志上反复淘汰
+_DATE_CACHE_SIZE = 1 << 14
+_TIME_CACHE_SIZE = 1 << 17
+
+
+@lru_cache(maxsize=_TIME_CACHE_SIZE)
+def _parse_time(s: str) -> Optional[Tuple[str, int]]:
+    """'HHMM' / 'HHMMSS' / 'H' 等 -> ('HH:MM:SS', 当日秒数)，无效时返回 None。"""
+    s = s.strip()
+    if not (s.isascii() and s.isdigit()):
+        # 含分隔符（如 '12:34'）时只保留数字
+        s = ''.join(ch for ch in s if ch.isdigit())
+        if not s:
+            return None
+    n = len(s)
     try:
-        hni, mni, sni = int(hh), int(mm), int(ss)
-        if not (0 <= hni < 24 and 0 <= mni < 60 and 0 <= sni < 60):
+        if n == 4:
+            h, m, sec = int(s[:2]), int(s[2:4]), 0
+        elif n == 6:
+            h, m, sec = int(s[:2]), int(s[2:4]), int(s[4:6])
+        elif n <= 2:
+            h, m, sec = int(s), 0, 0
+        else:
             return None
-    except Exception:
+    except ValueError:
+        return None
+    if not (0 <= h < 24 and 0 <= m < 60 and 0 <= sec < 60):
         return None
-    return f"{hh.zfill(2)}:{mm.zfill(2)}:{ss.zfill(2)}"
+    return f"{h:02d}:{m:02d}:{sec:02d}", h * 3600 + m * 60 + sec
 
 
-def _normalize_date_str(ds: Any) -> str | None:
-    if ds is None:
-        return None
-    s = str(ds).strip()
-    s2 = ''.join(ch for ch in s if ch.isdigit())
-    if len(s2) == 8:
-        yyyy, mm, dd = s2[:4], s2[4:6], s2[6:8]
+@lru_cache(maxsize=_DATE_CACHE_SIZE)
+def _parse_date(s: str) -> Optional[Tuple[str, int]]:
+    """'YYYYMMDD' 或 ISO 日期 -> ('YYYY-MM-DD', 当日 00:00 UTC 的纪元秒)，无效时返回 None。"""
+    s = s.strip()
+    digits = s if s.isascii() and s.isdigit() else ''.join(ch for ch in s if ch.isdigit())
+    if len(digits) == 8:
         try:
-            datetime(int(yyyy), int(mm), int(dd))
-        except Exception:
+            d = date(int(digits[:4]), int(digits[4:6]), int(digits[6:8]))
+        except ValueError:
             return None
-        return f"{yyyy}-{mm}-{dd}"
+        return f"{digits[:4]}-{digits[4:6]}-{digits[6:8]}", (d.toordinal() - _EPOCH_ORDINAL) * 86400
     try:
-        dt = datetime.fromisoformat(s)
-        return dt.date().isoformat()
-    except Exception:
+        d = datetime.fromisoformat(s).date()
+    except ValueError:
         return None
+    return d.isoformat(), (d.toordinal() - _EPOCH_ORDINAL) * 86400
 
 
-def parse_adif(text: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+def _normalize_time_str(ts: Any) -> str | None:
+    if ts is None:
+        return None
+    parsed = _parse_time(ts if isinstance(ts, str) else str(ts))
+    return parsed[0] if parsed else None
+
+
+def _normalize_date_str(ds: Any) -> str | None:
+    if ds is None:
+        return None
+    parsed = _parse_date(ds if isinstance(ds, str) else str(ds))
+    return parsed[0] if parsed else None
+
+
+# 流式解析时每次从文件对象读取的字符数
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+def _iter_chunks(fileobj, chunk_size: int) -> Iterator[str]:
+    """按块读取文件对象，并对每块做与 `normalize_text` 等价的规范化。
+
+    跨块的 '\r\n' 通过暂存块末尾的 '\r' 处理。
     """
-    解析 ADIF 文本，返回 (header_dict, records_list).
+    first = True
+    pending = ''
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            break
+        if first:
+            chunk = chunk.lstrip('\ufeff')
+            first = False
+        chunk = pending + chunk
+        pending = ''
+        if chunk.endswith('\r'):
+            pending = '\r'
+            chunk = chunk[:-1]
+        yield chunk.replace('\r\n', '\n').replace('\r', '\n')
+    if pending:
+        yield '\n'
+
+
+def _unsized_value_end(buf, start: int, eof: bool, lt_char='<', semi_char=';') -> int:
+    """无长度（畸形）标签的回退启发式：值截至下一个分号或下一个标签。
+
+    只在下一个标签之前查找分号；数据不足以确定边界时返回 -1。
+    `buf` 可以是 str，也可以是 bytes/mmap（此时传入对应的字节分隔符）。
+    """
+    lt = buf.find(lt_char, start)
+    if lt != -1:
+        semi = buf.find(semi_char, start, lt)
+        return semi if semi != -1 else lt
+    semi = buf.find(semi_char, start)
+    if semi != -1:
+        return semi
+    return len(buf) if eof else -1
 
-    header_dict: keys 为小写字符串，值为字符串或字符串列表（若重复）。
-    records_list: 每条记录为字典，字段名小写，对应字段值（字符串或字符串列表）。
 
-    额外：会对完全相同的 (CALL,BAND,MODE) 组合进行去重（保留首次出现），
-    并尝试基于 `qso_date` + `time_on`/`time_off` 生成 `qso_datetime` / `qso_end_datetime`。
+class FieldProjection(dict):
+    """字段投影：key -> 是否保留 的缓存字典。
+
+    `fields` 中的名字不区分大小写，以 '*' 结尾的表示前缀通配（如 'app_lotw_*'）。
+    EOH/EOR 总是保留。首次遇到某字段名时计算一次，之后都是一次字典查找。
+    """
+
+    def __init__(self, fields: Iterable[str]):
+        super().__init__(eoh=True, eor=True)
+        exact = set()
+        prefixes = []
+        for f in fields:
+            f = f.strip().lower()
+            if f.endswith('*'):
+                prefixes.append(f[:-1])
+            elif f:
+                exact.add(f)
+        self.exact = frozenset(exact)
+        self.prefixes = tuple(prefixes)
+
+    def __missing__(self, key: str) -> bool:
+        wanted = self[key] = key in self.exact or key.startswith(self.prefixes)
+        return wanted
+
+
+def _projection(fields: Optional[Iterable[str]]) -> Optional[FieldProjection]:
+    if fields is None:
+        return None
+    if isinstance(fields, FieldProjection):
+        return fields
+    if isinstance(fields, str):
+        fields = fields.split(',')
+    return FieldProjection(fields)
+
+
+def _finish_record(rec: Dict[str, Any]) -> Dict[str, Any]:
+    """基于 `qso_date` + `time_on`/`time_off` 生成 ISO8601 时间字段，
+    以及对应的整数纪元秒 `qso_epoch` / `qso_end_epoch`（UTC）。"""
+    date_raw = _first_value(rec.get('qso_date') or rec.get('date'))
+    if date_raw is None:
+        return rec
+    day = _parse_date(date_raw if isinstance(date_raw, str) else str(date_raw))
+    if day is None:
+        return rec
+    date_iso, day_epoch = day
+
+    time_on_raw = _first_value(rec.get('time_on') or rec.get('time'))
+    if time_on_raw is not None:
+        t = _parse_time(time_on_raw if isinstance(time_on_raw, str) else str(time_on_raw))
+        if t is not None:
+            rec['qso_datetime'] = f"{date_iso}T{t[0]}"
+            rec['qso_epoch'] = day_epoch + t[1]
+    time_off_raw = _first_value(rec.get('time_off') or rec.get('time_off_on'))
+    if time_off_raw is not None:
+        t = _parse_time(time_off_raw if isinstance(time_off_raw, str) else str(time_off_raw))
+        if t is not None:
+            rec['qso_end_datetime'] = f"{date_iso}T{t[0]}"
+            rec['qso_end_epoch'] = day_epoch + t[1]
+    return rec
+
+
+def _iter_adif(chunks: Iterable[str], keep: Optional[FieldProjection] = None) -> Iterator[Dict[str, Any]]:
+    """解析核心：先产出 header，再逐条产出记录。缓冲区只保留尚未消费的数据。
+
+    单遍扫描：每个字段只做一次 `TAG_RE.search`，带 `:len` 的字段直接按声明长度
+    跳到值末尾；只有无长度的畸形标签才回退到分号/下一标签的启发式。
+    EOH/EOR 先于长度判断处理，带长度的 `<EOR:0>` 同样是记录结束；其后的内容不会被当作值读取，
+    下一次 search 会自然跳过。
+
+    `keep` 为字段投影时，记录中未选中的带长度字段只移动位置、不切片取值；
+    header 不受投影影响。即使记录的字段全部被投影掉，也会产出（空）记录，记录数不变。
     """
-    text = normalize_text(text)
+    chunks = iter(chunks)
+    search = TAG_RE.search
+    keys: Dict[str, str] = {}
+    buf = ''
+    buf_len = 0
     pos = 0
+    eof = False
     seen_eoh = False
     header: Dict[str, Any] = {}
-    records: List[Dict[str, Any]] = []
     current: Dict[str, Any] = {}
-    length_text = len(text)
+    target = header
+    # 当前记录中是否有被投影掉的字段 / 被投影掉的非空字段
+    skipped = False
+    skipped_content = False
 
     while True:
-        m = TAG_RE.search(text, pos)
-        if not m:
-            break
-        tag = m.group('tag').upper()
-        length = m.group('len')
-        val_start = m.end()
-
-        # 取值逻辑
-        if length is not None:
-            try:
-                ln = int(length)
-            except Exception:
-                ln = None
-            if ln is not None:
-                # 优先按分号/下一个标签判定实际值长度：如果存在分号并且在下一个标签之前，按分号截取（更稳健）。
-                semi = text.find(';', val_start)
-                lt = text.find('<', val_start)
-                if semi != -1 and (lt == -1 or semi < lt):
-                    end = semi
-                    value = text[val_start:end].strip()
+        m = search(buf, pos)
+        if m is None:
+            if eof:
+                break
+        else:
+            tag, length, _ = m.groups()
+            key = keys.get(tag)
+            if key is None:
+                key = keys[tag] = tag.lower()
+            val_start = m.end()
+
+            if key == 'eor' or key == 'eoh':
+                # 结束标签即使带长度（如 `<EOR:0>`）也只作为结束标记，值被丢弃
+                end = val_start if length is None else val_start + int(length)
+                if end <= buf_len or eof:
                     pos = end
-                    if pos < length_text and text[pos] == ';':
-                        pos += 1
+                    if key == 'eor':
+                        if current or skipped:
+                            yield _finish_record(current)
+                            current = {}
+                            target = current
+                            skipped = skipped_content = False
+                    elif not seen_eoh:
+                        seen_eoh = True
+                        target = current
+                        yield header
+                    continue
+            elif keep is not None and seen_eoh and not keep[key]:
+                if length is not None:
+                    end = val_start + int(length)
+                    if end <= buf_len or eof:
+                        pos = end
+                        skipped = True
+                        skipped_content = skipped_content or length != '0'
+                        continue
                 else:
-                    end_pos = min(val_start + ln, length_text)
-                    value = text[val_start: end_pos]
-                    pos = end_pos
-                    if pos < length_text and text[pos] == ';':
-                        pos += 1
-            else:
-                semi = text.find(';', val_start)
-                lt = text.find('<', val_start)
-                ends = [x for x in (semi, lt) if x != -1]
-                end = min(ends) if ends else length_text
-                value = text[val_start:end].strip()
-                pos = end
-                if pos < length_text and text[pos] == ';':
-                    pos += 1
-        else:
-            semi = text.find(';', val_start)
-            lt = text.find('<', val_start)
-            candidates = [x for x in (semi, lt) if x != -1]
-            if candidates:
-                end = min(candidates)
+                    end = _unsized_value_end(buf, val_start, eof)
+                    if end != -1:
+                        pos = end
+                        skipped = True
+                        skipped_content = skipped_content or bool(buf[val_start:end].strip())
+                        continue
+            elif length is not None:
+                end = val_start + int(length)
+                if end <= buf_len or eof:
+                    pos = end
+                    value = buf[val_start:end].strip()
+                    if key not in target:
+                        target[key] = value
+                    else:
+                        _add_field(target, key, value)
+                    continue
             else:
-                end = length_text
-            value = text[val_start:end].strip()
-            pos = end
-            if pos < length_text and text[pos] == ';':
-                pos += 1
-
-        value = value.strip()
-
-        if tag == 'EOH':
-            seen_eoh = True
-            continue
-        if tag == 'EOR':
-            if current:
-                records.append({k.lower(): v for k, v in current.items()})
-            current = {}
-            continue
-
-        # 根据是否看到 EOH 决定是 header 还是 record
-        if not seen_eoh and not records:
-            _add_field(header, tag, value)
+                end = _unsized_value_end(buf, val_start, eof)
+                if end != -1:
+                    pos = end + 1 if end < buf_len and buf[end] == ';' else end
+                    _add_field(target, key, buf[val_start:end].strip())
+                    continue
+
+        # 缓冲区数据不足以确定下一个字段：读入下一块
+        chunk = next(chunks, None)
+        if chunk is None:
+            eof = True
         else:
-            _add_field(current, tag, value)
+            buf = buf[pos:] + chunk
+            buf_len = len(buf)
+            pos = 0
+
+    if not seen_eoh:
+        yield header
 
     # 如果文件末尾没有 EOR，但 current 非空，也加入
-    # 但要排除只包含结束标签的空记录或只有很少字段的无效记录
-    if current:
-        # 检查是否只有结束标签或无效字段
-        has_valid_data = False
-        for key, value in current.items():
-            # 跳过结束标签和只有一个值的字段
-            if key != 'app_lotw_eof' and value:
-                has_valid_data = True
-                break
-        
-        # 只有当有有效数据时才添加记录
-        if has_valid_data:
-            records.append({k.lower(): v for k, v in current.items()})
+    # 但要排除只包含结束标签（如 APP_LoTW_EOF）的空记录
+    if (current and any(current.values())) or skipped_content:
+        yield _finish_record(current)
+
+
+def parse_adif_iter(source: Union[str, TextIO], chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    fields: Optional[Iterable[str]] = None) -> Iterator[Dict[str, Any]]:
+    """流式解析 ADIF。
+
+    `source` 为文本文件对象（按 `chunk_size` 分块读取）或已读入的字符串。
+    第一个产出的元素是 header_dict，之后每次产出一条记录字典；
+    内存占用只取决于最大的单条记录，而不是整个日志。
+    记录的时间字段（`qso_datetime` / `qso_end_datetime` 及整数纪元秒 `qso_epoch` / `qso_end_epoch`）在产出时即已生成。
 
-    header = {k.lower(): v for k, v in header.items()}
+    `fields` 为字段投影（如 ['call', 'band', 'app_lotw_*'] 或 'call,band'）：
+    记录只保留这些字段，其余字段在分词阶段直接跳过。时间字段只有在
+    `qso_date`/`time_on`/`time_off` 被保留时才会生成。
+    """
+    if isinstance(source, str):
+        chunks: Iterable[str] = (normalize_text(source),)
+    else:
+        chunks = _iter_chunks(source, chunk_size)
+    return _iter_adif(chunks, _projection(fields))
 
-    # 对于LOTW日志，我们不应该去重，因为用户需要看到完整的记录数
-    # 保留所有记录，不进行去重
-    deduped = records
 
-    # 时间解析：若存在 qso_date 与 time_on/time_off，生成 ISO8601 字符串字段
-    for rec in deduped:
-        date_raw = _first_value(rec.get('qso_date') or rec.get('date'))
-        time_on_raw = _first_value(rec.get('time_on') or rec.get('time'))
-        time_off_raw = _first_value(rec.get('time_off') or rec.get('time_off_on'))
+def parse_adif(text: str, compact: bool = False, columnar: bool = False,
+               fields: Optional[Iterable[str]] = None,
+               jobs: int = 1) -> Tuple[Dict[str, Any], Sequence[Dict[str, Any]]]:
+    """
+    解析 ADIF 文本，返回 (header_dict, records_list).
 
-        date_iso = _normalize_date_str(date_raw)
-        time_on_iso = _normalize_time_str(time_on_raw)
-        time_off_iso = _normalize_time_str(time_off_raw)
+    header_dict: keys 为小写字符串，值为字符串或字符串列表（若重复）。
+    records_list: 每条记录为字典，字段名小写，对应字段值（字符串或字符串列表）。
 
-        if date_iso and time_on_iso:
-            rec['qso_datetime'] = f"{date_iso}T{time_on_iso}"
-        if date_iso and time_off_iso:
-            rec['qso_end_datetime'] = f"{date_iso}T{time_off_iso}"
+    对于LOTW日志，不进行去重，保留所有记录；
+    并尝试基于 `qso_date` + `time_on`/`time_off` 生成 `qso_datetime` / `qso_end_datetime`，
+    以及对应的 UTC 纪元秒 `qso_epoch` / `qso_end_epoch`（int）。
+    这是 `parse_adif_iter` 的简单包装。
 
-    return header, deduped
+    compact=True 时返回 `RecordStore`：字段按共享 schema 的槽位存放、低基数值只保存一份，
+    记录为支持 `get`/`in`/`copy` 的 `CompactRecord`，可直接交给奖状检查使用。
 
+    columnar=True 时返回 `ColumnarLog`（需要 numpy）：每个字段一列，BAND/MODE/DXCC/STATE
+    为分类编码，QSO 时间为 int64 纪元秒；它同样可以作为记录序列使用。
 
-def detect_variant(text: str, header: Dict[str, Any]) -> str:
-    """基于头部字段和值以及内容启发式检测导出软件的可能变体。"""
-    t = text.lower()
+    `fields` 见 `parse_adif_iter`。
 
+    jobs > 1 时正文按 `<EOR>` 切成 `jobs` 块，在进程池中并行解析后按原顺序合并（见 `parallel`），
+    只适合非常大的日志：小文件上进程启动和结果回传的开销大于解析本身。
+    """
+    if jobs > 1:
+        from .parallel import parse_adif_parallel
+        header, records = parse_adif_parallel(text, jobs, fields)
+        it = iter(records)
+    else:
+        it = parse_adif_iter(text, fields=fields)
+        header = next(it)
+    if columnar:
+        return header, ColumnarLog.from_records(it)
+    if compact:
+        store = RecordStore()
+        for rec in it:
+            store.append(rec)
+        return header, store
+    return header, list(it)
+
+
+# 变体标识，按优先级排列（多个同时出现时取靠前者）
+VARIANT_PATTERNS = (
+    ('Logger32', r'logger32'),
+    ('N1MM Logger+', r'n1mm'),
+    ('Ham Radio Deluxe', r'ham radio deluxe|\bhrd\b'),
+    ('DXlog', r'dxlog'),
+    ('CQRLOG', r'cqrlog'),
+    ('LoTW', r'logbook of the world|lotw'),
+)
+_VARIANT_GROUPS = {f'v{i}': name for i, (name, _) in enumerate(VARIANT_PATTERNS)}
+_VARIANT_RANK = {name: i for i, (name, _) in enumerate(VARIANT_PATTERNS)}
+VARIANT_RE = re.compile('|'.join(f'(?P<v{i}>{pat})' for i, (_, pat) in enumerate(VARIANT_PATTERNS)),
+                        re.IGNORECASE)
+
+EOH_RE = re.compile(r'<eoh(?::0)?>', re.IGNORECASE)
+EOR_RE = re.compile(r'<eor(?::0)?>', re.IGNORECASE)
+
+# 变体检测只看头部和前几条记录
+VARIANT_PEEK_RECORDS = 5
+
+# `peek_header` 最多读取的字符数，以及至少读取的行数（LoTW 的第三行为 "for CALL"）
+HEADER_PEEK_LIMIT = 1 << 20
+HEADER_PEEK_LINES = 3
+
+
+def _variant_region_end(text: str, records: int = VARIANT_PEEK_RECORDS) -> int:
+    """头部（`<EOH>` 之前）加上前 `records` 条记录的结束位置。"""
+    m = EOH_RE.search(text)
+    pos = m.end() if m else 0
+    for _ in range(records):
+        m = EOR_RE.search(text, pos)
+        if not m:
+            return len(text)
+        pos = m.end()
+    return pos
+
+
+def detect_variant(text: str, header: Dict[str, Any], full_scan: bool = False) -> str:
+    """基于头部字段和值以及内容启发式检测导出软件的可能变体。
+
+    内容启发式只扫描 `<EOH>` 之前的区域和前 `VARIANT_PEEK_RECORDS` 条记录（一次组合正则扫描，
+    不复制/小写全文）；`full_scan=True` 时扫描全文。
+    """
     # 先检查头部值
     try:
         for v in header.values():
@@ -227,23 +437,51 @@ def detect_variant(text: str, header: Dict[str, Any]) -> str:
     except Exception:
         pass
 
-    # 再在全文中搜索已知标识
-    patterns = {
-        'Logger32': r'logger32',
-        'N1MM Logger+': r'n1mm',
-        'Ham Radio Deluxe': r'ham radio deluxe|\bhrd\b',
-        'DXlog': r'dxlog',
-        'CQRLOG': r'cqrlog',
-        'LoTW': r'logbook of the world|lotw',
-    }
-    for name, pat in patterns.items():
-        if re.search(pat, t):
-            return name
+    # 再在头部区域中搜索已知标识
+    end = len(text) if full_scan else _variant_region_end(text)
+    best = None
+    for m in VARIANT_RE.finditer(text, 0, end):
+        name = _VARIANT_GROUPS[m.lastgroup]
+        if best is None or _VARIANT_RANK[name] < _VARIANT_RANK[best]:
+            best = name
+            if _VARIANT_RANK[name] == 0:
+                break
+    return best or 'Unknown'
 
-    return 'Unknown'
 
+def peek_header(source: Union[str, TextIO], limit: int = HEADER_PEEK_LIMIT,
+                min_lines: int = HEADER_PEEK_LINES, encoding: str = 'utf-8') -> str:
+    """读取日志开头：直到 `<EOH>`（含）且至少 `min_lines` 行，最多 `limit` 个字符。
 
-__all__ = ['parse_adif', 'detect_variant']
+    `source` 为文件路径或文本文件对象。用于上传时的 LoTW 标识检查和第三行 "for CALL" 提取，
+    不必读入整个文件。
+    """
+    if isinstance(source, str):
+        with open(source, 'r', encoding=encoding) as f:
+            return peek_header(f, limit, min_lines)
+    buf = ''
+    eoh_end = -1
+    while len(buf) < limit:
+        chunk = source.read(min(DEFAULT_CHUNK_SIZE, limit - len(buf)))
+        if not chunk:
+            break
+        # 跨块的标签：从上一块末尾（最长的 '<eoh:0>' 减一个字符）开始查找
+        scan_from = max(len(buf) - 6, 0)
+        buf += chunk
+        if eoh_end < 0:
+            m = EOH_RE.search(buf, scan_from)
+            if m:
+                eoh_end = m.end()
+        if eoh_end >= 0 and buf.count('\n') >= min_lines:
+            break
+    if eoh_end < 0:
+        return buf
+    lines_end = -1
+    for _ in range(min_lines):
+        lines_end = buf.find('\n', lines_end + 1)
+        if lines_end < 0:
+            return buf
+    return buf[:max(eoh_end, lines_end + 1)]
 
 
-__all__ = ['parse_adif', 'detect_variant']
\ No newline at end of file
+__all__ = ['parse_adif', 'parse_adif_iter', 'detect_variant', 'peek_header', 'FieldProjection']
\ No newline at end of file
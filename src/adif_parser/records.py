@@ -0,0 +1,273 @@
+"""记录视图：以 dict 接口访问解析结果，而不为每条 QSO 复制/提前解码字段值。
+
+- `RecordLayout`: 一组记录共享的字段布局（字段名 -> 在偏移数组中的位置）。
+- `ByteSource`: 原始字节缓冲区（bytes 或 mmap）及其解码参数。
+- `LazyRecord`: 只保存字节偏移，字段在首次读取时才解码为 `str`。
+- `RecordStore` / `CompactRecord`: 字段按共享 schema 的槽位存放，低基数值驻留为单一实例。
+"""
+from array import array
+from collections.abc import MutableMapping, Sequence
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+_MISSING = object()
+# 在 `_extra` 中标记已删除的字段
+_DELETED = object()
+
+
+class RecordLayout:
+    """字段布局。LoTW 导出中绝大多数记录的字段顺序相同，因此布局可被大量记录共享。"""
+    __slots__ = ('fields', 'keys', 'slots')
+
+    def __init__(self, fields: Tuple[str, ...]):
+        self.fields = fields
+        slots: Dict[str, List[int]] = {}
+        for i, key in enumerate(fields):
+            slots.setdefault(key, []).append(i)
+        self.keys: Tuple[str, ...] = tuple(slots)
+        self.slots: Dict[str, Tuple[int, ...]] = {k: tuple(v) for k, v in slots.items()}
+
+
+class ByteSource:
+    """字节缓冲区与解码方式。值解码时去除首尾空白并统一换行符。"""
+    __slots__ = ('buf', 'encoding', 'errors')
+
+    def __init__(self, buf, encoding: str = 'utf-8', errors: str = 'replace'):
+        self.buf = buf
+        self.encoding = encoding
+        self.errors = errors
+
+    def decode(self, start: int, end: int) -> str:
+        s = str(self.buf[start:end], self.encoding, self.errors).strip()
+        if '\r' in s:
+            s = s.replace('\r\n', '\n').replace('\r', '\n')
+        return s
+
+
+class _RecordView(MutableMapping):
+    """记录视图基类：基础字段由子类按需提供，写入/删除/缓存的值保存在 `_extra` 中。"""
+    __slots__ = ('_extra',)
+
+    def _lookup(self, key: str) -> Any:
+        """返回基础字段的值；不存在时返回 `_MISSING`。"""
+        raise NotImplementedError
+
+    def _has(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def _base_keys(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def _clone(self, extra: Optional[Dict[str, Any]]) -> '_RecordView':
+        raise NotImplementedError
+
+    def __getitem__(self, key: str) -> Any:
+        extra = self._extra
+        if extra is not None:
+            value = extra.get(key, _MISSING)
+            if value is not _MISSING:
+                if value is _DELETED:
+                    raise KeyError(key)
+                return value
+        value = self._lookup(key)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if self._extra is None:
+            self._extra = {}
+        self._extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key not in self:
+            raise KeyError(key)
+        if self._has(key):
+            self[key] = _DELETED
+        else:
+            del self._extra[key]
+
+    def __contains__(self, key: object) -> bool:
+        extra = self._extra
+        if extra is not None and key in extra:
+            return extra[key] is not _DELETED
+        return self._has(key)
+
+    def __iter__(self) -> Iterator[str]:
+        extra = self._extra or {}
+        for key in self._base_keys():
+            if extra.get(key) is not _DELETED:
+                yield key
+        for key, value in extra.items():
+            if value is not _DELETED and not self._has(key):
+                yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def copy(self) -> '_RecordView':
+        """浅复制：共享底层数据，只复制 `_extra`。"""
+        return self._clone(dict(self._extra) if self._extra else None)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)!r})"
+
+
+class LazyRecord(_RecordView):
+    """按字节偏移惰性解码的记录，行为与普通记录字典一致（`get`、`in`、`copy` 等）。
+
+    解码结果和写入的字段（如 `qso_datetime`、增强后的 `dxcc`）保存在 `_extra` 中；
+    `copy()` 与原记录共享缓冲区和布局。
+    底层 mmap 关闭后，尚未解码的字段将无法再读取。
+    """
+    __slots__ = ('_src', '_layout', '_offsets')
+
+    def __init__(self, src: ByteSource, layout: RecordLayout, offsets: array,
+                 extra: Optional[Dict[str, Any]] = None):
+        self._src = src
+        self._layout = layout
+        self._offsets = offsets
+        self._extra = extra
+
+    def _lookup(self, key: str) -> Any:
+        slots = self._layout.slots.get(key)
+        if slots is None:
+            return _MISSING
+        offsets = self._offsets
+        decode = self._src.decode
+        if len(slots) == 1:
+            i = slots[0] * 2
+            value: Any = decode(offsets[i], offsets[i + 1])
+        else:
+            value = [decode(offsets[i * 2], offsets[i * 2 + 1]) for i in slots]
+        # 缓存解码结果，重复读取不再解码
+        if self._extra is None:
+            self._extra = {}
+        self._extra[key] = value
+        return value
+
+    def _has(self, key: str) -> bool:
+        return key in self._layout.slots
+
+    def _base_keys(self) -> Iterator[str]:
+        return iter(self._layout.keys)
+
+    def _clone(self, extra: Optional[Dict[str, Any]]) -> 'LazyRecord':
+        return LazyRecord(self._src, self._layout, self._offsets, extra)
+
+
+class RecordSchema:
+    """字段名 -> 槽位索引的共享表，随新字段出现而增长。"""
+    __slots__ = ('slots', 'names')
+
+    def __init__(self):
+        self.slots: Dict[str, int] = {}
+        self.names: List[str] = []
+
+    def slot(self, key: str) -> int:
+        slot = self.slots.get(key)
+        if slot is None:
+            slot = self.slots[key] = len(self.names)
+            self.names.append(key)
+        return slot
+
+
+class CompactRecord(_RecordView):
+    """紧凑记录：值按 `RecordSchema` 的槽位存放在元组中（None 表示该记录没有此字段）。"""
+    __slots__ = ('_schema', '_values')
+
+    def __init__(self, schema: RecordSchema, values: tuple,
+                 extra: Optional[Dict[str, Any]] = None):
+        self._schema = schema
+        self._values = values
+        self._extra = extra
+
+    def _lookup(self, key: str) -> Any:
+        slot = self._schema.slots.get(key)
+        if slot is None or slot >= len(self._values):
+            return _MISSING
+        value = self._values[slot]
+        return _MISSING if value is None else value
+
+    def _has(self, key: str) -> bool:
+        return self._lookup(key) is not _MISSING
+
+    def _base_keys(self) -> Iterator[str]:
+        names = self._schema.names
+        for slot, value in enumerate(self._values):
+            if value is not None:
+                yield names[slot]
+
+    def _clone(self, extra: Optional[Dict[str, Any]]) -> 'CompactRecord':
+        return CompactRecord(self._schema, self._values, extra)
+
+
+class RecordStore(Sequence):
+    """紧凑记录集合。
+
+    所有记录共享一个 `RecordSchema`；每个槽位维护一张驻留表，使 '20M'、'FT8'、'318'、'Y'
+    这类低基数值在整个日志中只保存一份。某槽位的不同取值超过 `intern_limit` 时
+    （如 CALL、TIME_ON），视为高基数字段并停止驻留，避免驻留表本身占用内存。
+    """
+
+    INTERN_LIMIT = 4096
+
+    def __init__(self, intern_limit: int = INTERN_LIMIT):
+        self.schema = RecordSchema()
+        self.intern_limit = intern_limit
+        self._records: List[CompactRecord] = []
+        self._interned: List[Optional[Dict[str, str]]] = []
+
+    @classmethod
+    def from_rows(cls, names: List[str], rows: List[tuple]) -> 'RecordStore':
+        """由字段名表和槽位元组（如 `ParseCache` 中保存的内容）直接重建，不再逐值驻留。"""
+        store = cls()
+        for key in names:
+            store.schema.slot(key)
+        store._interned = [{} for _ in names]
+        schema = store.schema
+        store._records = [CompactRecord(schema, row) for row in rows]
+        return store
+
+    def rows(self) -> List[tuple]:
+        """各记录的槽位元组，与 `schema.names` 一起即可完整还原集合。"""
+        return [rec._values for rec in self._records]
+
+    def append(self, record: Dict[str, Any]) -> CompactRecord:
+        """把一条记录字典压缩后加入集合，返回对应的 `CompactRecord`。"""
+        schema_slot = self.schema.slot
+        interned = self._interned
+        values: List[Any] = [None] * len(self.schema.names)
+        for key, value in record.items():
+            slot = schema_slot(key)
+            if slot >= len(values):
+                # 新字段：schema 增长，为其准备驻留表
+                values.extend([None] * (slot + 1 - len(values)))
+                while len(interned) <= slot:
+                    interned.append({})
+            table = interned[slot]
+            if table is not None and isinstance(value, str):
+                value = table.setdefault(value, value)
+                if len(table) > self.intern_limit:
+                    interned[slot] = None
+            values[slot] = value
+        rec = CompactRecord(self.schema, tuple(values))
+        self._records.append(rec)
+        return rec
+
+    def __getitem__(self, index):
+        return self._records[index]
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __iter__(self) -> Iterator[CompactRecord]:
+        return iter(self._records)
+
+
+__all__ = ['RecordLayout', 'ByteSource', 'LazyRecord', 'RecordSchema', 'CompactRecord', 'RecordStore']
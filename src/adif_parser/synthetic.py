@@ -0,0 +1,158 @@
+"""可复现的合成 LoTW 详细版导出，用于性能基准。
+
+    text = generate_lotw(100000, seed=1, china_share=0.4, multibyte_share=0.1)
+
+格式与 LoTW "详细" 导出一致：前几行为状态报告（第三行 "for CALL"），头部包含
+PROGRAMID/APP_LoTW_* 字段，每条记录带 DXCC/COUNTRY/APP_LoTW_DXCC_ENTITY_STATUS/CQZ 等，
+部分字段带 LoTW 风格的 ` // 注释`。同一组参数和种子总是生成相同的文本。
+"""
+import random
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# 默认 DXCC 组合：实体代码 -> (权重, 国家名, 呼号前缀, CQ 分区)
+# 中国（318）的比例由 `china_share` 单独控制
+DEFAULT_DXCC_MIX: Dict[int, Tuple[float, str, Tuple[str, ...], int]] = {
+    291: (20, 'UNITED STATES OF AMERICA', ('K', 'W', 'N', 'AA', 'KD', 'WA'), 5),
+    339: (18, 'JAPAN', ('JA', 'JE', 'JF', 'JH', 'JR'), 25),
+    230: (6, 'FEDERAL REPUBLIC OF GERMANY', ('DL', 'DJ', 'DK', 'DO'), 14),
+    15: (5, 'ASIATIC RUSSIA', ('UA9', 'RA9', 'UA0'), 17),
+    54: (5, 'EUROPEAN RUSSIA', ('UA3', 'RA3', 'RW6'), 16),
+    137: (6, 'REPUBLIC OF KOREA', ('HL', 'DS'), 25),
+    386: (4, 'TAIWAN', ('BV', 'BX', 'BM'), 24),
+    321: (2, 'HONG KONG', ('VR2',), 24),
+    152: (1, 'MACAO', ('XX9',), 24),
+    150: (4, 'AUSTRALIA', ('VK',), 30),
+    1: (3, 'CANADA', ('VE', 'VA'), 4),
+    223: (3, 'ENGLAND', ('G', 'M'), 14),
+    227: (2, 'FRANCE', ('F',), 14),
+    248: (2, 'ITALY', ('I', 'IK', 'IZ'), 15),
+    281: (2, 'SPAIN', ('EA',), 14),
+    108: (2, 'BRAZIL', ('PY',), 11),
+    100: (1, 'ARGENTINA', ('LU',), 13),
+    299: (2, 'WEST MALAYSIA', ('9M2',), 28),
+    324: (2, 'INDIA', ('VU',), 22),
+    170: (1, 'NEW ZEALAND', ('ZL',), 32),
+}
+
+CHINA = (318, 'CHINA', 24)
+CHINA_STATION_TYPES = 'ABDGHIY'
+
+US_STATES = ('CA', 'TX', 'NY', 'FL', 'WA', 'OH', 'MA', 'CO', 'AZ', 'MI', 'GA', 'VA')
+BANDS = (('20M', '14.07400'), ('40M', '7.07400'), ('15M', '21.07400'), ('10M', '28.07400'),
+         ('17M', '18.10000'), ('80M', '3.57300'), ('6M', '50.31300'))
+MODES = (('FT8', 'DATA'), ('FT4', 'DATA'), ('SSB', 'PHONE'), ('CW', 'CW'), ('RTTY', 'DATA'))
+GRID_LETTERS = 'ABCDEFGHIJKLMNOPQR'
+
+# 多字节字段的取值（QTH / NAME）
+MULTIBYTE_QTH = ('北京市海淀区', '广州市天河区', '成都市武侯区', '上海市浦东新区', '東京都千代田区', '서울특별시')
+MULTIBYTE_NAMES = ('王小明', '李华', '张伟', '山田太郎', '김민준')
+
+_LETTERS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+
+def _field(name: str, value: str, comment: str = '') -> str:
+    # ADIF 长度按 UTF-8 字节计，与 LoTW 导出一致
+    return f"<{name}:{len(value.encode('utf-8'))}>{value}{comment}\n"
+
+
+def _suffix(r: random.Random, lo: int = 1, hi: int = 3) -> str:
+    return ''.join(r.choice(_LETTERS) for _ in range(r.randint(lo, hi)))
+
+
+def _callsign(r: random.Random, prefixes: Sequence[str]) -> str:
+    prefix = r.choice(prefixes)
+    if not prefix[-1].isdigit():
+        prefix += str(r.randint(0, 9))
+    return prefix + _suffix(r)
+
+
+def _china_callsign(r: random.Random) -> str:
+    return f"B{r.choice(CHINA_STATION_TYPES)}{r.randint(0, 9)}{_suffix(r, 2, 3)}"
+
+
+def _grid(r: random.Random) -> str:
+    return f"{r.choice(GRID_LETTERS)}{r.choice(GRID_LETTERS)}{r.randint(0, 9)}{r.randint(0, 9)}"
+
+
+def generate_lotw(n: int, seed: int = 1, owncall: str = 'BG7XWF', china_share: float = 0.3,
+                  multibyte_share: float = 0.0, confirmed_share: float = 0.7,
+                  dxcc_mix: Optional[Dict[int, Tuple[float, str, Tuple[str, ...], int]]] = None,
+                  crlf: bool = False) -> str:
+    """生成 `n` 条 QSO 的合成 LoTW 详细版导出文本。
+
+    - `china_share`: 对方为中国大陆呼号的比例；
+    - `multibyte_share`: 带中文/日文/韩文 QTH、NAME 字段的记录比例；
+    - `confirmed_share`: QSL_RCVD=Y 的比例；
+    - `dxcc_mix`: 其余 QSO 的实体组合，默认 `DEFAULT_DXCC_MIX`。
+    """
+    r = random.Random(seed)
+    mix = dxcc_mix or DEFAULT_DXCC_MIX
+    entities = list(mix.items())
+    weights = [v[0] for _, v in entities]
+
+    out: List[str] = [
+        'ARRL Logbook of the World Status Report\n',
+        'Generated at 2024-01-01 12:00:00\n',
+        f'for {owncall}\n',
+        'Query:\n',
+        f'    OWNCALL: {owncall}\n',
+        'QSL ONLY: NO\n',
+        '\n',
+        _field('PROGRAMID', 'LoTW'),
+        _field('APP_LoTW_LASTQSL', '2024-01-01 00:00:00'),
+        _field('APP_LoTW_NUMREC', str(n)),
+        '\n<eoh>\n',
+    ]
+    for _ in range(n):
+        if r.random() < china_share:
+            dxcc, country, cqz = CHINA
+            call = _china_callsign(r)
+        else:
+            dxcc, (_, country, prefixes, cqz) = r.choices(entities, weights)[0]
+            call = _callsign(r, prefixes)
+        band, freq = r.choice(BANDS)
+        mode, modegroup = r.choice(MODES)
+        y, m, d = r.randint(2010, 2023), r.randint(1, 12), r.randint(1, 28)
+        hh, mm, ss = r.randint(0, 23), r.randint(0, 59), r.randint(0, 59)
+        confirmed = r.random() < confirmed_share
+
+        rec = [
+            _field('APP_LoTW_OWNCALL', owncall),
+            _field('STATION_CALLSIGN', owncall),
+            _field('MY_DXCC', '318', ' // CHINA'),
+            _field('MY_COUNTRY', 'CHINA'),
+            _field('APP_LoTW_MY_DXCC_ENTITY_STATUS', 'Current'),
+            _field('MY_GRIDSQUARE', 'OM89'),
+            _field('CALL', call),
+            _field('BAND', band),
+            _field('FREQ', freq),
+            _field('MODE', mode),
+            _field('APP_LoTW_MODEGROUP', modegroup),
+            _field('QSO_DATE', f'{y:04d}{m:02d}{d:02d}', ' // QSO Date'),
+            _field('TIME_ON', f'{hh:02d}{mm:02d}{ss:02d}', ' // Time of QSO'),
+            _field('APP_LoTW_QSO_TIMESTAMP', f'{y:04d}-{m:02d}-{d:02d}T{hh:02d}:{mm:02d}:{ss:02d}Z'),
+            _field('QSL_RCVD', 'Y' if confirmed else 'N'),
+        ]
+        if confirmed:
+            rec.append(_field('QSLRDATE', f'{y:04d}{m:02d}{d:02d}', ' // QSL Received Date'))
+            rec.append(_field('DXCC', str(dxcc), f' // {country}'))
+            rec.append(_field('COUNTRY', country))
+            rec.append(_field('APP_LoTW_DXCC_ENTITY_STATUS', 'Current'))
+            rec.append(_field('CQZ', str(cqz)))
+            if r.random() < 0.6:
+                rec.append(_field('GRIDSQUARE', _grid(r)))
+            if dxcc == 291:
+                rec.append(_field('STATE', r.choice(US_STATES), ' // US State'))
+        if r.random() < multibyte_share:
+            rec.append(_field('QTH', r.choice(MULTIBYTE_QTH)))
+            rec.append(_field('NAME', r.choice(MULTIBYTE_NAMES)))
+        rec.append('<eor>\n\n')
+        out.append(''.join(rec))
+    out.append('<APP_LoTW_EOF>\n')
+    text = ''.join(out)
+    if crlf:
+        text = text.replace('\n', '\r\n')
+    return text
+
+
+__all__ = ['DEFAULT_DXCC_MIX', 'generate_lotw']
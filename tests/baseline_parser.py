@@ -0,0 +1,170 @@
+"""基线版本（重写前）的 `parse_adif`，只作为测试中的对照实现。
+
+逐字段先找分号、再找下一个标签确定取值边界，对整段文本做多次扫描，很慢但行为明确；
+新的解析器在格式正确的日志上应给出完全相同的记录。不要在测试以外使用。
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+from adif_parser.parser import TAG_RE, normalize_text
+
+
+def drop_epochs(records):
+    """去掉后来新增的整数纪元秒字段（`qso_epoch` / `qso_end_epoch`），便于与基线结果比较。"""
+    out = []
+    for rec in records:
+        rec = dict(rec)
+        rec.pop('qso_epoch', None)
+        rec.pop('qso_end_epoch', None)
+        out.append(rec)
+    return out
+
+
+def _add_field(container: Dict[str, Any], tag: str, value: str) -> None:
+    tag = tag.upper()
+    if tag in container:
+        existing = container[tag]
+        if isinstance(existing, list):
+            existing.append(value)
+        else:
+            container[tag] = [existing, value]
+    else:
+        container[tag] = value
+
+
+def _first_value(v: Any) -> Any:
+    if isinstance(v, list) and v:
+        return v[0]
+    return v
+
+
+def _normalize_time_str(ts: Any):
+    if ts is None:
+        return None
+    s = str(ts).strip()
+    if not s:
+        return None
+    s2 = ''.join(ch for ch in s if ch.isdigit())
+    if not s2:
+        return None
+    if len(s2) == 4:
+        hh, mm, ss = s2[:2], s2[2:4], '00'
+    elif len(s2) == 6:
+        hh, mm, ss = s2[:2], s2[2:4], s2[4:6]
+    elif len(s2) <= 2:
+        hh, mm, ss = s2.zfill(2), '00', '00'
+    else:
+        return None
+    try:
+        hni, mni, sni = int(hh), int(mm), int(ss)
+        if not (0 <= hni < 24 and 0 <= mni < 60 and 0 <= sni < 60):
+            return None
+    except Exception:
+        return None
+    return f"{hh.zfill(2)}:{mm.zfill(2)}:{ss.zfill(2)}"
+
+
+def _normalize_date_str(ds: Any):
+    if ds is None:
+        return None
+    s = str(ds).strip()
+    s2 = ''.join(ch for ch in s if ch.isdigit())
+    if len(s2) == 8:
+        yyyy, mm, dd = s2[:4], s2[4:6], s2[6:8]
+        try:
+            datetime(int(yyyy), int(mm), int(dd))
+        except Exception:
+            return None
+        return f"{yyyy}-{mm}-{dd}"
+    try:
+        dt = datetime.fromisoformat(s)
+        return dt.date().isoformat()
+    except Exception:
+        return None
+
+
+def parse_adif(text: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    text = normalize_text(text)
+    pos = 0
+    seen_eoh = False
+    header: Dict[str, Any] = {}
+    records: List[Dict[str, Any]] = []
+    current: Dict[str, Any] = {}
+    length_text = len(text)
+
+    while True:
+        m = TAG_RE.search(text, pos)
+        if not m:
+            break
+        tag = m.group('tag').upper()
+        length = m.group('len')
+        val_start = m.end()
+
+        if length is not None:
+            ln = int(length)
+            semi = text.find(';', val_start)
+            lt = text.find('<', val_start)
+            if semi != -1 and (lt == -1 or semi < lt):
+                end = semi
+                value = text[val_start:end].strip()
+                pos = end
+                if pos < length_text and text[pos] == ';':
+                    pos += 1
+            else:
+                end_pos = min(val_start + ln, length_text)
+                value = text[val_start: end_pos]
+                pos = end_pos
+                if pos < length_text and text[pos] == ';':
+                    pos += 1
+        else:
+            semi = text.find(';', val_start)
+            lt = text.find('<', val_start)
+            candidates = [x for x in (semi, lt) if x != -1]
+            end = min(candidates) if candidates else length_text
+            value = text[val_start:end].strip()
+            pos = end
+            if pos < length_text and text[pos] == ';':
+                pos += 1
+
+        value = value.strip()
+
+        if tag == 'EOH':
+            seen_eoh = True
+            continue
+        if tag == 'EOR':
+            if current:
+                records.append({k.lower(): v for k, v in current.items()})
+            current = {}
+            continue
+
+        if not seen_eoh and not records:
+            _add_field(header, tag, value)
+        else:
+            _add_field(current, tag, value)
+
+    if current:
+        has_valid_data = False
+        for key, value in current.items():
+            if key != 'app_lotw_eof' and value:
+                has_valid_data = True
+                break
+        if has_valid_data:
+            records.append({k.lower(): v for k, v in current.items()})
+
+    header = {k.lower(): v for k, v in header.items()}
+
+    for rec in records:
+        date_raw = _first_value(rec.get('qso_date') or rec.get('date'))
+        time_on_raw = _first_value(rec.get('time_on') or rec.get('time'))
+        time_off_raw = _first_value(rec.get('time_off') or rec.get('time_off_on'))
+
+        date_iso = _normalize_date_str(date_raw)
+        time_on_iso = _normalize_time_str(time_on_raw)
+        time_off_iso = _normalize_time_str(time_off_raw)
+
+        if date_iso and time_on_iso:
+            rec['qso_datetime'] = f"{date_iso}T{time_on_iso}"
+        if date_iso and time_off_iso:
+            rec['qso_end_datetime'] = f"{date_iso}T{time_off_iso}"
+
+    return header, records
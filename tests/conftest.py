@@ -0,0 +1,39 @@
+"""测试的公共设置。
+
+与 app.py 和 awards 相同，把仓库根目录和 `src/` 加入 `sys.path`：解析器以 `adif_parser.*` 导入，
+奖状模块以 `awards.*` 导入。合成日志由 `adif_parser.synthetic` 生成，同一组参数总是得到相同的文本。
+"""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (os.path.join(ROOT, 'src'), ROOT):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from adif_parser.synthetic import generate_lotw  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def lotw_text():
+    """300 条 QSO 的合成 LoTW 详细版导出（只含 ASCII 字段）。"""
+    return generate_lotw(300, seed=7)
+
+
+@pytest.fixture(scope='session')
+def multibyte_text():
+    """带中文/日文/韩文 QTH、NAME 字段的合成导出，CRLF 换行。"""
+    return generate_lotw(200, seed=11, multibyte_share=0.5, crlf=True)
+
+
+@pytest.fixture(scope='session')
+def cty_sample():
+    """两个实体的小型 cty.dat：含带 (CQ)[ITU] 覆盖的前缀和 `=BG7XWF` 精确呼号。"""
+    return (
+        'China:                    24:  44:  AS:   36.00:  -102.00:    -8.0:  BY:\n'
+        '    3H,3H0(23)[42],BA,BD,BG,BY,=BG7XWF(23);\n'
+        'Japan:                    25:  45:  AS:   36.40:  -138.38:    -9.0:  JA:\n'
+        '    JA,JE,JR;\n'
+    )
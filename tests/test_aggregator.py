@@ -0,0 +1,75 @@
+"""一次扫描的奖状聚合（user-023）：结果与各奖状、各条件分别扫描的旧检查器相同。"""
+import logging
+
+import pytest
+
+from adif_parser import parse_adif
+from adif_parser.synthetic import generate_lotw
+from awards.aggregator import AggregationPlan, aggregate_condition
+from awards.callsign_parser import callsign_parser
+from awards.checker import AwardChecker
+from awards.conditions import AWARD_CONDITIONS
+from baseline_checker import AwardChecker as BaselineChecker
+
+# 旧检查器容易出错的取值：非数字/零 DXCC、大写键、缺呼号、DXCC 318 但呼号没有数字
+EDGE_RECORDS = [
+    {'call': 'BY1AA', 'dxcc': '318', 'my_dxcc': '318', 'gridsquare': 'OM89'},
+    {'CALL': 'BD4AA', 'DXCC': '318', 'QSO_DATE': '20240101'},
+    {'call': 'JA1AA', 'dxcc': 'abc'},
+    {'call': 'W1AW', 'dxcc': '0'},
+    {'call': 'BYABC', 'dxcc': '318'},
+    {'dxcc': '291', 'state': 'CA'},
+    {'call': 'BH1ABC', 'state': 'BJ', 'dxcc': 318},
+    {'call': 'VR2XMT', 'dxcc': '321'},
+]
+
+
+@pytest.fixture(scope='module')
+def checkers(tmp_path_factory):
+    # 空规则目录：只使用内置奖状，与旧检查器的奖状定义相同
+    return AwardChecker(str(tmp_path_factory.mktemp('rules'))), BaselineChecker()
+
+
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_check_all_awards_matches_baseline(checkers, seed):
+    checker, baseline = checkers
+    _, records = parse_adif(generate_lotw(400, seed=seed, china_share=0.5))
+    assert checker.check_all_awards(records) == baseline.check_all_awards(records)
+
+
+def test_edge_records_match_baseline(checkers):
+    checker, baseline = checkers
+    assert checker.check_all_awards(EDGE_RECORDS) == baseline.check_all_awards(EDGE_RECORDS)
+    for code in AWARD_CONDITIONS:
+        assert checker.check_single_award(code, EDGE_RECORDS) == baseline.check_single_award(code, EDGE_RECORDS)
+
+
+def test_single_condition_matches_baseline(lotw_text):
+    _, records = parse_adif(lotw_text)
+    enhanced = callsign_parser.enhance_records(records)
+    baseline = BaselineChecker()
+    for code, info in AWARD_CONDITIONS.items():
+        for condition in info['conditions']:
+            assert (aggregate_condition(condition, enhanced, callsign_parser)
+                    == baseline._check_condition(condition, enhanced, code))
+
+
+def test_identical_conditions_share_one_accumulator():
+    condition = AWARD_CONDITIONS['DXCC']['conditions'][0]
+    awards = {
+        'A': {'name': 'A', 'description': '', 'conditions': [condition]},
+        'B': {'name': 'B', 'description': '', 'conditions': [dict(condition)]},
+    }
+    plan = AggregationPlan(awards, callsign_parser)
+    assert plan.layout['A'][1] == plan.layout['B'][1]
+    results = plan.run(callsign_parser.enhance_records(EDGE_RECORDS), len(EDGE_RECORDS))
+    assert results['A']['conditions'] == results['B']['conditions']
+
+
+def test_china_zone_debug_output_goes_to_logging(checkers, caplog, capsys):
+    checker, _ = checkers
+    with caplog.at_level(logging.DEBUG, logger='awards.aggregator'):
+        result = checker.check_single_award('WACZ', EDGE_RECORDS)
+    assert result['conditions'][0]['connected_zones'] == ['1', '4']
+    assert any('WACZ检查结果' in r.getMessage() for r in caplog.records)
+    assert capsys.readouterr().out == ''
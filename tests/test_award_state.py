@@ -0,0 +1,132 @@
+"""增量奖状状态（user-025）：分批计入与一次重建结果相同，每个 QSO 只计入一次。"""
+import json
+import logging
+
+import pytest
+
+from adif_parser import parse_adif
+from awards.aggregator import CONDITION_ACCUMULATORS, AggregationPlan, RecordCountAccumulator
+from awards.award_state import AwardState, qso_id
+from awards.callsign_parser import callsign_parser
+from awards.checker import AwardChecker
+from awards.qso_store import QSOStore
+
+
+class ConfirmedCountAccumulator(RecordCountAccumulator):
+    """测试用的记录数类条件：已确认的 QSO 数。"""
+    __slots__ = ('condition',)
+
+    def __init__(self, condition, parser=None):
+        super().__init__(lambda record: str(record.get('qsl_rcvd', '')).upper() == 'Y')
+        self.condition = condition
+
+    def result(self):
+        target = self.condition.get('target', 0)
+        return {'met': self.count >= target, 'current': self.count, 'target': target,
+                'message': f'已确认 {self.count}/{target} 个 QSO'}
+
+
+@pytest.fixture(scope='module')
+def records(lotw_text):
+    return parse_adif(lotw_text)[1]
+
+
+@pytest.fixture
+def checker(tmp_path):
+    return AwardChecker(str(tmp_path))
+
+
+def _conditions(state):
+    return {code: [(c.get('current'), c['met']) for c in result['conditions']]
+            for code, result in state.results().items()}
+
+
+def test_two_parts_equal_full_rebuild(checker, records):
+    full = checker.award_state(records=records)
+    split = checker.award_state(records=records[:120])
+    update = split.apply(records[120:])
+    assert update['records'] == len(records) - 120
+    assert _conditions(split) == _conditions(full)
+    assert split.summary == full.summary
+    assert split.results() == full.results()
+    assert len(split) == len(full)
+    # 有变化的条件都带有变化消息，且当前数与状态一致
+    for change in update['changes']:
+        summary = split.summary[change['award']][change['condition']]
+        assert change['current'] == summary[0] and change['current'] > change['previous']
+
+
+def test_serialized_state_continues_identically(checker, records):
+    full = checker.award_state(records=records)
+    first = checker.award_state(records=records[:200])
+    masks = first.pop_masks()
+    data = json.loads(json.dumps(first.to_dict()))
+    # 位掩码单独保存，不在状态中
+    assert 'qsos' not in data and len(masks) == len({qso_id(rec) for rec in records[:200]})
+    restored = checker.award_state(data)
+    assert restored.restored and len(restored) == len(first)
+    restored.load_masks({qid: masks[qid] for qid in map(qso_id, records[150:]) if qid in masks})
+    restored.apply(records[150:])
+    assert restored.results() == full.results()
+    # 只有新 QSO 和计数有变化的 QSO 需要再次保存
+    assert set(restored.pop_masks()) <= {qso_id(rec) for rec in records[150:]}
+    assert restored.pop_masks() == {}
+
+
+def test_each_qso_counted_once(checker, records):
+    state = checker.award_state(records=records)
+    update = state.apply(records[:50])
+    assert update['new_qsos'] == 0 and update['changes'] == []
+    assert state.results() == checker.award_state(records=records).results()
+    unique = {qso_id(rec): rec for rec in records}
+    assert len(state) == len(unique)
+    # 不含重复 QSO 时与逐条统计的完整检查相同
+    assert state.results() == checker.check_all_awards(list(unique.values()))
+
+
+def test_record_count_condition_summary_updates(monkeypatch, records):
+    monkeypatch.setitem(CONDITION_ACCUMULATORS, 'confirmed_qsos', ConfirmedCountAccumulator)
+    confirmed = sum(1 for rec in records if rec.get('qsl_rcvd') == 'Y')
+    first = sum(1 for rec in records[:100] if rec.get('qsl_rcvd') == 'Y')
+    plan = AggregationPlan({'QSL': {'name': 'QSL', 'description': '',
+                                    'conditions': [{'type': 'confirmed_qsos', 'target': confirmed}]}},
+                           callsign_parser)
+    state = AwardState(plan)
+    state.apply(records[:100], report=False)
+    assert state.summary['QSL'] == [[first, False, []]]
+    update = state.apply(records[100:])
+    assert state.summary['QSL'] == [[confirmed, True, []]]
+    [change] = update['changes']
+    assert (change['previous'], change['current'], change['newly_met']) == (first, confirmed, True)
+    assert change['new_values'] == [] and change['evidence'] == {}
+    assert change['message'].startswith('QSL：已确认') and change['message'].endswith('条件已达成！')
+    assert update['newly_eligible'] == ['QSL']
+    # 重复上传不改变计数
+    assert state.apply(records)['changes'] == []
+
+
+def test_stale_state_is_rebuilt(checker, records, caplog):
+    data = checker.award_state(records=records[:10]).to_dict()
+    data['cty_version'] = 'outdated'
+    with caplog.at_level(logging.INFO, logger='awards.checker'):
+        state = checker.award_state(data, records)
+    assert not state.restored and len(state) == len({qso_id(rec) for rec in records})
+    assert any('奖状状态已过期' in r.getMessage() for r in caplog.records)
+
+
+def test_restored_state_with_saved_masks_counts_reupload_once(checker, records, tmp_path):
+    store = QSOStore(str(tmp_path / 'qso.sqlite3'))
+    first = checker.award_state(records=records[:200])
+    store.save_award_state('BG7XWF', first.to_dict(), 1, masks=first.pop_masks(), replace=True)
+    # 新上传与已计入的 QSO 有重叠：只读取这些 QSO 的位掩码
+    batch = records[100:]
+    version, data = store.load_award_state('BG7XWF')
+    state = checker.award_state(data)
+    state.load_masks(store.load_award_masks('BG7XWF', [qso_id(rec) for rec in batch]))
+    update = state.apply(batch)
+    assert update['new_qsos'] == len({qso_id(rec) for rec in records}) - len(first)
+    store.save_award_state('BG7XWF', state.to_dict(), version + 1, masks=state.pop_masks())
+    full = checker.award_state(records=records)
+    assert state.results() == full.results() and len(state) == len(full)
+    # 保存的位掩码与完整重建的一致
+    assert store.load_award_masks('BG7XWF', full.qsos) == full.qsos
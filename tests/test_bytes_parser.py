@@ -0,0 +1,87 @@
+"""字节级解析（user-003）：文本、流式、bytes 与 mmap 四种方式得到相同的记录。"""
+import io
+
+import pytest
+
+from adif_parser.bytes_parser import MappedAdif, header_text, parse_adif_bytes, parse_adif_bytes_iter
+from adif_parser.parser import parse_adif, parse_adif_iter
+from adif_parser.records import LazyRecord
+from adif_parser.synthetic import MULTIBYTE_NAMES, MULTIBYTE_QTH
+
+
+def _all_modes(text, tmp_path, **kwargs):
+    """同一份日志分别用四种方式解析，记录统一转为普通字典。"""
+    data = text.encode('utf-8')
+    path = tmp_path / 'log.adi'
+    path.write_bytes(data)
+    results = {'text': parse_adif(text, **kwargs)}
+    it = parse_adif_iter(io.StringIO(text), chunk_size=97, **kwargs)
+    results['stream'] = (next(it), list(it))
+    results['bytes'] = parse_adif_bytes(data, **kwargs)
+    with MappedAdif(path) as adif:
+        header, records = adif.parse(**kwargs)
+        results['mmap'] = (header, [dict(rec) for rec in records])
+    return {mode: (header, [dict(rec) for rec in records]) for mode, (header, records) in results.items()}
+
+
+def test_modes_agree(lotw_text, tmp_path):
+    results = _all_modes(lotw_text, tmp_path)
+    expected = results.pop('text')
+    assert len(expected[1]) == 300
+    for mode, result in results.items():
+        assert result == expected, mode
+
+
+def test_modes_agree_with_projection(lotw_text, tmp_path):
+    results = _all_modes(lotw_text, tmp_path, fields='call,band,qso_date,time_on')
+    expected = results.pop('text')
+    for mode, result in results.items():
+        assert result == expected, mode
+
+
+def test_records_are_lazy(lotw_text):
+    _, records = parse_adif_bytes(lotw_text.encode('utf-8'))
+    assert all(isinstance(rec, LazyRecord) for rec in records)
+
+
+def test_multibyte_lengths_are_bytes(multibyte_text, tmp_path):
+    data = multibyte_text.encode('utf-8')
+    header, records = parse_adif_bytes(data)
+    assert len(records) == 200
+    qth = {rec['qth'] for rec in records if 'qth' in rec}
+    names = {rec['name'] for rec in records if 'name' in rec}
+    assert qth and qth <= set(MULTIBYTE_QTH)
+    assert names and names <= set(MULTIBYTE_NAMES)
+
+    path = tmp_path / 'log.adi'
+    path.write_bytes(data)
+    with MappedAdif(path) as adif:
+        mapped_header, mapped = adif.parse()
+        assert mapped_header == header
+        assert [dict(rec) for rec in mapped] == [dict(rec) for rec in records]
+    it = parse_adif_bytes_iter(data)
+    assert next(it) == header
+    assert [dict(rec) for rec in it] == [dict(rec) for rec in records]
+
+
+@pytest.mark.parametrize('eor', [b'<EOR:0>', b'<eor>'])
+def test_sized_terminators(eor):
+    data = b'<PROGRAMID:4>LoTW<EOH:0>\n<CALL:4>K1AB' + eor + b'<CALL:4>JA1A' + eor
+    header, records = parse_adif_bytes(data)
+    assert header == {'programid': 'LoTW'}
+    assert [dict(rec) for rec in records] == [{'call': 'K1AB'}, {'call': 'JA1A'}]
+
+
+def test_header_text(lotw_text):
+    data = lotw_text.encode('utf-8')
+    text = header_text(data)
+    assert text.endswith('<eoh>')
+    assert 'APP_LoTW_NUMREC' in text
+    assert header_text(b'<CALL:4>K1AB<eor>') == ''
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / 'empty.adi'
+    path.write_bytes(b'')
+    with MappedAdif(path) as adif:
+        assert adif.parse() == ({}, [])
@@ -0,0 +1,101 @@
+"""解析缓存（user-008）：写入/读取往返，以及 `PARSER_VERSION` 变化后旧条目失效。"""
+import logging
+
+import pytest
+
+from adif_parser import cache as cache_module
+from adif_parser.bytes_parser import parse_adif_bytes
+from adif_parser.cache import MAGIC, ParseCache, content_digest
+from adif_parser.parser import parse_adif
+from adif_parser.records import LazyRecord, RecordStore
+
+FIELDS = ['call', 'band', 'dxcc', 'qso_date', 'time_on', 'qth', 'name']
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ParseCache(str(tmp_path / 'cache'))
+
+
+def test_lazy_round_trip(cache, multibyte_text):
+    data = multibyte_text.encode('utf-8')
+    header, records = parse_adif_bytes(data, fields=FIELDS)
+    expected = [dict(rec) for rec in records]
+    key = cache.key(content_digest(data), 'bytes', FIELDS)
+    cache.put(key, header, records)
+
+    hit = cache.get(key, len(data))
+    assert hit is not None
+    cached_header, cached = hit
+    assert cached_header == header
+    assert all(isinstance(rec, LazyRecord) for rec in cached)
+    assert [dict(rec) for rec in cached] == expected
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['bytes_saved'] == len(data)
+
+
+def test_put_does_not_decode_lazy_fields(cache, lotw_text):
+    header, records = parse_adif_bytes(lotw_text.encode('utf-8'))
+    before = [dict(rec._extra or {}) for rec in records]
+    cache.put('k', header, records)
+    assert [dict(rec._extra or {}) for rec in records] == before
+
+
+def test_written_and_deleted_fields_survive(cache):
+    header, records = parse_adif_bytes(b'<eoh><CALL:4>K1AB<BAND:3>20M<DXCC:3>291<eor>')
+    rec = records[0]
+    rec['dxcc'] = '110'
+    rec['province'] = 'HI'
+    del rec['band']
+    cache.put('k', header, records)
+    _, cached = cache.get('k')
+    assert dict(cached[0]) == {'call': 'K1AB', 'dxcc': '110', 'province': 'HI'}
+
+
+def test_dict_records_round_trip_as_store(cache, lotw_text):
+    header, records = parse_adif(lotw_text)
+    cache.put('k', header, records)
+    cached_header, cached = cache.get('k')
+    assert cached_header == header
+    assert isinstance(cached, RecordStore)
+    assert [dict(rec) for rec in cached] == records
+
+
+def test_miss_and_corrupt_entry(cache, caplog, capsys):
+    assert cache.get('missing') is None
+    with open(cache._path('bad'), 'wb') as f:
+        f.write(MAGIC + b'not marshal')
+    with caplog.at_level(logging.WARNING, logger='adif_parser.cache'):
+        assert cache.get('bad') is None
+    assert cache.stats()['misses'] == 2
+    assert cache.stats()['entries'] == 0
+    assert any('缓存条目损坏' in r.getMessage() for r in caplog.records)
+    assert capsys.readouterr().out == ''
+
+
+def test_parser_version_invalidates_keys(cache, monkeypatch, lotw_text):
+    data = lotw_text.encode('utf-8')
+    digest = content_digest(data)
+    header, records = parse_adif_bytes(data)
+    key = cache.key(digest, 'bytes', None)
+    cache.put(key, header, records)
+    assert cache.get(cache.key(digest, 'bytes', None)) is not None
+
+    monkeypatch.setattr(cache_module, 'PARSER_VERSION', cache_module.PARSER_VERSION + 1)
+    new_key = cache.key(digest, 'bytes', None)
+    assert new_key != key
+    assert cache.get(new_key) is None
+
+
+def test_key_depends_on_parameters():
+    assert ParseCache.key('d', 'bytes', ['call']) != ParseCache.key('d', 'bytes', ['call', 'band'])
+    assert ParseCache.key('d', 'bytes', 'call,band') == ParseCache.key('d', 'bytes', ['call', 'band'])
+
+
+def test_eviction_keeps_size_bound(tmp_path, lotw_text):
+    cache = ParseCache(str(tmp_path / 'cache'), max_bytes=1)
+    header, records = parse_adif(lotw_text)
+    cache.put('a', header, records)
+    cache.put('b', header, records)
+    assert cache.stats()['entries'] == 0
+    assert cache.evictions == 2
@@ -0,0 +1,60 @@
+"""呼号解析的有界 LRU 缓存（user-017）。"""
+from awards.callsign_parser import CallsignParser, LRUCache
+
+
+def test_lru_eviction_order():
+    cache = LRUCache(2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1        # a 变为最近使用
+    cache.put('c', 3)                 # 淘汰 b
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.stats() == {'size': 2, 'capacity': 2, 'hits': 3, 'misses': 1, 'evictions': 1,
+                             'hit_rate': 0.75}
+
+
+def test_get_many_counts_hits_and_misses():
+    cache = LRUCache(10)
+    cache.put_many({'a': 1, 'b': 2})
+    assert cache.get_many(['a', 'b', 'c']) == {'a': 1, 'b': 2}
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_zero_capacity_disables_cache():
+    cache = LRUCache(0)
+    cache.put('a', 1)
+    assert len(cache) == 0 and cache.get('a') is None
+
+
+def test_stale_token_is_not_written():
+    cache = LRUCache(10)
+    old, new = object(), object()
+    cache.validate(old)
+    cache.put_many({'a': 1}, old)
+    assert cache.validate(new) is True
+    assert len(cache) == 0
+    cache.put_many({'b': 2}, old)     # 按旧版本解析的结果被丢弃
+    assert cache.get('b') is None
+    assert cache.validate(new) is False
+
+
+def test_parser_results_are_cached():
+    parser = CallsignParser(cache_size=4)
+    first = parser.parse_callsign('by1aa')
+    assert parser.parse_callsign(' BY1AA ') == first
+    stats = parser.cache_stats()
+    assert (stats['size'], stats['hits'], stats['misses']) == (1, 1, 1)
+    # 返回的是副本，修改它不影响缓存
+    first['country'] = 'X'
+    assert parser.parse_callsign('BY1AA')['country'] != 'X'
+
+
+def test_parser_cache_is_bounded():
+    parser = CallsignParser(cache_size=3)
+    calls = ['BY1AA', 'JA1AA', 'K1AB', 'DL1AA', 'VK2AA']
+    uncached = CallsignParser(cache_size=0)
+    for call in calls:
+        assert parser.parse_callsign(call) == uncached.parse_callsign(call)
+    assert parser.cache_stats()['size'] == 3
+    assert parser.cache_stats()['evictions'] == 2
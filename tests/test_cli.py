@@ -0,0 +1,73 @@
+"""命令行 `parse`（user-011）：单文件/批量输出、gzip 和字节模式的变体检测。"""
+import gzip
+import json
+
+import pytest
+
+from adif_parser.cli import main
+from adif_parser.parser import parse_adif
+from adif_parser.synthetic import generate_lotw
+
+
+@pytest.fixture
+def log_files(tmp_path):
+    paths = []
+    for i in range(3):
+        path = tmp_path / f'log{i}.adi'
+        path.write_text(generate_lotw(20 + i, seed=i), encoding='utf-8')
+        paths.append(path)
+    return paths
+
+
+def _read_ndjson(path, opener=open):
+    with opener(path, 'rt', encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+@pytest.mark.parametrize('argv, name', [([], 'out.json.gz'), (['--gzip'], 'out.json'), (['--bytes'], 'out.json.gz')])
+def test_single_file_gzip(tmp_path, log_files, argv, name):
+    out = tmp_path / name
+    assert main(['parse', str(log_files[0]), '-o', str(out)] + argv) == 0
+    with gzip.open(out, 'rt', encoding='utf-8') as f:
+        result = json.load(f)
+    header, records = parse_adif(log_files[0].read_text(encoding='utf-8'))
+    assert result['header'] == header
+    assert result['records'] == records
+    assert result['variant'] == 'LoTW'
+
+
+def test_single_file_plain(tmp_path, log_files):
+    out = tmp_path / 'out.json'
+    assert main(['parse', str(log_files[0]), '-o', str(out), '--fields', 'call']) == 0
+    result = json.loads(out.read_text(encoding='utf-8'))
+    assert all(set(rec) == {'call'} for rec in result['records'])
+
+
+@pytest.mark.parametrize('argv', [[], ['--bytes']])
+def test_full_scan_reads_whole_file(tmp_path, argv):
+    body = ''.join('<CALL:4>K1AB<eor>\n' for _ in range(20))
+    path = tmp_path / 'log.adi'
+    path.write_text(f'<eoh>\n{body}<COMMENT:4>N1MM<eor>\n', encoding='utf-8')
+    out = tmp_path / 'out.json'
+    main(['parse', str(path), '-o', str(out)] + argv)
+    assert json.loads(out.read_text(encoding='utf-8'))['variant'] == 'Unknown'
+    main(['parse', str(path), '-o', str(out), '--full-scan'] + argv)
+    assert json.loads(out.read_text(encoding='utf-8'))['variant'] == 'N1MM Logger+'
+
+
+def test_batch_jobs_keep_input_order(tmp_path, log_files, monkeypatch):
+    files = [str(p) for p in log_files]
+    serial = tmp_path / 'serial.ndjson'
+    main(['parse', *files, '-o', str(serial)])
+    # 子进程的临时文件写到单独的目录中，检查复制后是否已删除
+    tmp_dir = tmp_path / 'tmp'
+    tmp_dir.mkdir()
+    monkeypatch.setenv('TMPDIR', str(tmp_dir))
+    parallel = tmp_path / 'parallel.ndjson.gz'
+    main(['parse', *files, '-o', str(parallel), '-j', '2'])
+
+    lines = _read_ndjson(serial)
+    assert _read_ndjson(parallel, gzip.open) == lines
+    assert [line['file'] for line in lines if 'header' in line] == files
+    assert sum('record' in line for line in lines) == 20 + 21 + 22
+    assert list(tmp_dir.iterdir()) == []
@@ -0,0 +1,62 @@
+"""列式输出（user-005）：`ColumnarLog` 与逐条记录的统计一致。"""
+from collections import Counter
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from adif_parser.columnar import EPOCH_MISSING, ColumnarLog  # noqa: E402
+from adif_parser.parser import parse_adif  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def parsed(lotw_text):
+    _, records = parse_adif(lotw_text)
+    _, log = parse_adif(lotw_text, columnar=True)
+    return records, log
+
+
+def test_records_round_trip(parsed):
+    records, log = parsed
+    assert isinstance(log, ColumnarLog)
+    assert len(log) == len(records)
+    assert [dict(rec) for rec in log] == records
+    assert dict(log[-1]) == records[-1]
+
+
+def test_value_counts_match_records(parsed):
+    records, log = parsed
+    for key in ('band', 'mode', 'dxcc', 'call'):
+        expected = Counter(rec[key] for rec in records if key in rec)
+        assert log.value_counts(key) == dict(expected)
+        assert log.nunique(key) == len(expected)
+
+
+def test_masks(parsed):
+    records, log = parsed
+    mask = log.mask('band', ['20M', '40M'])
+    assert int(mask.sum()) == sum(rec.get('band') in ('20M', '40M') for rec in records)
+    start, end = 1325376000, 1420070400   # 2012-01-01 ~ 2015-01-01
+    expected = sum(start <= rec['qso_epoch'] < end for rec in records if 'qso_epoch' in rec)
+    assert int(log.time_mask(start, end).sum()) == expected
+
+
+def test_missing_values():
+    log = ColumnarLog.from_records([{'call': 'K1AB', 'band': '20M'}, {'call': 'JA1A'}])
+    assert 'band' not in log[1]
+    assert log.column('band').tolist() == ['20M', None]
+    assert log.qso_epoch.tolist() == [EPOCH_MISSING, EPOCH_MISSING]
+    assert log.column('name').tolist() == [None, None]
+
+
+def test_repeated_tags_match_parse_adif():
+    text = ('<EOH><CALL:4>JA1A<BAND:3>20M<BAND:3>40M<MODE:2>CW<NOTES:1>a<NOTES:1>b<EOR>'
+            '<CALL:4>K1AB<BAND:3>20M<DXCC:3>291<DXCC:3>110<EOR>')
+    _, records = parse_adif(text)
+    _, log = parse_adif(text, columnar=True)
+    assert [dict(rec) for rec in log] == records
+    assert log[0]['band'] == ['20M', '40M'] and log[1]['dxcc'] == ['291', '110']
+    assert log.column('band').tolist() == [['20M', '40M'], '20M']
+    # 分类编码取最后一个值
+    assert log.value_counts('band') == {'40M': 1, '20M': 1}
+    assert log.value_counts('dxcc') == {'110': 1}
@@ -0,0 +1,93 @@
+"""cty.dat 编译索引（user-014）：写入、读取，以及 cty.dat 或索引版本变化时重新编译。"""
+import logging
+import marshal
+import os
+
+import pytest
+
+from adif_parser import callsign_parser as cp
+
+
+@pytest.fixture
+def cty_file(tmp_path, cty_sample):
+    path = tmp_path / 'cty.dat'
+    path.write_text(cty_sample, encoding='utf-8')
+    return path
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    """记录 `load_index` 触发的重新编译次数。"""
+    calls = []
+    real = cp.build_index
+
+    def counting(*args, **kwargs):
+        calls.append(args)
+        return real(*args, **kwargs)
+
+    monkeypatch.setattr(cp, 'build_index', counting)
+    return calls
+
+
+def test_build_writes_index(cty_file):
+    payload = cp.build_index(cty_file)
+    magic, version, digest, stat_key, stored = marshal.loads(cp.index_path(cty_file).read_bytes())
+    assert (magic, version) == (cp.INDEX_MAGIC, cp.INDEX_VERSION)
+    assert digest == payload['cty_digest'] == cp._digest(cty_file)
+    assert stat_key == cp._stat_key(cty_file)
+    assert stored == payload
+    assert payload['cty_exact'] and 'BG7XWF' in payload['cty_exact']
+    assert payload['prefix_to_dxcc']['JA'] == 'Japan'
+
+
+def test_load_reuses_index(cty_file, builds):
+    first = cp.load_index(cty_file)
+    assert len(builds) == 1
+    assert cp.load_index(cty_file) == first
+    assert len(builds) == 1
+
+
+def test_touched_file_with_same_content_reuses_index(cty_file, builds):
+    cp.load_index(cty_file)
+    st = cty_file.stat()
+    os.utime(cty_file, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+    cp.load_index(cty_file)
+    assert len(builds) == 1
+
+
+def test_changed_file_rebuilds(cty_file, builds):
+    cp.load_index(cty_file)
+    cty_file.write_text(cty_file.read_text(encoding='utf-8').replace('JA,JE,JR;', 'JA,JE,JR,7J;'), encoding='utf-8')
+    payload = cp.load_index(cty_file)
+    assert len(builds) == 2
+    assert '7J' in payload['cty_keys']
+
+
+@pytest.mark.parametrize('content', [b'garbage', marshal.dumps(('cty-index', -1, '', (0, 0), {}))])
+def test_corrupt_or_old_index_rebuilds(cty_file, builds, content):
+    cp.index_path(cty_file).write_bytes(content)
+    payload = cp.load_index(cty_file)
+    assert len(builds) == 1
+    assert 'BY' in payload['cty_keys']
+
+
+def test_index_disabled(cty_file, builds, monkeypatch):
+    monkeypatch.setenv('CTY_INDEX', '0')
+    payload = cp.load_index(cty_file)
+    assert builds == []
+    assert not cp.index_path(cty_file).exists()
+    assert 'BY' in payload['cty_keys']
+
+
+def test_missing_cty_file(tmp_path):
+    payload = cp.load_index(tmp_path / 'missing.dat')
+    assert payload['cty_keys'] == [] and payload['cty_digest'] == ''
+
+
+def test_unwritable_index_logs_warning(cty_file, tmp_path, caplog, capsys):
+    out = tmp_path / 'missing' / 'cty.idx'
+    with caplog.at_level(logging.WARNING, logger='adif_parser.callsign_parser'):
+        payload = cp.build_index(cty_file, out)
+    assert payload['cty_keys'] and not out.exists()
+    assert any('无法写入 cty 索引' in r.getMessage() for r in caplog.records)
+    assert capsys.readouterr().out == ''
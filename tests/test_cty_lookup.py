@@ -0,0 +1,95 @@
+"""cty.dat 最长前缀索引（user-015）：`CtyIndex` 的查找与 `=CALL` 精确呼号。"""
+import logging
+import random
+
+import pytest
+
+from adif_parser import callsign_parser as cp
+
+
+@pytest.fixture(scope='module')
+def sample_index(tmp_path_factory, cty_sample):
+    path = tmp_path_factory.mktemp('cty') / 'cty.dat'
+    path.write_text(cty_sample, encoding='utf-8')
+    return cp.CtyIndex(cp.load_index(path))
+
+
+@pytest.fixture(scope='module')
+def real_cty():
+    entities, prefixes, exact = cp._parse_cty_entities(cp._CTY)
+    if not prefixes:
+        pytest.skip('仓库中没有 cty.dat')
+    return cp.CtyIndex(cp.load_index(cp._CTY)), prefixes, exact
+
+
+def _brute_force(prefixes, exact, call):
+    if call in exact:
+        return call, exact[call]
+    best = max((p for p in prefixes if call.startswith(p)), key=len, default=None)
+    return (best, prefixes[best]) if best else None
+
+
+def test_longest_prefix(sample_index):
+    assert sample_index.match('BG7ABC')[0] == 'BG'
+    assert sample_index.match('3H0XYZ')[0] == '3H0'
+    assert sample_index.match('3H1XYZ')[0] == '3H'
+    assert sample_index.lookup('ja1aa').name == 'Japan'
+    assert sample_index.match('W1AW') is None
+    assert sample_index.match('') is None
+
+
+def test_prefix_overrides(sample_index):
+    entity = sample_index.lookup('3H0ABC')
+    assert (entity.cq_zone, entity.itu_zone) == (23, 42)
+    entity = sample_index.lookup('3H1ABC')
+    assert (entity.cq_zone, entity.itu_zone) == (24, 44)
+    # 经度、时区取反为东正
+    assert entity.lon == 102.0 and entity.utc_offset == 8.0
+
+
+def test_exact_call(sample_index):
+    assert sample_index.match('BG7XWF') == ('BG7XWF', sample_index.lookup('BG7XWF'))
+    assert sample_index.lookup('BG7XWF').cq_zone == 23
+    # 精确呼号只匹配完整呼号，不作为前缀使用
+    assert sample_index.match('BG7XWFA')[0] == 'BG'
+    assert sample_index.lookup('BG7XWF/P').cq_zone == 24
+
+
+def test_dxcc_code(sample_index):
+    assert sample_index.dxcc('BY1AA') == 318
+    assert sample_index.dxcc('JA1AA') == 339
+    assert sample_index.dxcc('W1AW') == 0
+
+
+def test_matches_brute_force_on_repo_cty(real_cty):
+    index, prefixes, exact = real_cty
+    r = random.Random(1)
+    calls = list(r.sample(sorted(exact), 200))
+    keys = sorted(prefixes)
+    for _ in range(2000):
+        key = r.choice(keys)
+        calls.append(key + ''.join(r.choice('0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ') for _ in range(r.randint(0, 4))))
+    calls += ['', 'Q1ABC', '0AA']
+    for call in calls:
+        expected = _brute_force(prefixes, exact, call)
+        found = index.match(call)
+        if expected is None:
+            assert found is None, call
+        else:
+            assert found == (expected[0], cp.CtyEntity(*expected[1])), call
+
+
+def test_module_helpers():
+    assert cp.find_country('BY1AA')[1] == cp.lookup_entity('BY1AA').name
+    assert cp.resolve_dxcc('BY1AA') == 318
+    assert cp.find_country('') is None
+
+
+def test_bad_entity_header_is_skipped_with_warning(tmp_path, cty_sample, caplog, capsys):
+    path = tmp_path / 'cty.dat'
+    path.write_text('Nowhere:  x:  1:  AS:  0:  0:  0:  XX:\n    XX;\n' + cty_sample, encoding='utf-8')
+    with caplog.at_level(logging.WARNING, logger='adif_parser.callsign_parser'):
+        entities, prefixes, _ = cp._parse_cty_entities(path)
+    assert 'XX' not in prefixes and prefixes['JA'][0] == 'Japan'
+    assert any('Nowhere' in r.getMessage() for r in caplog.records)
+    assert capsys.readouterr().out == ''
@@ -0,0 +1,87 @@
+"""cty.dat 热重载（user-020）：内容变化时整体替换快照，持有旧快照和缓存的调用方不受影响。"""
+import logging
+import os
+
+import pytest
+
+from adif_parser import callsign_parser as cp
+from awards.callsign_parser import CallsignParser
+
+KOREA = ('Republic of Korea:        25:  44:  AS:   37.50:  -127.00:    -9.0:  HL:\n'
+         '    HL,DS;\n')
+
+
+@pytest.fixture
+def cty_file(tmp_path, monkeypatch, cty_sample):
+    """把模块的 cty.dat 指向临时文件，测试结束后恢复原有的全局数据。"""
+    path = tmp_path / 'cty.dat'
+    path.write_text(cty_sample, encoding='utf-8')
+    monkeypatch.setattr(cp, '_CTY', path)
+    for name in ('_DATA', 'PREFIX_TO_DXCC', 'CONDENSED_LINES', 'CTY', 'DXCC'):
+        monkeypatch.setattr(cp, name, getattr(cp, name))
+    cp.reload(force=True)
+    return path
+
+
+def _bump_mtime(path):
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+
+
+def test_unchanged_file_is_not_reloaded(cty_file):
+    data = cp.current()
+    assert not cp.reload()
+    assert cp.current() is data
+
+
+def test_touch_without_content_change_keeps_version(cty_file):
+    data = cp.current()
+    _bump_mtime(cty_file)
+    assert not cp.reload()
+    assert cp.current().digest == data.digest
+    assert cp.current().stat_key == cp._stat_key(cty_file)
+
+
+def test_changed_content_swaps_snapshot(cty_file, cty_sample, caplog, capsys):
+    old = cp.current()
+    assert cp.lookup_entity('HL1AA') is None
+    cty_file.write_text(cty_sample + KOREA, encoding='utf-8')
+    _bump_mtime(cty_file)
+    capsys.readouterr()
+    with caplog.at_level(logging.INFO, logger='adif_parser.callsign_parser'):
+        assert cp.reload()
+    assert any('已重新加载' in r.getMessage() for r in caplog.records)
+    assert capsys.readouterr().out == ''
+    new = cp.current()
+    assert new.version != old.version and cp.cty_version() == new.version
+    assert cp.lookup_entity('HL1AA').name == 'Republic of Korea'
+    assert cp.CTY is new.cty and cp.CONDENSED_LINES is new.condensed_lines
+    # 旧快照仍然完整可用
+    assert old.cty.lookup('HL1AA') is None
+    assert old.cty.lookup('BG7XWF').cq_zone == 23
+
+
+def test_empty_file_keeps_current_version(cty_file):
+    data = cp.current()
+    cty_file.write_text('', encoding='utf-8')
+    _bump_mtime(cty_file)
+    assert not cp.reload()
+    assert cp.current().digest == data.digest
+
+
+def test_callsign_parser_switches_to_new_snapshot(cty_file, cty_sample, caplog, capsys):
+    parser = CallsignParser()
+    before = parser.parse_callsign('HL1AA')
+    version = parser.cty_version()
+    assert parser.parse_callsign('JA1AA')['country'] == 'Japan'
+    cty_file.write_text(cty_sample + KOREA, encoding='utf-8')
+    _bump_mtime(cty_file)
+    assert cp.reload()
+    capsys.readouterr()
+    with caplog.at_level(logging.INFO, logger='awards.callsign_parser'):
+        assert parser.cty_version() != version
+    assert any('已切换到 cty 版本' in r.getMessage() for r in caplog.records)
+    assert capsys.readouterr().out == ''
+    after = parser.parse_callsign('HL1AA')
+    assert after['country'] == 'Republic of Korea' and after != before
+    assert parser.parse_callsign('JA1AA')['country'] == 'Japan'
@@ -0,0 +1,51 @@
+"""日期/时间规范化与整数纪元秒（user-009）。"""
+import calendar
+from datetime import datetime
+
+import pytest
+
+from adif_parser.parser import _normalize_date_str, _normalize_time_str, _parse_date, _parse_time, parse_adif
+
+from baseline_parser import _normalize_date_str as baseline_date, _normalize_time_str as baseline_time
+
+
+@pytest.mark.parametrize('value', ['1234', '123456', '7', '12', '2400', '1260', '12:34', '12:34:56', '',
+                                   '12345', 'abcd', ' 0930 ', '000000'])
+def test_time_matches_baseline(value):
+    assert _normalize_time_str(value) == baseline_time(value)
+
+
+@pytest.mark.parametrize('value', ['20230105', '2023-01-05', '20230230', '2023', '', 'x', ' 20001231 ',
+                                   '2023-13-01', '2024-02-29'])
+def test_date_matches_baseline(value):
+    assert _normalize_date_str(value) == baseline_date(value)
+
+
+def test_epoch_is_utc(lotw_text):
+    _, records = parse_adif(lotw_text)
+    for rec in records:
+        dt = datetime.fromisoformat(rec['qso_datetime'])
+        assert rec['qso_epoch'] == calendar.timegm(dt.timetuple())
+
+
+def test_end_epoch():
+    _, records = parse_adif('<eoh><QSO_DATE:8>19700102<TIME_ON:4>0000<TIME_OFF:6>000001<eor>')
+    assert records[0]['qso_epoch'] == 86400
+    assert records[0]['qso_end_epoch'] == 86401
+    assert records[0]['qso_end_datetime'] == '1970-01-02T00:00:01'
+
+
+def test_invalid_time_has_no_epoch():
+    _, records = parse_adif('<eoh><QSO_DATE:8>20230105<TIME_ON:4>2561<eor>')
+    assert 'qso_epoch' not in records[0]
+    assert 'qso_datetime' not in records[0]
+
+
+def test_results_are_cached():
+    _parse_date.cache_clear()
+    _parse_time.cache_clear()
+    for _ in range(3):
+        _parse_date('20230105')
+        _parse_time('1234')
+    assert _parse_date.cache_info().hits == 2
+    assert _parse_time.cache_info().hits == 2
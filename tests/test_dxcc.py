@@ -0,0 +1,90 @@
+"""DXCC 实体表（user-016）：整数代码解析与 `DxccTable` 查找。"""
+import logging
+
+import pytest
+
+from adif_parser import callsign_parser as cp
+from adif_parser.dxcc import ADIF_DXCC_BY_PREFIX, DELETED_ENTITIES, DXCC_CODES, compile_table, dxcc_code
+from awards.callsign_parser import CallsignParser
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('318', 318), (' 318 ', 318), (318, 318), ('0', 0), ('', 0), (None, 0), ('DXCC0', 0),
+    ('1000', 0), (-1, 0), (1000, 0), ('3.5', 0),
+    # 非 ASCII 数字：isdigit() 为真，但不是 DXCC 代码
+    ('³', 0), ('٣١٨', 0), ('３１８', 0),
+])
+def test_dxcc_code(value, expected):
+    assert dxcc_code(value) == expected
+
+
+@pytest.fixture(scope='module')
+def table():
+    data = cp.current()
+    if not data.cty.keys:
+        pytest.skip('仓库中没有 cty.dat')
+    return data.dxcc
+
+
+def test_table_matches_cty_entities(table):
+    entities, _, _ = cp._parse_cty_entities(cp._CTY)
+    for name, prefix, cq, itu, continent, *_ in entities:
+        if prefix.startswith('*'):
+            continue
+        code = ADIF_DXCC_BY_PREFIX[prefix]
+        assert table.name(code) == name
+        assert table.continent(code) == continent
+        assert (table.cq_zones[code], table.itu_zones[code]) == (cq, itu)
+        assert code in table and not table.is_deleted(code)
+
+
+def test_deleted_entities(table):
+    for code, name in DELETED_ENTITIES.items():
+        assert table.is_deleted(code)
+        assert table.name(code) == name
+        assert code not in table.codes()
+        assert code in table.codes(include_deleted=True)
+
+
+def test_unknown_codes(table):
+    assert 0 not in table
+    assert table.name(0) is None
+    assert table.name(DXCC_CODES) is None
+    assert table.continent(-1) is None
+    assert not table.is_deleted(DXCC_CODES + 1)
+
+
+def test_resolve_dxcc_agrees_with_entities(table):
+    for call in ('BY1AA', 'JA1AA', 'K1AB', 'DL1AA', 'VK2AA', 'UA9AA'):
+        code = cp.resolve_dxcc(call)
+        assert code and table.name(code) == cp.lookup_entity(call).name
+
+
+def test_parser_dxcc_entity(table):
+    parser = CallsignParser(cache_size=0)
+    assert parser.dxcc_entity('318') == {'dxcc': 318, 'name': table.name(318), 'continent': 'AS',
+                                         'cq_zone': 24, 'itu_zone': 44, 'deleted': False}
+    assert parser.dxcc_name(291) == table.name(291)
+    assert parser.dxcc_entity('0') is None
+    assert parser.dxcc_entity('³') is None
+
+
+class _NoMatch:
+    def lookup(self, callsign):
+        return None
+
+
+def test_fallback_match_uses_table_zones(table):
+    parser = CallsignParser(cache_size=0)
+    data, fallback_index = parser._check_cty()
+    info = parser._parse_uncached('JA1AA', (data._replace(cty=_NoMatch()), fallback_index))
+    assert (info['country'], info['dxcc']) == ('Japan', 339)
+    assert (info['continent'], info['cq_zone'], info['itu_zone']) == ('AS', table.cq_zones[339], table.itu_zones[339])
+
+
+def test_unknown_primary_prefix_logs_warning(caplog, capsys):
+    entities = [('Nowhere', 'QQ9', 1, 1, 'AS'), ('Japan', 'JA', 25, 45, 'AS')]
+    with caplog.at_level(logging.WARNING, logger='adif_parser.dxcc'):
+        compile_table(entities)
+    assert any('QQ9' in r.getMessage() for r in caplog.records)
+    assert capsys.readouterr().out == ''
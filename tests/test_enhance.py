@@ -0,0 +1,60 @@
+"""批量与列式呼号增强（user-018）：结果与逐条 `enhance_record` 一致。"""
+import pytest
+
+from adif_parser.parser import parse_adif
+from awards.callsign_parser import CallsignParser
+
+
+@pytest.fixture(scope='module')
+def records(lotw_text):
+    _, records = parse_adif(lotw_text)
+    # 一部分记录去掉 DXCC/州字段，另加几条特殊呼号，覆盖各种填充分支
+    for i, rec in enumerate(records):
+        if i % 3 == 0:
+            rec.pop('dxcc', None)
+            rec.pop('state', None)
+    records += [{'call': 'BV2AA'}, {'call': 'VR2XX'}, {'call': 'XX9AA'}, {'call': ''}, {'band': '20M'},
+                {'call': 'BY1AA', 'state': 'XX'}, {'call': 'Q9ZZZ'}]
+    return records
+
+
+@pytest.fixture
+def parser():
+    return CallsignParser()
+
+
+def test_batch_matches_single(parser, records):
+    reference = CallsignParser(cache_size=0)
+    expected = [reference.enhance_record(rec) for rec in records]
+    assert parser.enhance_records(records) == expected
+    # 再来一次全部命中缓存
+    assert parser.enhance_records(records) == expected
+
+
+def test_records_are_not_modified(parser, records):
+    before = [dict(rec) for rec in records]
+    parser.enhance_records(records)
+    assert [dict(rec) for rec in records] == before
+
+
+def test_special_regions(parser):
+    tw, hk, mo, bj = parser.enhance_records([{'call': 'BV2AA'}, {'call': 'VR2XX'}, {'call': 'XX9AA'},
+                                             {'call': 'BH1ABC'}])
+    assert (tw['state'], hk['state'], mo['state']) == ('TW', 'HK', 'MO')
+    assert bj['dxcc'] == '318' and bj['state'] == 'BJ'
+
+
+def test_resolve_many(parser):
+    calls = ['BY1AA', 'by1aa', None, 'JA1AA', '', 'BY1AA']
+    results = parser.resolve_many(calls)
+    assert results == [parser.parse_callsign(c) for c in calls]
+    assert results[0] is results[1] is results[5]
+
+
+def test_columnar_matches_records(parser, records):
+    pytest.importorskip('numpy')
+    from adif_parser.columnar import ColumnarLog
+    log = ColumnarLog.from_records(records)
+    enhanced = parser.enhance_columnar(log)
+    assert isinstance(parser.enhance_records(log), ColumnarLog)
+    assert [dict(rec) for rec in enhanced] == [dict(rec) for rec in parser.enhance_records(records)]
@@ -0,0 +1,40 @@
+"""CONDENSED_LINES 回退匹配的前缀索引（user-019）：与逐行扫描的旧实现结果一致。"""
+import random
+
+from adif_parser.bench import _scan_condensed_lines
+from awards.callsign_parser import CONDENSED_LINES, CallsignParser, build_fallback_index
+
+
+def _tokens():
+    tokens = set()
+    for line in CONDENSED_LINES:
+        if ':' in line:
+            for p in line.split(':', 1)[0].split(','):
+                tokens.add(p.strip().split('-')[0])
+    return sorted(tokens)
+
+
+def test_index_matches_scan_on_every_token():
+    parser = CallsignParser()
+    for token in _tokens():
+        for cs in (token, token + '1AA', token + 'Z9'):
+            assert parser._fallback_country(cs) == _scan_condensed_lines(CONDENSED_LINES, cs), cs
+
+
+def test_index_matches_scan_on_random_calls():
+    parser = CallsignParser()
+    r = random.Random(3)
+    alphabet = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'
+    for _ in range(5000):
+        cs = ''.join(r.choice(alphabet) for _ in range(r.randint(1, 8)))
+        assert parser._fallback_country(cs) == _scan_condensed_lines(CONDENSED_LINES, cs), cs
+
+
+def test_earliest_line_wins_and_empty_names_are_ignored():
+    lines = ['X1,B: Second', 'BAD LINE', 'Q: ', 'BA-BL,Q: First', 'B: Third']
+    index = build_fallback_index(lines)
+    parser = CallsignParser()
+    for cs in ('BA1', 'B2', 'Q1', 'X1Y', 'Z'):
+        assert parser._fallback_country(cs, index) == _scan_condensed_lines(lines, cs), cs
+    assert parser._fallback_country('BA1', index) == 'Second'
+    assert parser._fallback_country('Z', index) is None
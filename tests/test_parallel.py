@@ -0,0 +1,60 @@
+"""多进程分块解析（user-007）：切块边界与合并顺序。"""
+import pytest
+
+from adif_parser.bytes_parser import parse_adif_bytes
+from adif_parser.parallel import (EOH_RE_BYTES, EOR_RE_BYTES, _parse_text_chunk, parse_adif_file_parallel,
+                                  parse_adif_parallel, split_body)
+from adif_parser.parser import normalize_text, parse_adif
+
+
+@pytest.mark.parametrize('jobs', [1, 2, 3, 7, 64])
+def test_split_ranges_cover_body_in_order(lotw_text, jobs):
+    text = normalize_text(lotw_text)
+    body_start, ranges = split_body(text, jobs)
+    assert ranges[0][0] == body_start
+    assert ranges[-1][1] == len(text)
+    assert len(ranges) <= jobs
+    for (_, end), (start, _) in zip(ranges, ranges[1:]):
+        assert end == start
+        assert text[:end].lower().endswith('<eor>')
+
+
+def test_split_without_eoh():
+    assert split_body('<CALL:4>K1AB<eor>', 4) is None
+
+
+def test_split_accepts_sized_eor():
+    data = b'<eoh:0>' + b''.join(b'<CALL:4>K%dAB<EOR:0>' % i for i in range(10))
+    body_start, ranges = split_body(data, 3, EOH_RE_BYTES, EOR_RE_BYTES)
+    assert len(ranges) == 3
+    assert all(data[:end].endswith(b'<EOR:0>') for _, end in ranges)
+
+
+@pytest.mark.parametrize('jobs', [2, 5, 13])
+def test_chunks_merge_in_original_order(lotw_text, jobs):
+    # 逐块串行解析后按切块顺序拼接，与整份解析一致（进程池只改变执行位置，不改变顺序）
+    text = normalize_text(lotw_text)
+    _, ranges = split_body(text, jobs)
+    merged = []
+    for start, end in ranges:
+        merged.extend(_parse_text_chunk(text[start:end], None))
+    assert merged == parse_adif(text)[1]
+
+
+def test_parallel_text_matches_serial(lotw_text):
+    assert parse_adif_parallel(lotw_text, 3, 'call,band,qso_date,time_on') == \
+        parse_adif(lotw_text, fields='call,band,qso_date,time_on')
+
+
+def test_parallel_file_matches_serial(multibyte_text, tmp_path):
+    data = multibyte_text.encode('utf-8')
+    path = tmp_path / 'log.adi'
+    path.write_bytes(data)
+    header, records = parse_adif_bytes(data)
+    assert parse_adif_file_parallel(str(path), 3) == (header, [dict(r) for r in records])
+
+
+def test_parallel_file_empty(tmp_path):
+    path = tmp_path / 'empty.adi'
+    path.write_bytes(b'')
+    assert parse_adif_file_parallel(str(path), 2) == ({}, [])
@@ -0,0 +1,100 @@
+"""流式解析器（user-001）：`parse_adif` / `parse_adif_iter` 与基线解析器的结果一致。"""
+import io
+
+import pytest
+
+from adif_parser.parser import parse_adif, parse_adif_iter
+
+from baseline_parser import drop_epochs, parse_adif as baseline_parse_adif
+
+SAMPLE = (
+    'ARRL Logbook of the World Status Report\n'
+    'for BG7XWF\n'
+    '<PROGRAMID:4>LoTW\n'
+    '<APP_LoTW_NUMREC:1>3\n'
+    '<eoh>\n'
+    '<CALL:5>JA1AA <BAND:3>20M <MODE:3>FT8 <QSO_DATE:8>20230105 // QSO Date\n'
+    '<TIME_ON:6>123456 <TIME_OFF:4>1300 <QSL_RCVD:1>Y\n'
+    '<eor>\n'
+    '<call:4>K1AB<band:3>40m<mode:2>CW<qso_date:8>20221231<time_on:4>2359<EOR>\n'
+    '<CALL:6>BG7XWF<BAND:3>15M<COMMENT:1>a<COMMENT:1>b<QSO_DATE:8>20230230<TIME_ON:4>0000\n'
+    '<eor>\n'
+    '<APP_LoTW_EOF>\n'
+)
+
+
+def _assert_baseline(text):
+    header, records = parse_adif(text)
+    base_header, base_records = baseline_parse_adif(text)
+    assert header == base_header
+    assert drop_epochs(records) == base_records
+
+
+def test_sample_matches_baseline():
+    _assert_baseline(SAMPLE)
+
+
+def test_synthetic_lotw_matches_baseline(lotw_text):
+    _assert_baseline(lotw_text)
+
+
+@pytest.mark.parametrize('text', [
+    '<eoh><CALL:4>K1AB',                       # 末尾没有 EOR
+    '<eoh><CALL:4>K1AB<eor><APP_LoTW_EOF>',   # 只有结束标签的尾部记录
+    '\ufeff<eoh>\r\n<CALL:4>K1AB\r\n<eor>\r\n',
+    '<CALL:4>K1AB<eor>',                       # 没有 EOH
+    '',
+])
+def test_edge_cases_match_baseline(text):
+    _assert_baseline(text)
+
+
+def test_repeated_fields_become_lists():
+    _, records = parse_adif(SAMPLE)
+    assert records[2]['comment'] == ['a', 'b']
+
+
+def test_datetime_and_epoch():
+    _, records = parse_adif(SAMPLE)
+    assert records[0]['qso_datetime'] == '2023-01-05T12:34:56'
+    assert records[0]['qso_end_datetime'] == '2023-01-05T13:00:00'
+    assert records[0]['qso_epoch'] == 1672922096
+    assert records[1]['qso_datetime'] == '2022-12-31T23:59:00'
+    # 无效日期不生成时间字段
+    assert 'qso_datetime' not in records[2]
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 64, 4096])
+def test_chunked_stream_matches_whole_text(lotw_text, chunk_size):
+    header, records = parse_adif(lotw_text)
+    it = parse_adif_iter(io.StringIO(lotw_text), chunk_size=chunk_size)
+    assert next(it) == header
+    assert list(it) == records
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 5])
+def test_chunked_stream_crlf(chunk_size):
+    text = SAMPLE.replace('\n', '\r\n')
+    it = parse_adif_iter(io.StringIO(text), chunk_size=chunk_size)
+    header = next(it)
+    assert (header, list(it)) == parse_adif(SAMPLE)
+
+
+class _CountingReader(io.StringIO):
+    def __init__(self, text):
+        super().__init__(text)
+        self.chars_read = 0
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self.chars_read += len(data)
+        return data
+
+
+def test_stream_is_incremental(lotw_text):
+    reader = _CountingReader(lotw_text)
+    it = parse_adif_iter(reader, chunk_size=256)
+    next(it)
+    first = next(it)
+    assert first['call']
+    assert reader.chars_read < len(lotw_text) // 10
@@ -0,0 +1,94 @@
+"""一份日志只增强一次、由所有奖状共用（user-022）。"""
+from adif_parser import parse_adif
+from awards.checker import AwardChecker
+from awards.prepared_log import PreparedLog, PreparedLogCache
+
+
+class CountingParser:
+    """只记录增强次数的呼号解析器替身，cty 版本可由测试修改。"""
+
+    def __init__(self):
+        self.version = 'v1'
+        self.calls = 0
+
+    def cty_version(self):
+        return self.version
+
+    def enhance_records(self, records):
+        self.calls += 1
+        return [dict(rec, enhanced=self.version) for rec in records]
+
+
+RECORDS = [
+    {'call': 'BG7XWF', 'qso_date': '20240101'},
+    {'call': 'BG7XWF', 'qso_date': '20240101'},
+    {'call': 'BG7XWF', 'qso_date': '20240102'},
+    {'CALL': 'JA1AA', 'QSO_DATE': '20240101'},
+    {'call': 'BH1ABC'},
+]
+
+
+def test_enhances_once_until_cty_version_changes():
+    parser = CountingParser()
+    prepared = PreparedLog(iter(RECORDS), parser)
+    assert len(prepared) == len(RECORDS) and prepared.cty_version is None
+    first = prepared.enhanced
+    assert prepared.enhanced is first and parser.calls == 1
+    assert prepared.cty_version == 'v1'
+    parser.version = 'v2'
+    second = prepared.enhanced
+    assert parser.calls == 2 and second[0]['enhanced'] == 'v2'
+    assert prepared.enhanced is second
+
+
+def test_cache_lru_and_stats():
+    parser = CountingParser()
+    cache = PreparedLogCache(2)
+    a = cache.get_or_prepare('a', RECORDS, parser)
+    assert cache.get_or_prepare('a', [], parser) is a
+    cache.get_or_prepare('b', RECORDS, parser)
+    cache.get('a')
+    cache.get_or_prepare('c', RECORDS, parser)   # 淘汰最久未使用的 b
+    assert cache.get('b') is None and cache.get('a') is a
+    assert cache.stats() == {'size': 2, 'capacity': 2, 'hits': 1, 'misses': 3}
+
+
+def test_zero_capacity_cache_keeps_nothing():
+    cache = PreparedLogCache(0)
+    cache.get_or_prepare('a', RECORDS, CountingParser())
+    assert cache.get('a') is None
+
+
+def test_checker_shares_one_enhancement(tmp_path, lotw_text, monkeypatch):
+    checker = AwardChecker(str(tmp_path))
+    _, records = parse_adif(lotw_text)
+    calls = []
+    real = checker.callsign_parser.enhance_records
+    monkeypatch.setattr(checker.callsign_parser, 'enhance_records',
+                        lambda recs: calls.append(1) or real(recs))
+    prepared = checker.prepare(records, key='BG7XWF')
+    assert checker.prepare(records, key='BG7XWF') is prepared
+    assert checker.prepare(prepared) is prepared
+    results = checker.check_all_awards(records, key='BG7XWF')
+    for code in results:
+        assert checker.check_single_award(code, prepared) == results[code]
+    assert len(calls) == 1
+    # 不带键时每次新建，结果与共用的增强相同
+    assert checker.check_all_awards(records) == results
+    assert len(calls) == 2
+
+
+def test_award_state_rebuild_shares_prepared_log(tmp_path, lotw_text, monkeypatch):
+    checker = AwardChecker(str(tmp_path))
+    _, records = parse_adif(lotw_text)
+    calls = []
+    real = checker.callsign_parser.enhance_records
+    monkeypatch.setattr(checker.callsign_parser, 'enhance_records',
+                        lambda recs: calls.append(1) or real(recs))
+    state = checker.award_state(records=records, key=('BG7XWF', 1))
+    assert checker.award_state(records=records, key=('BG7XWF', 1)).results() == state.results()
+    prepared = checker.prepare(records, ('BG7XWF', 1))
+    assert prepared.cty_version is not None
+    for code in state.results():
+        checker.check_single_award(code, prepared)
+    assert len(calls) == 1
@@ -0,0 +1,63 @@
+"""字段投影（user-006）：`fields=` 只保留所选字段，其余结果与完整解析一致。"""
+import io
+
+import pytest
+
+from adif_parser.bytes_parser import parse_adif_bytes
+from adif_parser.parser import FieldProjection, parse_adif, parse_adif_iter
+
+DERIVED = ('qso_datetime', 'qso_end_datetime', 'qso_epoch', 'qso_end_epoch')
+
+
+def _project(record, keep):
+    return {k: v for k, v in record.items() if keep[k] or k in DERIVED}
+
+
+@pytest.mark.parametrize('fields', [
+    'call,band,qso_date,time_on',
+    ['CALL', 'Band', ' mode '],
+    ['call', 'app_lotw_*'],
+    ['qsl_rcvd'],
+])
+def test_projection_matches_full_parse(lotw_text, fields):
+    header, records = parse_adif(lotw_text)
+    keep = FieldProjection(fields.split(',') if isinstance(fields, str) else fields)
+    projected_header, projected = parse_adif(lotw_text, fields=fields)
+    # header 不受投影影响
+    assert projected_header == header
+    # 记录数不变，即使某些记录的所选字段全部缺失
+    assert len(projected) == len(records)
+    for full, rec in zip(records, projected):
+        expected = _project(full, keep)
+        if not {'qso_date', 'time_on'} <= set(keep.exact):
+            expected = {k: v for k, v in expected.items() if k not in DERIVED}
+        assert rec == expected
+
+
+def test_projection_keeps_datetime_when_sources_selected(lotw_text):
+    _, records = parse_adif(lotw_text)
+    _, projected = parse_adif(lotw_text, fields='qso_date,time_on')
+    assert [r['qso_epoch'] for r in projected] == [r['qso_epoch'] for r in records]
+
+
+def test_projection_agrees_across_parsers(lotw_text):
+    fields = ['call', 'dxcc', 'app_lotw_*']
+    _, text_records = parse_adif(lotw_text, fields=fields)
+    it = parse_adif_iter(io.StringIO(lotw_text), chunk_size=50, fields=fields)
+    next(it)
+    assert list(it) == text_records
+    _, byte_records = parse_adif_bytes(lotw_text.encode('utf-8'), fields=fields)
+    assert [dict(r) for r in byte_records] == text_records
+
+
+def test_projected_away_records_are_kept():
+    text = '<eoh><CALL:4>K1AB<eor><NAME:3>Bob<eor><NAME:0><eor>'
+    _, records = parse_adif(text, fields='call')
+    assert records == [{'call': 'K1AB'}, {}, {}]
+
+
+def test_prefix_wildcard():
+    keep = FieldProjection(['app_lotw_*', 'CALL'])
+    assert keep['call'] and keep['app_lotw_modegroup']
+    assert not keep['band']
+    assert keep['eor'] and keep['eoh']
@@ -0,0 +1,64 @@
+"""中国呼号 -> 省份的区间索引（user-021）：与逐段比较的旧实现结果一致。"""
+import random
+
+from adif_parser.bench import _scan_province_segments, province_call_patterns
+from awards.china_callsign_province_map import (CHINA_CALLSIGN_PROVINCE_MAP, ProvinceIndex,
+                                                get_province_by_callsign, is_callsign_in_segment,
+                                                parse_callsign_segment)
+
+
+def _scan(province_map, callsign):
+    for province_code, segments in province_map.items():
+        for segment in segments:
+            start_call, end_call = parse_callsign_segment(segment)
+            if is_callsign_in_segment(callsign, start_call, end_call):
+                return province_code
+    return None
+
+
+def test_matches_scan_on_all_short_patterns():
+    for cs in province_call_patterns(1):
+        assert get_province_by_callsign(cs) == _scan_province_segments(cs), cs
+
+
+def test_matches_scan_on_random_calls():
+    r = random.Random(5)
+    letters = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+    calls = [f'B{r.choice(letters[:12])}{r.randint(0, 9)}' + ''.join(r.choice(letters) for _ in range(r.randint(2, 3)))
+             for _ in range(3000)]
+    for cs in calls + ['VR2XX', 'XX9A', 'JA1AA', 'B', 'BA', '', ' bh1abc ']:
+        assert get_province_by_callsign(cs) == _scan_province_segments(cs), cs
+
+
+def test_segment_boundaries():
+    for province_code, segments in CHINA_CALLSIGN_PROVINCE_MAP.items():
+        for segment in segments:
+            start_call, end_call = parse_callsign_segment(segment)
+            for cs in (start_call, end_call):
+                assert get_province_by_callsign(cs) == _scan_province_segments(cs), cs
+
+
+def test_known_calls():
+    assert get_province_by_callsign('BH1ABC') == 'BJ'
+    assert get_province_by_callsign('bd4aa') == 'SH'
+    assert get_province_by_callsign('BG7XWF') == 'GX'
+    assert get_province_by_callsign('VR2XMT') == 'HK'
+    assert get_province_by_callsign('XX9TR') == 'MO'
+    assert get_province_by_callsign(None) is None
+
+
+def test_overlapping_and_cross_prefix_segments_keep_map_order():
+    province_map = {
+        'P1': ['BA1M-BA1Z'],
+        'P2': ['BA1A-BA1P'],           # 与 P1 重叠，重叠部分 P1 在前
+        'P3': ['BA2A-BB2Z', 'BC3C'],   # 起止前缀不同，逐段比较
+        'P4': ['BA2AA-BA2ZZ', 'BC3A-BC3Z'],
+    }
+    index = ProvinceIndex(province_map)
+    calls = ['BA1A', 'BA1N', 'BA1P', 'BA1Q', 'BA1ZZ', 'BA2B', 'BA2AB', 'BB1A', 'BC3C', 'BC3B', 'BC3D', 'BD1A']
+    for cs in calls:
+        assert index.lookup(cs) == _scan(province_map, cs), cs
+    assert index.lookup('BA1N') == 'P1'
+    assert index.lookup('BA2AB') == 'P3'
+    assert index.lookup('BC3C') == 'P3'
+    assert index.lookup('BC3D') == 'P4'
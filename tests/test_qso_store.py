@@ -0,0 +1,92 @@
+"""QSO 历史（user-013）：按 QSO 指纹 upsert，确认信息只升级不降级。"""
+import pytest
+
+from awards.qso_store import QSOStore, qso_fingerprint
+
+
+def _qso(call, band='20M', mode='FT8', when='2023-01-05T12:34:56', **fields):
+    rec = {'call': call, 'band': band, 'mode': mode, 'qso_datetime': when}
+    rec.update(fields)
+    return rec
+
+
+@pytest.fixture
+def store(tmp_path):
+    return QSOStore(str(tmp_path / 'db' / 'qso.sqlite3'))
+
+
+def test_fingerprint():
+    assert qso_fingerprint({'call': ' k1ab ', 'band': '20m', 'mode': 'ft8', 'qso_datetime': 'T'}) == \
+        ('K1AB', '20M', 'FT8', 'T')
+    assert qso_fingerprint({'call': 'K1AB', 'qso_date': '20230105', 'time_on': '1234'})[3] == '20230105T1234'
+    assert qso_fingerprint({'band': '20M'}) is None
+
+
+def test_insert_update_unchanged_skipped(store):
+    counts = store.ingest('bg7xwf', [_qso('K1AB'), _qso('JA1A'), {'band': '20M'}],
+                          {'app_lotw_lastqsl': '2023-01-01 00:00:00'})
+    assert counts == {'inserted': 2, 'updated': 0, 'unchanged': 0, 'skipped': 1}
+    changed = []
+    counts = store.ingest('BG7XWF', [_qso('K1AB', qsl_rcvd='Y'), _qso('JA1A'), _qso('W1AW')],
+                          {'app_lotw_lastqsl': '2022-06-01 00:00:00'}, changed=changed)
+    assert counts == {'inserted': 1, 'updated': 1, 'unchanged': 1, 'skipped': 0}
+    assert [rec['call'] for rec in changed] == ['K1AB', 'W1AW']
+    assert store.count('BG7XWF') == 3
+    assert store.version('BG7XWF') == 2
+    # LASTQSL 只前进
+    assert store.last_qsl('BG7XWF') == '2023-01-01 00:00:00'
+    assert [rec['call'] for rec in store.records('BG7XWF')] == ['K1AB', 'JA1A', 'W1AW']
+
+
+def test_confirmation_is_not_downgraded(store):
+    store.ingest('BG7XWF', [_qso('K1AB', qsl_rcvd='Y', qslrdate='20230110', name='Bob')])
+    counts = store.ingest('BG7XWF', [_qso('K1AB', qsl_rcvd='N', name='Robert')])
+    assert counts['updated'] == 1
+    rec = store.records('BG7XWF')[0]
+    assert rec['qsl_rcvd'] == 'Y'
+    assert rec['qslrdate'] == '20230110'
+    # 非确认字段照常更新
+    assert rec['name'] == 'Robert'
+
+
+def test_cached_history_matches_fresh_store(store, tmp_path):
+    store.records('BG7XWF')
+    store.ingest('BG7XWF', [_qso('K1AB'), _qso('JA1A')])
+    store.ingest('BG7XWF', [_qso('K1AB', qsl_rcvd='Y'), _qso('DL1A')])
+    fresh = QSOStore(store.path)
+    assert store.records('BG7XWF') == fresh.records('BG7XWF')
+
+
+def test_history_written_by_another_store_is_reloaded(store):
+    assert store.records('BG7XWF') == []
+    QSOStore(store.path).ingest('BG7XWF', [_qso('K1AB')])
+    assert [rec['call'] for rec in store.records('BG7XWF')] == ['K1AB']
+
+
+def test_stations_are_separate(store):
+    store.ingest('BG7XWF', [_qso('K1AB')])
+    store.ingest('BA1AA', [_qso('K1AB'), _qso('JA1A')])
+    assert store.count('BG7XWF') == 1
+    assert store.count('BA1AA') == 2
+    store.delete('BA1AA')
+    assert store.records('BA1AA') == []
+    assert store.count('BG7XWF') == 1
+
+
+def test_award_state_round_trip(store):
+    assert store.load_award_state('BG7XWF') is None
+    store.save_award_state('bg7xwf', {'format': 1, 'qsos': {'a': 1}}, 3)
+    assert store.load_award_state('BG7XWF') == (3, {'format': 1, 'qsos': {'a': 1}})
+
+
+def test_award_masks_are_saved_incrementally(store):
+    store.save_award_state('bg7xwf', {}, 1, masks={'a': 1, 'b': 0})
+    store.save_award_state('bg7xwf', {}, 2, masks={'b': 2, 'c': 3})
+    assert store.load_award_masks('BG7XWF', ['a', 'b', 'c', 'd', None]) == {'a': 1, 'b': 2, 'c': 3}
+    assert store.load_award_masks('BA1AA', ['a']) == {}
+    # 超过单条查询参数上限时分批读取
+    many = {str(n): n for n in range(1200)}
+    store.save_award_state('bg7xwf', {}, 3, masks=many, replace=True)
+    assert store.load_award_masks('BG7XWF', list(many) + ['a']) == many
+    store.delete('BG7XWF')
+    assert store.load_award_masks('BG7XWF', list(many)) == {}
@@ -0,0 +1,60 @@
+"""紧凑记录（user-004）：`RecordStore` / `CompactRecord` 与普通字典记录等价。"""
+from adif_parser.parser import parse_adif
+from adif_parser.records import CompactRecord, RecordStore
+
+
+def test_compact_parse_matches_dicts(lotw_text):
+    _, records = parse_adif(lotw_text)
+    _, store = parse_adif(lotw_text, compact=True)
+    assert isinstance(store, RecordStore)
+    assert len(store) == len(records)
+    assert [dict(rec) for rec in store] == records
+    assert all(isinstance(rec, CompactRecord) for rec in store)
+
+
+def test_low_cardinality_values_are_interned(lotw_text):
+    _, store = parse_adif(lotw_text, compact=True)
+    bands = {}
+    for rec in store:
+        band = rec['band']
+        assert bands.setdefault(band, band) is band
+
+
+def test_high_cardinality_slot_stops_interning():
+    store = RecordStore(intern_limit=3)
+    for i in range(10):
+        store.append({'call': f'K{i}AB', 'band': '20M'})
+    slot = store.schema.slots['call']
+    assert store._interned[slot] is None
+    assert store._interned[store.schema.slots['band']] is not None
+    assert [rec['call'] for rec in store] == [f'K{i}AB' for i in range(10)]
+
+
+def test_schema_grows_with_new_fields():
+    store = RecordStore()
+    first = store.append({'call': 'K1AB'})
+    second = store.append({'call': 'JA1A', 'name': 'Taro'})
+    assert dict(first) == {'call': 'K1AB'}
+    assert dict(second) == {'call': 'JA1A', 'name': 'Taro'}
+    assert 'name' not in first
+    assert first.get('name') is None
+
+
+def test_mapping_interface():
+    store = RecordStore()
+    rec = store.append({'call': 'K1AB', 'band': '20M'})
+    rec['dxcc'] = '291'
+    del rec['band']
+    assert dict(rec) == {'call': 'K1AB', 'dxcc': '291'}
+    assert len(rec) == 2
+    copy = rec.copy()
+    copy['call'] = 'W1AW'
+    assert rec['call'] == 'K1AB'
+    # 写入和删除保存在视图上，集合中的槽位元组不变
+    assert store.rows() == [('K1AB', '20M')]
+
+
+def test_rows_round_trip(lotw_text):
+    _, store = parse_adif(lotw_text, compact=True)
+    rebuilt = RecordStore.from_rows(list(store.schema.names), store.rows())
+    assert [dict(rec) for rec in rebuilt] == [dict(rec) for rec in store]
@@ -0,0 +1,132 @@
+"""声明式奖状规则（user-024）：JSON/YAML 规则的加载、检查、覆盖内置奖状与自动重新加载。"""
+import json
+import logging
+import os
+import shutil
+
+import pytest
+
+from adif_parser import parse_adif
+from awards.checker import AwardChecker
+from awards.rules import AwardRules, load_rule_file, project_root, validate_rule
+
+EXAMPLES = os.path.join(project_root, 'award_rules', 'examples')
+
+WAC = {'code': 'wac', 'name': 'WAC', 'conditions': [
+    {'type': 'distinct_count', 'key': 'continent', 'target': 6,
+     'values': ['AF', 'AS', 'EU', 'NA', 'OC', 'SA']}]}
+
+
+def _write(directory, name, data):
+    path = directory / name
+    path.write_text(json.dumps(data) if not isinstance(data, str) else data, encoding='utf-8')
+    # 保证修改时间不同，目录签名随之变化
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+    return path
+
+
+def test_validate_rule_normalizes_code_and_defaults():
+    award = validate_rule(WAC)
+    assert award['code'] == 'WAC' and award['enabled'] is True and award['description'] == ''
+
+
+@pytest.mark.parametrize('rule, error', [
+    ([], '必须是对象'),
+    ({'conditions': [{'type': 'dxcc_count'}]}, '缺少 code'),
+    ({'code': 'X', 'conditions': []}, '非空列表'),
+    ({'code': 'X', 'conditions': [{'type': 'nope'}]}, '类型未知'),
+    ({'code': 'X', 'conditions': [{'type': 'distinct_count', 'key': 'nope'}]}, '第 1 个条件'),
+    ({'code': 'X', 'conditions': [{'type': 'dxcc_count'}], 'enhanced_count': 'nope'}, 'enhanced_count'),
+])
+def test_validate_rule_errors(rule, error):
+    with pytest.raises(ValueError, match=error):
+        validate_rule(rule)
+
+
+def test_example_rules_load():
+    codes = {}
+    for name in sorted(os.listdir(EXAMPLES)):
+        if name.endswith('.yaml'):
+            pytest.importorskip('yaml')
+        for award in load_rule_file(os.path.join(EXAMPLES, name)):
+            codes[award['code']] = award
+    assert {'WAC', 'VUCC6M', 'DXCCFT8'} <= set(codes)
+    assert codes['DXCCFT8']['conditions'][0]['key'] == ['band', 'dxcc']
+
+
+def test_rules_override_disable_and_reload(tmp_path, caplog):
+    rules = AwardRules(str(tmp_path))
+    version, awards = rules.current()
+    assert set(awards) == {'DXCC', 'WAPC', 'WACZ'}
+    assert rules.current()[0] == version
+
+    _write(tmp_path, 'wac.json', WAC)
+    _write(tmp_path, 'off.json', {'awards': [{'code': 'WACZ', 'enabled': False,
+                                              'conditions': [{'type': 'china_zone_count'}]}]})
+    with caplog.at_level(logging.INFO, logger='awards.rules'):
+        version2, awards = rules.current()
+    assert version2 == version + 1
+    assert set(awards) == {'DXCC', 'WAPC', 'WAC'}
+    assert any('已加载奖状规则' in r.getMessage() for r in caplog.records)
+
+    # 无效文件只跳过自己并记录错误
+    _write(tmp_path, 'bad.json', '{not json')
+    with caplog.at_level(logging.WARNING, logger='awards.rules'):
+        _, awards = rules.current()
+    assert 'WAC' in awards and 'bad.json' in rules.errors
+    assert any('bad.json' in r.getMessage() and r.levelno == logging.WARNING for r in caplog.records)
+
+    os.unlink(tmp_path / 'wac.json')
+    assert 'WAC' not in rules.awards()
+
+
+def test_yaml_rule(tmp_path):
+    pytest.importorskip('yaml')
+    shutil.copy(os.path.join(EXAMPLES, 'dxcc_challenge.yaml'), tmp_path / 'ft8.yml')
+    assert 'DXCCFT8' in AwardRules(str(tmp_path)).awards()
+
+
+def test_checker_picks_up_new_rule(tmp_path, lotw_text):
+    checker = AwardChecker(str(tmp_path))
+    _, records = parse_adif(lotw_text)
+    assert 'WAC' not in checker.check_all_awards(records)
+    _write(tmp_path, 'wac.json', WAC)
+    result = checker.check_all_awards(records)['WAC']
+    assert result['award'] == 'WAC' and 0 < result['conditions'][0]['current'] <= 6
+
+
+def test_upload_projection_keeps_rule_fields(tmp_path):
+    from adif_parser.bytes_parser import MappedAdif
+
+    rules_dir = tmp_path / 'rules'
+    rules_dir.mkdir()
+    _write(rules_dir, 'itu.json', {'code': 'ITU', 'conditions': [
+        {'type': 'distinct_count', 'key': 'itu_zone', 'target': 2, 'filters': {'confirmed': True}}]})
+    checker = AwardChecker(str(rules_dir))
+    fields = checker.record_fields()
+    assert {'ituz', 'lotw_qsl_rcvd'} <= set(fields)
+
+    # 通过 LOTW_QSL_RCVD 确认、自带 ITUZ 的日志，按上传时的投影解析
+    log = tmp_path / 'log.adi'
+    log.write_bytes(b'<EOH>\n'
+                    b'<CALL:5>JA1AA<BAND:3>20M<MODE:2>CW<QSO_DATE:8>20240101<ITUZ:2>45<LOTW_QSL_RCVD:1>Y<EOR>\n'
+                    b'<CALL:4>W1AW<BAND:3>20M<MODE:2>CW<QSO_DATE:8>20240101<ITUZ:1>8<LOTW_QSL_RCVD:1>Y<EOR>\n'
+                    b'<CALL:5>DL1AA<BAND:3>20M<MODE:2>CW<QSO_DATE:8>20240101<ITUZ:2>28<LOTW_QSL_RCVD:1>N<EOR>\n')
+    with MappedAdif(str(log)) as adif:
+        _, projected = adif.parse(fields=fields)
+        result = checker.check_all_awards(projected)['ITU']['conditions'][0]
+        _, full = adif.parse()
+        assert checker.check_all_awards(full)['ITU'] == checker.check_all_awards(projected)['ITU']
+    assert result['current'] == 2 and result['connected'] == ['45', '8']
+
+
+def test_undeclared_condition_fields_disable_projection(tmp_path, monkeypatch):
+    from awards.aggregator import CONDITION_ACCUMULATORS, UnknownConditionAccumulator
+
+    class Custom(UnknownConditionAccumulator):
+        fields = None
+
+    monkeypatch.setitem(CONDITION_ACCUMULATORS, 'custom', Custom)
+    _write(tmp_path, 'custom.json', {'code': 'C', 'conditions': [{'type': 'custom'}]})
+    assert AwardChecker(str(tmp_path)).record_fields() is None
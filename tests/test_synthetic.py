@@ -0,0 +1,38 @@
+"""合成 LoTW 日志与基准命令（user-012）。"""
+from adif_parser.bench import bench_pipeline
+from adif_parser.parser import detect_variant, parse_adif
+from adif_parser.synthetic import CHINA, generate_lotw
+
+
+def test_same_seed_same_text():
+    assert generate_lotw(50, seed=3) == generate_lotw(50, seed=3)
+    assert generate_lotw(50, seed=3) != generate_lotw(50, seed=4)
+
+
+def test_lotw_shape():
+    text = generate_lotw(500, seed=5, china_share=0.4, confirmed_share=0.5)
+    assert text.splitlines()[2] == 'for BG7XWF'
+    header, records = parse_adif(text)
+    assert detect_variant(text, header) == 'LoTW'
+    assert header['app_lotw_numrec'] == '500'
+    assert len(records) == 500
+    china = sum(rec['call'].startswith('B') and rec.get('dxcc', str(CHINA[0])) == str(CHINA[0])
+                for rec in records)
+    assert 150 < china < 250
+    confirmed = [rec for rec in records if rec['qsl_rcvd'] == 'Y']
+    assert 200 < len(confirmed) < 300
+    assert all('dxcc' in rec and 'app_lotw_dxcc_entity_status' in rec for rec in confirmed)
+
+
+def test_crlf():
+    text = generate_lotw(20, seed=1, crlf=True)
+    assert '\r\n' in text and '\n\n' not in text.replace('\r\n', '')
+    assert parse_adif(text) == parse_adif(generate_lotw(20, seed=1))
+
+
+def test_bench_pipeline_reports_stages():
+    result = bench_pipeline(qsos=200, seed=2, repeat=1, allocations=False)
+    assert result['log']['records'] == 200
+    for stage in ('parse', 'enhance_records', 'check_all_awards'):
+        assert result[stage]['seconds'] >= 0
+    assert result['params']['qsos'] == 200
@@ -0,0 +1,54 @@
+"""按长度取值的单遍分词（user-002）。"""
+import io
+
+import pytest
+
+from adif_parser.parser import parse_adif, parse_adif_iter
+
+
+def test_value_taken_by_declared_length():
+    # 值中的分号和 '<' 属于值本身，不再截断
+    _, records = parse_adif('<eoh><COMMENT:8>a;b <c>d<CALL:4>K1AB<eor>')
+    assert records == [{'comment': 'a;b <c>d', 'call': 'K1AB'}]
+
+
+def test_text_between_fields_is_ignored():
+    _, records = parse_adif('<eoh><CALL:4>K1AB // comment\n<BAND:3>20M;\n<eor>')
+    assert records == [{'call': 'K1AB', 'band': '20M'}]
+
+
+def test_unsized_tags_fall_back_to_delimiters():
+    _, records = parse_adif('<eoh><CALL>K1AB;<BAND>20M <MODE:2>CW<eor>')
+    assert records == [{'call': 'K1AB', 'band': '20M', 'mode': 'CW'}]
+
+
+def test_type_indicator():
+    _, records = parse_adif('<eoh><FREQ:6:N>14.074<eor>')
+    assert records == [{'freq': '14.074'}]
+
+
+@pytest.mark.parametrize('eor', ['<EOR:0>', '<eor:0>', '<EOR>'])
+@pytest.mark.parametrize('eoh', ['<EOH:0>', '<eoh>'])
+def test_sized_terminators(eoh, eor):
+    text = f'<PROGRAMID:4>LoTW{eoh}\n<CALL:4>K1AB{eor}\n<CALL:4>JA1A{eor}\n'
+    header, records = parse_adif(text)
+    assert header == {'programid': 'LoTW'}
+    assert records == [{'call': 'K1AB'}, {'call': 'JA1A'}]
+
+
+def test_sized_terminators_with_projection():
+    _, records = parse_adif('<eoh:0><CALL:4>K1AB<BAND:3>20M<eor:0><CALL:4>JA1A<eor:0>', fields='band')
+    assert records == [{'band': '20M'}, {}]
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 8])
+def test_sized_terminators_across_chunks(chunk_size):
+    text = '<eoh:0>\n<CALL:4>K1AB<EOR:0><CALL:4>JA1A<EOR:0>'
+    it = parse_adif_iter(io.StringIO(text), chunk_size=chunk_size)
+    assert next(it) == {}
+    assert list(it) == [{'call': 'K1AB'}, {'call': 'JA1A'}]
+
+
+def test_truncated_value_at_end_of_file():
+    _, records = parse_adif('<eoh><CALL:4>K1AB<NAME:10>abc')
+    assert records == [{'call': 'K1AB', 'name': 'abc'}]
@@ -0,0 +1,68 @@
+"""变体检测与头部预读（user-010）。"""
+import io
+
+import pytest
+
+from adif_parser.parser import VARIANT_PEEK_RECORDS, detect_variant, parse_adif, peek_header
+
+from baseline_parser import parse_adif as baseline_parse_adif
+
+
+def _log(header_fields='', records=1, comment=''):
+    body = ''.join(f'<CALL:4>K{i % 10}AB<BAND:3>20M<eor>\n' for i in range(records))
+    return f'Export\n{header_fields}<eoh>\n{body}{comment}'
+
+
+@pytest.mark.parametrize('programid, expected', [
+    ('Logger32', 'Logger32'), ('N1MM Logger+', 'N1MM Logger+'), ('HRD', 'Ham Radio Deluxe'),
+    ('DXLog.net', 'DXlog'), ('CQRLOG', 'CQRLOG'), ('LoTW', 'LoTW'), ('Other', 'Unknown'),
+])
+def test_variant_from_header(programid, expected):
+    text = _log(f'<PROGRAMID:{len(programid)}>{programid}\n')
+    header, _ = parse_adif(text)
+    assert detect_variant(text, header) == expected
+
+
+def test_variant_from_text_before_eoh():
+    text = 'ARRL Logbook of the World Status Report\n<eoh>\n<CALL:4>K1AB<eor>'
+    assert detect_variant(text, {}) == 'LoTW'
+
+
+def test_variant_priority():
+    text = 'Logbook of the World / Logger32\n<eoh>\n'
+    assert detect_variant(text, {}) == 'Logger32'
+
+
+def test_scan_is_bounded_to_first_records():
+    text = _log(records=VARIANT_PEEK_RECORDS + 5, comment='n1mm')
+    header, _ = parse_adif(text)
+    assert detect_variant(text, header) == 'Unknown'
+    assert detect_variant(text, header, full_scan=True) == 'N1MM Logger+'
+
+
+def test_peek_header_reads_through_eoh(lotw_text):
+    head = peek_header(io.StringIO(lotw_text))
+    assert head.endswith('<eoh>')
+    assert lotw_text.startswith(head)
+    assert head.splitlines()[2].startswith('for ')
+    # 头部的解析结果与完整文本一致
+    assert baseline_parse_adif(head)[0] == parse_adif(lotw_text)[0]
+
+
+def test_peek_header_small_limit():
+    text = 'line1\nline2\nline3\n<eoh>' + 'x' * 100
+    assert peek_header(io.StringIO(text), limit=8) == 'line1\nli'
+
+
+@pytest.mark.parametrize('split', range(1, 8))
+def test_peek_header_tag_across_chunks(monkeypatch, split):
+    from adif_parser import parser
+    monkeypatch.setattr(parser, 'DEFAULT_CHUNK_SIZE', 4)
+    text = 'a\nb\nc\n' + 'x' * split + '<EOH:0>' + 'y' * 40
+    assert peek_header(io.StringIO(text)) == 'a\nb\nc\n' + 'x' * split + '<EOH:0>'
+
+
+def test_peek_header_from_path(tmp_path, lotw_text):
+    path = tmp_path / 'log.adi'
+    path.write_text(lotw_text, encoding='utf-8')
+    assert peek_header(str(path)) == peek_header(io.StringIO(lotw_text))